@@ -1,13 +1,29 @@
-from typing import Any
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 from robot.api import logger
 from robot.api.deco import keyword
-from robot.libraries.BuiltIn import BuiltIn
 from robotlibcore import DynamicCore
 
+try:
+    from robotlibcore import KeywordBuilder
+except ImportError:
+    KeywordBuilder = None
+
+from .instrumentation import KEYWORD, EndSuiteListener, Instrumentation
 from .version import VERSION
 from .x3270 import x3270
 
+# (method name, keyword name, keyword specification) of the keywords of each
+# library component class, built once per process instead of once per suite
+_keyword_specs: Dict[type, List[Tuple[str, str, Any]]] = {}
+
+# the attributes of robotlibcore's DynamicCore the cached specs are added to.
+# They are internals of robotlibcore 4.x, so with any other layout the specs
+# are built by DynamicCore itself.
+_CORE_ATTRIBUTES = ("keywords", "keywords_spec", "attributes")
+
 
 class Mainframe3270(DynamicCore):
     r"""
@@ -51,6 +67,17 @@ class Mainframe3270(DynamicCore):
         wait_time_after_write: float = 0.0,
         img_folder: str = ".",
         run_on_failure_keyword: str = "Take Screenshot",
+        cache_screen: bool = False,
+        adaptive_wait: bool = False,
+        screen_stable_time: float = 0.0,
+        session_pool_size: int = 0,
+        session_max_idle: float = 300,
+        model: Optional[str] = None,
+        timing_report: Optional[str] = None,
+        keep_alive: int = 0,
+        screenshot_mode: str = "file",
+        deduplicate_screenshots: bool = False,
+        track_screen_changes: bool = False,
     ) -> None:
         """
         By default the emulator visibility is set to visible=True.
@@ -68,13 +95,125 @@ class Mainframe3270(DynamicCore):
         You can overwrite this to run any other keyword by setting the ``run_on_failure_keyword`` option.
         If you pass ``None`` to this argument, no keyword will be run.
         To change the ``run_on_failure_keyword`` during runtime, see `Register Run On Failure Keyword`.
+
+        With ``cache_screen=True``, screen contents are cached between keywords and only read again after a
+        command that can change the screen, e.g. `Send Enter`, `Send PF`, `Write` or `Execute Command`. Only
+        enable the cache if the host never updates the screen on its own, as such updates are not seen until
+        the next command, e.g. by `Wait Until Keyword Succeeds` retrying `Page Should Contain String`.
+        See `Get Screen Cache Statistics` to verify the number of saved screen reads.
+
+        By default, `Send Enter`, `Send PF`, `Execute Command`, `Write` and `Write In Position` sleep for
+        the ``wait_time`` after sending the command. With ``adaptive_wait=True``, these keywords return as soon
+        as the host has unlocked the keyboard, and ``wait_time`` is only the upper bound.
+        If the host redraws the screen in several steps, you can additionally set ``screen_stable_time``
+        to the number of seconds the screen must not change before the keywords return.
+
+        `Wait Until Screen Changes` compares the screen with the screen when the last AID key was sent.
+        Reading that screen costs one additional screen read per AID key, so it is only done once the
+        keyword was used, or for all AID keys with ``track_screen_changes=True``.
+
+        Every `Open Connection` starts a new emulator and negotiates a new session with the host.
+        To reuse emulators across tests and suites, set ``session_pool_size`` to the maximum number of idle
+        emulators to keep. `Close Connection` then keeps the emulator connected, and the next `Open Connection`
+        with the same parameters reuses it. Emulators that have been idle for more than ``session_max_idle``
+        seconds or that are no longer connected are terminated. The pool is shared by all library instances
+        in the same process.
+
+        The size of the screen is taken from the emulator, so keywords like `Read` and `Read All Screen`
+        work with the larger screens of the 3270 models 3 (32x80), 4 (43x80) and 5 (27x132).
+        Set ``model`` to the model number to use, e.g. ``model=5``. By default, x3270 and wc3270
+        use model 2 (24x80), and s3270 and ws3270 use the default model of the executable.
+
+        To see where the time of a suite is spent, set ``timing_report`` to the path of a json file, e.g.
+        ``timing_report=timing.json``. The library then records the duration of every keyword, the time spent
+        writing commands to the emulator and waiting for its responses, and the time spent sleeping for the
+        ``wait_time`` and ``wait_time_after_write``. At the end of each suite, the count, total and the 50th, 95th
+        and 99th percentile of the durations are logged and written to the file under the name of the suite.
+        A relative path is relative to the ``${OUTPUT DIR}``. See also `Log Timing Report`.
+
+        Several connections can be kept open side by side by giving them an ``alias`` in `Open Connection`,
+        see `Switch Connection`. If the host drops idle sessions, set ``keep_alive`` to a number of seconds,
+        e.g. ``keep_alive=60``. The emulators then send a TELNET NOP to the host whenever a session has
+        been idle for that time, which keeps connections that are not the current one, or are kept in
+        the session pool, alive.
+
+        By default, `Take Screenshot` lets the emulator write every screenshot to its own html file.
+        When many screenshots are taken, e.g. on failure, set ``screenshot_mode`` to render them in the
+        library instead: ``inline`` embeds them as html into the log, ``text`` logs them as plain text and
+        ``archive`` writes the screenshots of each suite to a single zip archive at the end of the suite.
+        With ``deduplicate_screenshots=True``, screenshots are named after a hash of the screen, and a screen
+        that was saved before, e.g. the same error screen on repeated failures, is not saved again.
         """
         self._running_on_failure_keyword = False
         self.register_run_on_failure_keyword(run_on_failure_keyword)
-        libraries = [
-            x3270(visible, timeout, wait_time, wait_time_after_write, img_folder)
-        ]
-        DynamicCore.__init__(self, libraries)
+        self.timing_report = timing_report
+        self.instrumentation = None
+        if timing_report:
+            self.instrumentation = Instrumentation()
+        if timing_report or screenshot_mode == "archive":
+            self.ROBOT_LIBRARY_LISTENER = EndSuiteListener(self._end_suite)
+        self.x3270 = x3270(
+            visible,
+            timeout,
+            wait_time,
+            wait_time_after_write,
+            img_folder,
+            cache_screen,
+            adaptive_wait,
+            screen_stable_time,
+            session_pool_size,
+            session_max_idle,
+            model,
+            self.instrumentation,
+            keep_alive,
+            screenshot_mode,
+            deduplicate_screenshots,
+            track_screen_changes,
+        )
+        DynamicCore.__init__(self, [self.x3270])
+
+    def add_library_components(
+        self,
+        library_components: list,
+        translation: Optional[dict] = None,
+        translated_kw_names: Optional[list] = None,
+    ) -> None:
+        can_cache = KeywordBuilder is not None and all(
+            hasattr(self, name) for name in _CORE_ATTRIBUTES
+        )
+        if translation or translated_kw_names or not can_cache:
+            DynamicCore.add_library_components(
+                self, library_components, translation, translated_kw_names
+            )
+            return
+        self.keywords_spec["__init__"] = self._keyword_specs(self)[0][2]
+        for component in library_components:
+            for name, kw_name, spec in self._keyword_specs(component)[1:]:
+                kw = getattr(component, name)
+                self.keywords[kw_name] = kw
+                self.keywords_spec[kw_name] = spec
+                self.attributes[name] = self.attributes[kw_name] = kw
+
+    @staticmethod
+    def _keyword_specs(component: Any) -> List[Tuple[str, str, Any]]:
+        """
+        Returns the specification of the ``__init__`` method of the component,
+        followed by those of its keywords. Inspecting the signatures and type hints
+        of all keywords is the most expensive part of creating a library instance,
+        so they are only inspected for the first instance of each class.
+        """
+        cls = type(component)
+        specs = _keyword_specs.get(cls)
+        if specs is None:
+            specs = [("__init__", "__init__", KeywordBuilder.build(component.__init__))]
+            for name in dir(cls):
+                func = getattr(cls, name)
+                if callable(func) and hasattr(func, "robot_name"):
+                    kw = getattr(component, name)
+                    kw_name = func.robot_name or name
+                    specs.append((name, kw_name, KeywordBuilder.build(kw)))
+            _keyword_specs[cls] = specs
+        return specs
 
     @keyword
     def register_run_on_failure_keyword(self, keyword: str) -> None:
@@ -94,15 +233,54 @@ class Mainframe3270(DynamicCore):
             self.run_on_failure_keyword = keyword
 
     def run_keyword(self, name: str, args: list, kwargs: dict) -> Any:
+        start = time.perf_counter()
         try:
             return DynamicCore.run_keyword(self, name, args, kwargs)
         except Exception:
             self.run_on_failure()
             raise
+        finally:
+            if self.instrumentation is not None:
+                self.instrumentation.record(KEYWORD, name, time.perf_counter() - start)
+
+    @keyword
+    def log_timing_report(self) -> dict:
+        """
+        Logs the timing report of the current suite and writes it to the ``timing_report`` file,
+        which is set on library import. This is done automatically at the end of each suite.
+
+        Returns the report as dictionary, with the durations in seconds.
+
+        Example:
+            | ${report} | Log Timing Report |
+            | Should Be True | ${report}[keyword][Send Enter][p95] < 1 |
+        """
+        if self.instrumentation is None:
+            raise Exception(
+                "No timing is recorded, please import the library with timing_report"
+            )
+        from robot.libraries.BuiltIn import BuiltIn
+
+        return self._timing_report(BuiltIn().get_variable_value("${SUITE NAME}"))
+
+    def _end_suite(self, suite_name: str) -> None:
+        self._timing_report(suite_name)
+        self.x3270.write_screenshot_archive(suite_name)
+
+    def _timing_report(self, suite_name: str) -> dict:
+        instrumentation = self.instrumentation
+        if instrumentation is None or not self.timing_report:
+            return {}
+        logger.info(instrumentation.format_summary())
+        path = os.path.join(self.x3270.output_folder, self.timing_report)
+        instrumentation.write_json(path, suite_name)
+        return instrumentation.summary()
 
     def run_on_failure(self) -> None:
         if self._running_on_failure_keyword or not self.run_on_failure_keyword:
             return
+        from robot.libraries.BuiltIn import BuiltIn
+
         try:
             self._running_on_failure_keyword = True
             BuiltIn().run_keyword(self.run_on_failure_keyword)
@@ -0,0 +1,418 @@
+import asyncio
+import logging
+
+from .py3270 import (
+    DATA_OFFSET,
+    DATA_PREFIX,
+    DEFAULT_MAX_RESPONSE_SIZE,
+    LINE_END,
+    Command,
+    CommandError,
+    Emulator,
+    ExecutableApp,
+    FieldTruncateError,
+    KeyboardStateError,
+    Screen,
+    Status,
+    TerminatedError,
+    decode_text,
+)
+
+log = logging.getLogger(__name__)
+
+
+"""
+    asyncio counterpart of py3270.Emulator. Every AsyncEmulator drives its own
+    s3270 subprocess through non-blocking pipes, so many sessions can be
+    multiplexed on one event loop, e.g. with asyncio.gather().
+"""
+
+
+class AsyncCommand(Command):
+    """
+    Represents a x3270 script command that is executed without blocking the event loop
+    """
+
+    async def execute(self):
+        await self.send()
+        return await self.read_response()
+
+    async def send(self):
+        await self.app.write(self.cmdstr + b"\n")
+
+    async def read_response(self):
+        # see Command.iter_response for the format of the response
+        store = self._store()
+        readline = self.app.readline
+        limit = self.max_response_size
+        size = 0
+        while True:
+            line = await readline()
+            if not line.startswith(DATA_PREFIX):
+                self.status_line = line.rstrip()
+                result = (await readline()).rstrip()
+                self.response_size = size
+                self.handle_result(result.decode("utf-8"))
+                self._check_size()
+                return
+
+            line = line[DATA_OFFSET:].rstrip(LINE_END)
+            size += len(line) + 1
+            if limit is None or size <= limit:
+                store(line)
+
+
+class AsyncExecutableApp(ExecutableApp):
+    def __init__(self, extra_args=None, executable="s3270", model=None):
+        self.executable = executable
+        # see notes for args in py3270.x3270App
+        self.args = ["-xrm", "{0}.unlockDelay: False".format(executable)]
+        if model:
+            self.args.extend(["-xrm", "{0}.model: {1}".format(executable, model)])
+        if extra_args:
+            self.append_args(extra_args)
+        self.process = None
+
+    async def spawn_app(self):
+        self.process = await asyncio.create_subprocess_exec(
+            self.executable,
+            *self.args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            # stderr is never read, a pipe could fill up and block the emulator
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+
+    async def write(self, data):
+        self.process.stdin.write(data)
+        await self.process.stdin.drain()
+
+    async def readline(self):
+        return await self.process.stdout.readline()
+
+    async def close(self):
+        if self.process.returncode is None:
+            try:
+                self.process.kill()
+            except ProcessLookupError:
+                pass
+        await self.process.wait()
+
+
+class AsyncEmulator(object):
+    """
+    Represents an s3270 emulator subprocess driven by asyncio and provides
+    the same API as py3270.Emulator, with coroutines instead of blocking methods.
+    """
+
+    def __init__(
+        self,
+        timeout=30,
+        extra_args=None,
+        app=None,
+        command_timeout=None,
+        model=None,
+        max_response_size=DEFAULT_MAX_RESPONSE_SIZE,
+    ):
+        """
+        Create an emulator instance. The subprocess is spawned by `start`,
+        `connect` or when entering the instance as async context manager.
+
+        `timeout` controls the timeout paramater to any Wait() command sent
+            to s3270.
+        `command_timeout` is the number of seconds to wait for the response
+            of any command. None waits forever.
+        `model` is the 3270 model number, see py3270.Emulator.
+        `max_response_size` is the maximum number of bytes of data a command
+            may return, see py3270.Command.
+        """
+        self.app = app or AsyncExecutableApp(extra_args, model=model)
+        self.is_started = False
+        self.is_terminated = False
+        self.status = Status(None)
+        self.timeout = timeout
+        self.command_timeout = command_timeout
+        self.max_response_size = max_response_size
+        self.last_host = None
+        # created on start, as locks are bound to the running event loop in Python < 3.10
+        self._lock = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.terminate()
+
+    async def start(self):
+        """
+        Spawn the s3270 subprocess, if it has not been spawned yet
+        """
+        if not self.is_started:
+            self._lock = asyncio.Lock()
+            await self.app.spawn_app()
+            self.is_started = True
+
+    async def exec_command(self, cmdstr, timeout=None, sink=None):
+        """
+        Execute an x3270 command
+
+        `cmdstr` gets sent directly to the s3270 subprocess on it's stdin.
+        `timeout` overrides the `command_timeout` of this instance.
+        `sink` is an optional bytearray for the data, see py3270.Command.
+
+        If the command is cancelled or times out before its response was
+        read completely, the subprocess is killed, because the following
+        responses could not be assigned to their commands anymore.
+        """
+        if self.is_terminated:
+            raise TerminatedError("This Emulator instance has been terminated")
+        await self.start()
+
+        async with self._lock:
+            c = AsyncCommand(self.app, cmdstr, self.max_response_size, sink)
+            try:
+                await asyncio.wait_for(c.execute(), timeout or self.command_timeout)
+            except (asyncio.CancelledError, asyncio.TimeoutError):
+                await self._kill()
+                raise
+            finally:
+                if c.status_line is not None:
+                    self.status = Status(c.status_line)
+        return c
+
+    async def batch(self, cmdstrs, timeout=None):
+        """
+        Execute several x3270 commands in a pipeline, see py3270.Emulator.batch
+        """
+        if self.is_terminated:
+            raise TerminatedError("This Emulator instance has been terminated")
+        await self.start()
+
+        async with self._lock:
+            commands = [
+                AsyncCommand(self.app, cmdstr, self.max_response_size)
+                for cmdstr in cmdstrs
+            ]
+            try:
+                await asyncio.wait_for(
+                    self._execute_batch(commands), timeout or self.command_timeout
+                )
+            except (asyncio.CancelledError, asyncio.TimeoutError):
+                await self._kill()
+                raise
+        first_error = next((c.error for c in commands if c.error), None)
+        if first_error:
+            raise first_error
+        return commands
+
+    async def _execute_batch(self, commands):
+        await self.app.write(b"".join(c.cmdstr + b"\n" for c in commands))
+        for c in commands:
+            try:
+                await c.read_response()
+            except CommandError as e:
+                c.error = e
+            finally:
+                if c.status_line is not None:
+                    self.status = Status(c.status_line)
+
+    async def _kill(self):
+        log.debug("terminal client killed")
+        self.is_terminated = True
+        await self.app.close()
+
+    async def terminate(self):
+        """
+        terminates the underlying s3270 subprocess. Once called, this
+        AsyncEmulator instance must no longer be used.
+        """
+        if self.is_terminated:
+            return
+        if not self.is_started:
+            self.is_terminated = True
+            return
+        log.debug("terminal client terminated")
+        try:
+            await self.exec_command(b"Quit", timeout=self.timeout)
+        except (BrokenPipeError, ConnectionResetError, asyncio.TimeoutError):
+            # s3270 was terminated or killed, since we are just quitting anyway, ignore it.
+            pass
+        if not self.is_terminated:
+            self.is_terminated = True
+            await self.app.close()
+
+    def screen_size(self):
+        """
+        Return the (rows, cols) of the screen, see py3270.Emulator.screen_size
+        """
+        return Emulator.screen_size(self)
+
+    async def is_connected(self):
+        """
+        Return bool indicating connection state
+        """
+        await self.exec_command(b"ignore")
+        return self.status.connection_state.startswith(b"C(")
+
+    async def connect(self, host):
+        """
+        Connect to a host
+        """
+        await self.exec_command("Connect({0})".format(host).encode("utf-8"))
+        self.last_host = host
+
+    async def reconnect(self):
+        """
+        Disconnect from the host and re-connect to the same host
+        """
+        await self.exec_command(b"Disconnect")
+        await self.connect(self.last_host)
+
+    async def wait_for_field(self):
+        """
+        Wait until the screen is ready, the cursor has been positioned
+        on a modifiable field, and the keyboard is unlocked.
+        """
+        await self.exec_command(
+            "Wait({0}, InputField)".format(self.timeout).encode("utf-8")
+        )
+        if self.status.keyboard != b"U":
+            raise KeyboardStateError(
+                "keyboard not unlocked, state was: {0}".format(
+                    self.status.keyboard.decode("utf-8")
+                )
+            )
+
+    async def wait_for_output(self, timeout):
+        """
+        Wait until the host changes the screen, for at most `timeout` seconds.
+        Returns False if the wait timed out.
+        """
+        return await self._wait("Output", timeout)
+
+    async def wait_for_unlock(self, timeout):
+        """
+        Wait until the host unlocks the keyboard, for at most `timeout` seconds.
+        Returns False if the wait timed out.
+        """
+        return await self._wait("Unlock", timeout)
+
+    async def _wait(self, condition, timeout):
+        cmdstr = Emulator._wait_command(condition, timeout)
+        try:
+            await self.exec_command(cmdstr)
+        except CommandError as e:
+            if "timed out" not in str(e).lower():
+                raise
+            return False
+        return True
+
+    async def move_to(self, ypos, xpos):
+        """
+        move the cursor to the given co-ordinates.  Co-ordinates are 1
+        based, as listed in the status area of the terminal.
+        """
+        await self.exec_command(Emulator._move_to_command(ypos, xpos))
+
+    async def send_string(self, tosend, ypos=None, xpos=None, enter=False):
+        """
+        Send a string to the screen at the current cursor location or at
+        screen co-ordinates `ypos`/`xpos` if they are both given.
+        If `enter` is True, Enter is sent once the string has been written
+        successfully, see py3270.Emulator.send_string.
+        """
+        await self._at_position([Emulator._string_command(tosend)], ypos, xpos)
+        if enter:
+            await self.send_enter()
+
+    async def _at_position(self, cmdstrs, ypos, xpos):
+        if xpos is not None and ypos is not None:
+            cmdstrs = [Emulator._move_to_command(ypos, xpos)] + cmdstrs
+        if len(cmdstrs) == 1:
+            await self.exec_command(cmdstrs[0])
+        else:
+            await self.batch(cmdstrs)
+
+    async def send_enter(self):
+        await self.exec_command(b"Enter")
+
+    async def send_pf(self, number):
+        await self.exec_command("PF({0})".format(number).encode("utf-8"))
+
+    async def string_get(self, ypos, xpos, length):
+        """
+        Get a string of `length` at screen co-ordinates `ypos`/`xpos`
+
+        Co-ordinates are 1 based, as listed in the status area of the
+        terminal.
+        """
+        cmd = await self.exec_command(
+            "ascii({0},{1},{2})".format(ypos - 1, xpos - 1, length).encode("utf-8")
+        )
+        # this usage of utf-8 should only return a single line of data
+        assert len(cmd.data) == 1, cmd.data
+        return decode_text(cmd.data[0])
+
+    async def string_found(self, ypos, xpos, string):
+        """
+        Return True if `string` is found at screen co-ordinates
+        `ypos`/`xpos`, False otherwise.
+        """
+        return await self.string_get(ypos, xpos, len(string)) == string
+
+    async def screen_get(self, rows=None, cols=None):
+        """
+        Get a snapshot of the first `rows` x `cols` cells of the screen
+        with a single Ascii() command. By default, the whole screen is read.
+        """
+        if rows is None or cols is None:
+            size = self.screen_size()
+            rows, cols = rows or size[0], cols or size[1]
+        # a buffer per call, as concurrent calls could overwrite a shared one
+        buffer = bytearray(rows * (cols + 1))
+        cmd = await self.exec_command(
+            "Ascii(0,0,{0},{1})".format(rows, cols).encode("utf-8"), sink=buffer
+        )
+        return Screen.from_ascii(buffer, cmd.data_size, cols)
+
+    async def read_buffer(self):
+        """
+        Get a snapshot of the screen including its fields with a single
+        ReadBuffer(Ascii) command.
+        """
+        cmd = await self.exec_command(b"ReadBuffer(Ascii)")
+        return Screen.from_read_buffer(cmd.data)
+
+    async def delete_char(self, ypos=None, xpos=None):
+        """
+        Delete the character at the current cursor location or at screen
+        co-ordinates `ypos`/`xpos` if they are both given.
+        """
+        await self._at_position([b"Delete"], ypos, xpos)
+
+    async def delete_field(self, ypos=None, xpos=None):
+        """
+        Delete contents in field at current cursor location, or at screen
+        co-ordinates `ypos`/`xpos` if they are both given.
+        """
+        await self._at_position([b"DeleteField"], ypos, xpos)
+
+    async def fill_field(self, ypos, xpos, tosend, length):
+        """
+        clears the field at the position given and inserts the string
+        `tosend`
+
+        raises: FieldTruncateError if `tosend` is longer than
+            `length`.
+        """
+        if length - len(tosend) < 0:
+            raise FieldTruncateError('length limit %d, but got "%s"' % (length, tosend))
+        await self._at_position(
+            [b"DeleteField", Emulator._string_command(tosend)], ypos, xpos
+        )
+
+    async def save_screen(self, file_path):
+        await self.exec_command(
+            "PrintText(html,file,{0})".format(file_path).encode("utf-8")
+        )
@@ -0,0 +1,177 @@
+import json
+import math
+import os
+import random
+import time
+from contextlib import contextmanager
+
+# kinds of durations recorded by the instrumentation
+KEYWORD = "keyword"
+WRITE = "write"
+RESPONSE = "response"
+SLEEP = "sleep"
+
+# number of samples kept per histogram
+MAX_SAMPLES = 1000
+
+
+class Histogram(object):
+    """
+    Collects durations in seconds and computes percentiles over them.
+
+    The count, total and maximum are exact. Of the durations themselves at
+    most `max_samples` are kept, a uniform random sample of all durations
+    once there are more, so the memory of a histogram is bounded in long
+    suites and the percentiles are estimated from the sample.
+    """
+
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.samples = []
+        self.max_samples = max_samples
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def __len__(self):
+        return self.count
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < self.max_samples:
+            self.samples.append(seconds)
+            return
+        # reservoir sampling: every duration is kept with the same probability
+        index = random.randrange(self.count)
+        if index < self.max_samples:
+            self.samples[index] = seconds
+
+    def percentile(self, percent):
+        """
+        Return the `percent` percentile of the samples with the nearest-rank
+        method, or 0.0 if there are no samples.
+        """
+        if not self.samples:
+            return 0.0
+        samples = sorted(self.samples)
+        rank = max(int(math.ceil(percent / 100.0 * len(samples))), 1)
+        return samples[rank - 1]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class Instrumentation(object):
+    """
+    Records the durations of keywords, of writing commands to the emulator,
+    of waiting for the responses of the emulator and of deliberate sleeps
+    in one histogram per kind and name.
+    """
+
+    def __init__(self):
+        self.histograms = {}
+
+    def record(self, kind, name, seconds):
+        histogram = self.histograms.get((kind, name))
+        if histogram is None:
+            histogram = self.histograms[(kind, name)] = Histogram()
+        histogram.add(seconds)
+
+    @contextmanager
+    def timer(self, kind, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(kind, name, time.perf_counter() - start)
+
+    @contextmanager
+    def split_timer(self, kind, names):
+        """
+        Time a single operation done for several `names`, e.g. writing a
+        batch of commands at once, and record an equal share of its
+        duration under each name
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            share = (time.perf_counter() - start) / max(len(names), 1)
+            for name in names:
+                self.record(kind, name, share)
+
+    def reset(self):
+        self.histograms = {}
+
+    def summary(self):
+        """
+        Return a dictionary with the summary of every histogram, grouped
+        by kind and name, e.g. summary["keyword"]["Send Enter"]["p95"]
+        """
+        summary = {}
+        for (kind, name), histogram in sorted(self.histograms.items()):
+            summary.setdefault(kind, {})[name] = histogram.summary()
+        return summary
+
+    def format_summary(self):
+        """
+        Return the summary as text table with the durations in milliseconds
+        """
+        lines = [
+            "{0:<10} {1:<40} {2:>7} {3:>10} {4:>10} {5:>10} {6:>10}".format(
+                "kind", "name", "count", "total", "p50", "p95", "p99"
+            )
+        ]
+        for kind, histograms in self.summary().items():
+            for name, summary in histograms.items():
+                lines.append(
+                    "{0:<10} {1:<40} {2:>7} {3:>10.1f} {4:>10.1f} {5:>10.1f} {6:>10.1f}".format(
+                        kind,
+                        name,
+                        summary["count"],
+                        summary["total"] * 1000,
+                        summary["p50"] * 1000,
+                        summary["p95"] * 1000,
+                        summary["p99"] * 1000,
+                    )
+                )
+        return "\n".join(lines)
+
+    def write_json(self, path, key):
+        """
+        Write the summary to the json file `path` under `key`, keeping the
+        summaries that are already in the file under other keys.
+        """
+        report = {}
+        if os.path.exists(path):
+            try:
+                with open(path) as file:
+                    report = json.load(file)
+            except ValueError:
+                pass
+        report[key] = self.summary()
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+
+class EndSuiteListener(object):
+    """
+    Library listener that passes the name of the suite that imported the
+    library to `end_suite_callback` at the end of the suite
+    """
+
+    ROBOT_LISTENER_API_VERSION = 2
+
+    def __init__(self, end_suite_callback):
+        self.end_suite_callback = end_suite_callback
+
+    def end_suite(self, name, attributes):
+        self.end_suite_callback(attributes.get("longname", name))
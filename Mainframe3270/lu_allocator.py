@@ -0,0 +1,211 @@
+import atexit
+import json
+import os
+import re
+import tempfile
+import time
+from contextlib import contextmanager
+
+
+class LUAllocationError(Exception):
+    pass
+
+
+def expand_lu_pool(lu_pool):
+    """
+    Return the list of LU names in `lu_pool`, which is either a list of
+    names, a comma separated string of names or a range like "TERM01-TERM16",
+    or a combination of both, e.g. "TERM01-TERM04,TERMX".
+    """
+    if isinstance(lu_pool, str):
+        lu_pool = lu_pool.split(",")
+    lus = []
+    for entry in lu_pool:
+        entry = entry.strip()
+        if not entry:
+            continue
+        first, sep, last = entry.partition("-")
+        if not sep:
+            lus.append(entry)
+            continue
+        lus.extend(_expand_range(first.strip(), last.strip()))
+    return lus
+
+
+def _expand_range(first, last):
+    first_match = re.match(r"^(.*?)(\d+)$", first)
+    last_match = re.match(r"^(.*?)(\d+)$", last)
+    if not first_match or not last_match or first_match.group(1) != last_match.group(1):
+        raise ValueError(
+            'Invalid LU range "%s-%s", expected a range like "TERM01-TERM16"'
+            % (first, last)
+        )
+    prefix, start = first_match.groups()
+    end = last_match.group(2)
+    width = len(start)
+    return [
+        "%s%s" % (prefix, str(number).zfill(width))
+        for number in range(int(start), int(end) + 1)
+    ]
+
+
+def _pid_alive(pid):
+    if os.name == "nt":
+        import ctypes
+
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        kernel32 = ctypes.windll.kernel32  # type: ignore
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        try:
+            exit_code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+            return exit_code.value == STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def _file_lock(path):
+    with open(path, "a+") as file:
+        if os.name == "nt":
+            import msvcrt
+
+            while True:
+                try:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)  # type: ignore
+                    break
+                except OSError:
+                    time.sleep(0.05)
+            try:
+                yield
+            finally:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)  # type: ignore
+        else:
+            import fcntl
+
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+class LUAllocator(object):
+    """
+    Leases LU names to one process at a time, so parallel processes
+    (e.g. pabot workers) never connect with the same LU.
+
+    The leases are kept in a json file in `lease_dir`, which is shared by all
+    processes on the machine. Leases of processes that no longer exist are
+    considered free.
+    """
+
+    def __init__(self, lease_dir=None):
+        self.lease_dir = lease_dir or os.path.join(
+            tempfile.gettempdir(), "mainframe3270_lu_leases"
+        )
+        # (host, lu) -> whether the LU is in use by a connection of this process
+        self._held = {}
+
+    @property
+    def pid(self):
+        return os.getpid()
+
+    @property
+    def registry_path(self):
+        return os.path.join(self.lease_dir, "leases.json")
+
+    @contextmanager
+    def _registry(self):
+        os.makedirs(self.lease_dir, exist_ok=True)
+        with _file_lock(os.path.join(self.lease_dir, "leases.lock")):
+            try:
+                with open(self.registry_path) as file:
+                    registry = json.load(file)
+            except (OSError, ValueError):
+                registry = {}
+            yield registry
+            with open(self.registry_path, "w") as file:
+                json.dump(registry, file)
+
+    def acquire(self, host, lus):
+        """
+        Lease the first free LU of `lus` on `host` and return its name.
+
+        LUs that this process still holds from a previous connection are
+        preferred, so pooled sessions with these LUs can be reused.
+
+        raises: LUAllocationError if all LUs are leased by other processes.
+        """
+        for lu in lus:
+            if self._held.get((host, lu)) is False:
+                self._held[(host, lu)] = True
+                return lu
+        with self._registry() as registry:
+            leases = registry.setdefault(host, {})
+            for lu in lus:
+                pid = leases.get(lu)
+                if pid is None or (pid != self.pid and not _pid_alive(pid)):
+                    leases[lu] = self.pid
+                    self._held[(host, lu)] = True
+                    return lu
+        raise LUAllocationError(
+            "All LUs of the pool are in use on %s: %s" % (host, ", ".join(lus))
+        )
+
+    def release(self, host, lu, keep=False):
+        """
+        Release the lease of `lu` on `host`.
+
+        If `keep` is True, the LU stays leased to this process, but can be
+        returned by `acquire` again, e.g. because its session was pooled.
+        """
+        if (host, lu) not in self._held:
+            return
+        if keep:
+            self._held[(host, lu)] = False
+            return
+        del self._held[(host, lu)]
+        with self._registry() as registry:
+            leases = registry.get(host, {})
+            if leases.get(lu) == self.pid:
+                del leases[lu]
+
+    def release_kept(self, host, lu):
+        """
+        Release the lease of `lu` on `host` if it was kept with `release`,
+        e.g. because its pooled session was terminated, but not if a
+        connection acquired it again in the meantime.
+        """
+        if self._held.get((host, lu)) is False:
+            self.release(host, lu)
+
+    def release_all(self):
+        """
+        Release all leases of this process
+        """
+        if not self._held:
+            return
+        held, self._held = self._held, {}
+        with self._registry() as registry:
+            for host, lu in held:
+                leases = registry.get(host, {})
+                if leases.get(lu) == self.pid:
+                    del leases[lu]
+
+
+# shared by all library instances of a process
+lu_allocator = LUAllocator()
+atexit.register(lu_allocator.release_all)
@@ -1,12 +1,17 @@
+import bisect
+import codecs
 import errno
 import logging
+import math
 import socket
 import subprocess
 import time
 import warnings
+import zlib
+from contextlib import nullcontext
 from os import name as os_name
 
-import six
+from .instrumentation import RESPONSE, WRITE
 
 log = logging.getLogger(__name__)
 
@@ -38,41 +43,119 @@ class FieldTruncateError(Exception):
     pass
 
 
+class ResponseSizeError(CommandError):
+    pass
+
+
+# prefix of the lines with the data of a command, and the offset of the data
+# behind it, as in 'data: abc'
+DATA_PREFIX = b"data:"
+DATA_OFFSET = len(DATA_PREFIX) + 1
+LINE_END = b"\n\r"
+
+
 class Command(object):
     """
     Represents a x3270 script command
     """
 
-    def __init__(self, app, cmdstr):
-        if isinstance(cmdstr, six.text_type):
+    def __init__(self, app, cmdstr, max_response_size=None, sink=None):
+        """
+        `max_response_size` is the maximum number of bytes of data the
+            command may return. Larger responses raise a ResponseSizeError,
+            after they were read completely. None does not limit the size.
+        `sink` is an optional bytearray the data lines are written to, each
+            followed by a newline, instead of collecting them in `data`. The
+            lines are written from the start of the sink, which only grows if
+            it was not preallocated large enough; `data_size` is the number
+            of bytes written.
+
+        After the response was read, `response_size` is the number of bytes
+        of data in it, counting one newline per line.
+        """
+        if isinstance(cmdstr, str):
             warnings.warn("Commands should be byte strings", stacklevel=3)
             cmdstr = cmdstr.encode("utf-8")
         self.app = app
         self.cmdstr = cmdstr
         self.status_line = None
         self.data = []
+        self.data_size = 0
+        self.response_size = 0
+        self.max_response_size = max_response_size
+        self.sink = sink
+        self.error = None
 
     def execute(self):
+        self.send()
+        return self.read_response()
+
+    def send(self):
         self.app.write(self.cmdstr + b"\n")
 
+    def read_response(self):
+        store = self._store()
+        for line in self.iter_response():
+            store(line)
+
+    def _store(self):
+        if self.sink is None:
+            return self.data.append
+        return self._write_to_sink
+
+    def _write_to_sink(self, line):
+        start = self.data_size
+        end = start + len(line)
+        after = end + 1
+        self.sink[start:end] = line
+        self.sink[end:after] = b"\n"
+        self.data_size = after
+
+    def iter_response(self):
+        """
+        Read the response of the command, yielding its data lines without
+        the prefix as they are read. The lines are not kept by the command,
+        so the message of a CommandError is only the last data line.
+        """
         # x3270 puts data lines (if any) on stdout prefixed with 'data: '
         # followed by two more lines without the prefix.
         # 1: status of the emulator
         # 2: 'ok' or 'error' indicating whether the command succeeded or failed
+        readline = self.app.readline
+        limit = self.max_response_size
+        size = 0
+        line = b""
         while True:
-            line = self.app.readline()
-            # log.debug('stdout line: %s', line.rstrip())       # commented line to reduce log size
-            if not line.startswith("data:".encode("ascii")):
+            previous = line
+            line = readline()
+            if not line.startswith(DATA_PREFIX):
                 # ok, we are at the status line
                 self.status_line = line.rstrip()
-                result = self.app.readline().rstrip()
-                # log.debug('result line: %s', result)          # commented line to reduce log size
-                return self.handle_result(result.decode("utf-8"))
-
-            # remove the 'data: ' prefix and trailing newline char(s) and store
-            self.data.append(line[6:].rstrip("\n\r".encode("utf-8")))
+                result = readline().rstrip()
+                self.response_size = size
+                self.handle_result(result.decode("utf-8"), previous)
+                self._check_size()
+                return
+
+            # remove the 'data: ' prefix and trailing newline char(s)
+            line = line[DATA_OFFSET:].rstrip(LINE_END)
+            size += len(line) + 1
+            if limit is not None and size > limit:
+                # the rest of the response is still read, to keep the
+                # following responses in sync with their commands
+                continue
+            yield line
+
+    def _check_size(self):
+        limit = self.max_response_size
+        if limit is not None and self.response_size > limit:
+            raise ResponseSizeError(
+                "The response of {0} exceeds the maximum size of {1} bytes".format(
+                    self.cmdstr.decode("utf-8"), limit
+                )
+            )
 
-    def handle_result(self, result):
+    def handle_result(self, result, message=None):
         # should receive 'ok' for almost everything, but Quit returns a '' for
         # some reason
         if result == "" and self.cmdstr == b"Quit":
@@ -86,7 +169,9 @@ class Command(object):
 
         msg = b"[no error message]"
         if self.data:
-            msg = "".encode("utf-8").join(self.data).rstrip()
+            msg = b"".join(self.data).rstrip()
+        elif message:
+            msg = message.rstrip()
         raise CommandError(msg.decode("utf-8"))
 
 
@@ -117,6 +202,409 @@ class Status(object):
         return "STATUS: {0}".format(self.as_string)
 
 
+# size of a model 2 screen, which is used as long as the actual size is unknown
+DEFAULT_ROWS = 24
+DEFAULT_COLS = 80
+
+# maximum number of bytes of data in the response of a command, far above
+# what reading even a model 5 screen returns
+DEFAULT_MAX_RESPONSE_SIZE = 1024 * 1024
+
+# commands that neither change the screen buffer nor send anything to the host,
+# and therefore do not invalidate a cached screen snapshot
+READ_ONLY_COMMANDS = frozenset(
+    [
+        b"ascii",
+        b"asciifield",
+        b"backtab",
+        b"down",
+        b"ebcdic",
+        b"ebcdicfield",
+        b"home",
+        b"ignore",
+        b"left",
+        b"movecursor",
+        b"printtext",
+        b"query",
+        b"readbuffer",
+        b"right",
+        b"tab",
+        b"up",
+    ]
+)
+
+
+# commands that send an AID key to the host, whose answer changes the screen
+AID_COMMANDS = frozenset([b"attn", b"clear", b"enter", b"pa", b"pf", b"sysreq"])
+
+
+def command_name(cmdstr):
+    """
+    Return the lower case action name of a command, e.g. b"pf" for b"PF(3)"
+    """
+    return cmdstr.split(b"(", 1)[0].strip().lower()
+
+
+class Field(object):
+    """
+    Represents a field of a formatted screen, i.e. the cells following a
+    field attribute up to the next field attribute
+    """
+
+    # bits of the 3270 field attribute byte
+    PROTECTED = 0x20
+    NUMERIC = 0x10
+    DISPLAY_MASK = 0x0C
+    INTENSIFIED = 0x08
+    NON_DISPLAY = 0x0C
+    MODIFIED = 0x01
+
+    def __init__(self, start, length, attribute, row, col, text=""):
+        """
+        `start` is the 0 based buffer offset of the first cell of the field.
+        `row`/`col` are the 1 based co-ordinates of that cell.
+        """
+        self.start = start
+        self.length = length
+        self.attribute = attribute
+        self.row = row
+        self.col = col
+        self.text = text
+
+    @property
+    def protected(self):
+        return bool(self.attribute & self.PROTECTED)
+
+    @property
+    def numeric(self):
+        return bool(self.attribute & self.NUMERIC)
+
+    @property
+    def intensified(self):
+        return self.attribute & self.DISPLAY_MASK == self.INTENSIFIED
+
+    @property
+    def hidden(self):
+        return self.attribute & self.DISPLAY_MASK == self.NON_DISPLAY
+
+    @property
+    def modified(self):
+        return bool(self.attribute & self.MODIFIED)
+
+    def __repr__(self):
+        return "Field(row={0}, col={1}, length={2}, attribute=0x{3:02x})".format(
+            self.row, self.col, self.length, self.attribute
+        )
+
+
+class Screen(object):
+    """
+    Represents a snapshot of the emulator screen, as returned by a single
+    Ascii() or ReadBuffer(Ascii) command
+    """
+
+    def __init__(self, rows, field_attributes=None, col_number=None):
+        """
+        `field_attributes` is a list of (buffer offset, attribute byte) of
+        the field attributes on the screen, ordered by offset. It is None if
+        the fields of the screen are unknown, e.g. because the snapshot
+        was taken with Ascii().
+
+        `col_number` is the width of the screen, e.g. as returned by
+        Emulator.screen_size(). By default it is the length of the first
+        row, which is shorter if the row contained escaped characters.
+        """
+        row_starts = [0]
+        for row in rows:
+            row_starts.append(row_starts[-1] + len(row))
+        self._set_text("".join(rows), row_starts, field_attributes, col_number)
+        self._rows = list(rows)
+
+    def _set_text(self, text, row_starts, field_attributes=None, col_number=None):
+        # the whole screen is kept in one string, rows are only sliced
+        # from it on demand. row_starts has the offset of every row in
+        # the text, followed by the length of the text. Offsets are always
+        # computed from row_starts, as rows decoded with unicode_escape
+        # can be shorter than the screen is wide.
+        self.text = text
+        self._row_starts = row_starts
+        self._rows = None
+        self._lower_text = None
+        self._checksum = None
+        self.row_number = len(row_starts) - 1
+        if col_number is None:
+            col_number = row_starts[1] if self.row_number else 0
+        self.col_number = col_number
+        self.fields = None
+        self._field_offsets = []
+        if field_attributes is not None:
+            self._index_fields(field_attributes)
+
+    @classmethod
+    def from_ascii(cls, buffer, size, col_number=None):
+        """
+        Create a screen from the data of an Ascii() command, written as
+        newline terminated lines to the first `size` bytes of the bytearray
+        `buffer`, see Command. `col_number` is the width of the screen,
+        see Screen.
+
+        The data is decoded at once, with latin-1 unless it contains a
+        backslash, which is the same as but much faster than decoding every
+        line with unicode_escape.
+        """
+        with memoryview(buffer)[:size] as data:
+            checksum = zlib.adler32(data)
+            if buffer.find(b"\\", 0, size) >= 0:
+                lines = data.tobytes().split(b"\n")[:-1]
+                screen = cls(
+                    [line.decode("unicode_escape") for line in lines],
+                    col_number=col_number,
+                )
+                screen._checksum = checksum
+                return screen
+            text = codecs.latin_1_decode(data)[0]
+        row_starts = [0]
+        end = text.find("\n")
+        while end >= 0:
+            # the offset in the text without the preceding newlines
+            row_starts.append(end + 1 - len(row_starts))
+            end = text.find("\n", end + 1)
+        screen = cls.__new__(cls)
+        screen._set_text(text.replace("\n", ""), row_starts, col_number=col_number)
+        screen._checksum = checksum
+        return screen
+
+    @property
+    def checksum(self):
+        """
+        Adler-32 checksum of the screen, computed over the data of the
+        Ascii() command the screen was read with, see `screen_checksum`.
+        """
+        if self._checksum is None:
+            data = "".join(row + "\n" for row in self.rows)
+            self._checksum = zlib.adler32(data.encode("latin-1", "replace"))
+        return self._checksum
+
+    @property
+    def rows(self):
+        if self._rows is None:
+            text = self.text
+            starts = self._row_starts
+            self._rows = [text[start:end] for start, end in zip(starts, starts[1:])]
+        return self._rows
+
+    def row(self, ypos):
+        """
+        Return the text of row `ypos`, which is 1 based
+        """
+        return self.rows[ypos - 1]
+
+    def _search_text(self, ignore_case):
+        if not ignore_case:
+            return self.text
+        if self._lower_text is None:
+            lower_text = self.text.lower()
+            if len(lower_text) != len(self.text):
+                # a few characters have a lower case of several characters,
+                # which would shift the offsets of the following ones
+                lower_text = "".join(
+                    lower if len(lower) == 1 else char
+                    for char, lower in ((char, char.lower()) for char in self.text)
+                )
+            self._lower_text = lower_text
+        return self._lower_text
+
+    def _occurrences(self, string, ignore_case=False):
+        """
+        Yield the 1 based (ypos, xpos) of the occurrences of `string` that
+        do not span several rows, searching the whole text in place.
+        """
+        text = self._search_text(ignore_case)
+        if ignore_case:
+            string = string.lower()
+        if not string:
+            if self.row_number:
+                yield 1, 1
+            return
+        starts = self._row_starts
+        length = len(string)
+        offset = text.find(string)
+        while offset >= 0:
+            index = bisect.bisect_right(starts, offset) - 1
+            if offset + length <= starts[index + 1]:
+                yield index + 1, offset - starts[index] + 1
+            offset = text.find(string, offset + 1)
+
+    def find_all(self, string, ignore_case=False):
+        """
+        Return a list of the 1 based (ypos, xpos) of all occurrences of
+        `string` on the screen. Strings are not matched across rows.
+        """
+        return list(self._occurrences(string, ignore_case))
+
+    def contains(self, string, ignore_case=False):
+        """
+        Return True if `string` occurs on the screen without spanning
+        several rows, False otherwise.
+        """
+        return next(self._occurrences(string, ignore_case), None) is not None
+
+    @classmethod
+    def from_read_buffer(cls, lines):
+        """
+        Create a screen with its fields from the data lines of a
+        ReadBuffer(Ascii) command.
+
+        Every cell is either the hexadecimal code of a character, a
+        graphic escape GE(xx) or a field attribute SF(c0=xx,...), which is
+        shown as a blank. SA(...) orders only change the character
+        attributes of the following cells and do not occupy a cell.
+        """
+        rows = []
+        field_attributes = []
+        offset = 0
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode("ascii")
+            row = []
+            for token in line.split():
+                if token.startswith("SA("):
+                    continue
+                if token.startswith("SF("):
+                    field_attributes.append((offset, _field_attribute(token)))
+                    row.append(" ")
+                elif token.startswith("GE("):
+                    row.append(_cell_character(token[3:-1]))
+                else:
+                    row.append(_cell_character(token))
+                offset += 1
+            rows.append("".join(row))
+        return cls(rows, field_attributes)
+
+    def _position(self, offset):
+        """
+        Return the 0 based (row, col) of the character at `offset` in the text
+        """
+        row = bisect.bisect_right(self._row_starts, offset) - 1
+        return row, offset - self._row_starts[row]
+
+    def _offset(self, ypos, xpos):
+        """
+        Return the offset in the text of the 1 based `ypos`/`xpos`
+        """
+        return self._row_starts[ypos - 1] + (xpos - 1)
+
+    def _index_fields(self, field_attributes):
+        self.fields = []
+        size = len(self.text)
+        for index, (offset, attribute) in enumerate(field_attributes):
+            # the last field wraps around to the first field attribute
+            next_offset = field_attributes[(index + 1) % len(field_attributes)][0]
+            length = (next_offset - offset - 1) % size
+            start = (offset + 1) % size
+            end = start + length
+            text = (self.text + self.text)[start:end]
+            row, col = self._position(start)
+            self.fields.append(Field(start, length, attribute, row + 1, col + 1, text))
+        self._field_offsets = [offset for offset, _ in field_attributes]
+
+    def field_at(self, ypos, xpos):
+        """
+        Return the field containing screen co-ordinates `ypos`/`xpos`, or None
+        if the screen is unformatted or the co-ordinates are a field attribute.
+
+        Co-ordinates are 1 based, as listed in the status area of the
+        terminal.
+        """
+        if not self.fields:
+            return None
+        offset = self._offset(ypos, xpos)
+        index = bisect.bisect_right(self._field_offsets, offset) - 1
+        if index >= 0 and self._field_offsets[index] == offset:
+            return None
+        # before the first field attribute is the wrapped part of the last field
+        return self.fields[index]
+
+    def field_after(self, ypos, xpos, protected=False):
+        """
+        Return the first field after screen co-ordinates `ypos`/`xpos` that is
+        (un)protected, or None if there is none.
+        """
+        if not self.fields:
+            return None
+        offset = self._offset(ypos, xpos)
+        index = bisect.bisect_right(self._field_offsets, offset)
+        for field in self.fields[index:]:
+            if field.protected == protected:
+                return field
+        return None
+
+    def field_by_label(self, label):
+        """
+        Return the first unprotected field following the text `label`,
+        or None if the label is not on the screen or not followed by an
+        unprotected field.
+        """
+        offset = self.text.find(label)
+        if offset < 0:
+            return None
+        row, col = self._position(offset + len(label) - 1)
+        return self.field_after(row + 1, col + 1)
+
+    def string_get(self, ypos, xpos, length):
+        """
+        Get a string of `length` at screen co-ordinates `ypos`/`xpos`,
+        wrapping to the next row like the ascii() command does.
+
+        Co-ordinates are 1 based, as listed in the status area of the
+        terminal.
+        """
+        start = self._offset(ypos, xpos)
+        end = start + length
+        return self.text[start:end]
+
+    def __str__(self):
+        return "\n".join(self.rows)
+
+
+def _field_attribute(token):
+    # e.g. SF(c0=e8,41=f1), c0 being the 3270 field attribute
+    for attribute in token[3:-1].split(","):
+        kind, _, value = attribute.partition("=")
+        if kind == "c0":
+            return int(value, 16)
+    return 0
+
+
+def screen_checksum(lines):
+    """
+    Return the Adler-32 checksum of the data `lines` of an Ascii() command,
+    each followed by a newline, as computed by Screen.from_ascii
+    """
+    checksum = zlib.adler32(b"")
+    for line in lines:
+        checksum = zlib.adler32(b"\n", zlib.adler32(line, checksum))
+    return checksum
+
+
+def decode_text(data):
+    """
+    Decode a data line of an Ascii() command with unicode_escape, or with
+    the equivalent but much faster latin-1 if it contains no backslash
+    """
+    if b"\\" in data:
+        return data.decode("unicode_escape")
+    return data.decode("latin-1")
+
+
+def _cell_character(code):
+    character = bytes.fromhex(code).decode("utf-8", "replace")
+    # nulls and control characters are shown as blanks, like Ascii() does
+    if character < " ":
+        return " "
+    return character
+
+
 class ExecutableApp(object):
     def append_args(self, extra_args):
         if isinstance(extra_args, list):
@@ -222,7 +710,7 @@ class ExecutableAppWin(ExecutableApp):
 
 
 class x3270App(ExecutableAppLinux):
-    def __init__(self, extra_args):
+    def __init__(self, extra_args, model=None, keep_alive=0):
         self.executable = "x3270"
         # Per Paul Mattes, in the first days of x3270, there were servers that
         # would unlock the keyboard before they had processed the command. To
@@ -233,19 +721,25 @@ class x3270App(ExecutableAppLinux):
             "-xrm",
             "x3270.unlockDelay: False",
             "-xrm",
-            "x3270.model: 2",
+            "x3270.model: {0}".format(model or 2),
             "-script",
         ]
+        if keep_alive:
+            self.args.extend(["-xrm", "x3270.nopSeconds: {0}".format(keep_alive)])
         if extra_args:
             self.append_args(extra_args)
         super().__init__()
 
 
 class s3270App(ExecutableAppLinux):
-    def __init__(self, extra_args):
+    def __init__(self, extra_args, model=None, keep_alive=0):
         self.executable = "s3270"
         # see notes for args in x3270App
         self.args = ["-xrm", "s3270.unlockDelay: False"]
+        if model:
+            self.args.extend(["-xrm", "s3270.model: {0}".format(model)])
+        if keep_alive:
+            self.args.extend(["-xrm", "s3270.nopSeconds: {0}".format(keep_alive)])
         if extra_args:
             self.append_args(extra_args)
         super().__init__()
@@ -256,17 +750,24 @@ class NotConnectedException(Exception):
 
 
 class wc3270App(ExecutableAppWin):
-    def __init__(self, extra_args):
+    def __init__(self, extra_args, model=None, keep_alive=0):
         super().__init__()
         self.executable = "wc3270"
         # see notes for args in x3270App
-        self.args = ["-xrm", "wc3270.unlockDelay: False", "-xrm", "wc3270.model: 2"]
+        self.args = [
+            "-xrm",
+            "wc3270.unlockDelay: False",
+            "-xrm",
+            "wc3270.model: {0}".format(model or 2),
+        ]
+        if keep_alive:
+            self.args.extend(["-xrm", "wc3270.nopSeconds: {0}".format(keep_alive)])
         if extra_args:
             self.append_args(extra_args)
 
 
 class ws3270App(ExecutableAppWin):
-    def __init__(self, extra_args):
+    def __init__(self, extra_args, model=None, keep_alive=0):
         super().__init__()
         self.executable = "ws3270"
         # see notes for args in x3270App
@@ -274,6 +775,10 @@ class ws3270App(ExecutableAppWin):
             "-xrm",
             "ws3270.unlockDelay: False",
         ]
+        if model:
+            self.args.extend(["-xrm", "ws3270.model: {0}".format(model)])
+        if keep_alive:
+            self.args.extend(["-xrm", "ws3270.nopSeconds: {0}".format(keep_alive)])
         if extra_args:
             self.append_args(extra_args)
 
@@ -284,7 +789,20 @@ class Emulator(object):
     with it.
     """
 
-    def __init__(self, visible=False, timeout=30, extra_args=None, app=None, _sp=None):
+    def __init__(
+        self,
+        visible=False,
+        timeout=30,
+        extra_args=None,
+        app=None,
+        _sp=None,
+        cache_screen=False,
+        model=None,
+        instrumentation=None,
+        max_response_size=DEFAULT_MAX_RESPONSE_SIZE,
+        track_screen_changes=False,
+        keep_alive=0,
+    ):
         """
         Create an emulator instance
 
@@ -293,12 +811,41 @@ class Emulator(object):
             to x3270.
         `_sp` is normally not used but can be set to a mock object
             during testing.
+        `cache_screen` controls whether screen snapshots are reused until
+            a command that can change the screen is executed.
+        `model` is the 3270 model number (2, 3, 4 or 5) that determines the
+            screen size. None keeps the default of the executable.
+        `instrumentation` is an instrumentation.Instrumentation that records
+            the time spent writing commands and waiting for their responses.
+        `max_response_size` is the maximum number of bytes of data a command
+            may return, see Command. None does not limit the size.
+        `track_screen_changes` controls whether the screen is read in the
+            same pipeline right before every AID key, so that
+            `wait_for_screen_change` can compare against it.
+        `keep_alive` is the number of seconds after which the emulator sends
+            a TELNET NOP to the host while the session is idle, so that the
+            host does not drop it. 0 sends none.
         """
-        self.app = app or self.create_app(visible, extra_args)
+        self.app = app or self.create_app(visible, extra_args, model, keep_alive)
         self.is_terminated = False
         self.status = Status(None)
         self.timeout = timeout
         self.last_host = None
+        self.cache_screen = cache_screen
+        self.screen_generation = 0
+        self.screen_cache_hits = 0
+        self.screen_cache_misses = 0
+        self._screen_cache = {}
+        # reused for the data of every Ascii() command that reads the screen
+        self._screen_buffer = bytearray(DEFAULT_ROWS * (DEFAULT_COLS + 1))
+        self.instrumentation = instrumentation
+        self.max_response_size = max_response_size
+        self.track_screen_changes = track_screen_changes
+        # checksum of the screen when the last AID key was sent, or when
+        # wait_for_screen_change last saw it change
+        self.last_screen_checksum = None
+        # a trace.TraceRecorder that records the screen every AID key is sent on
+        self.trace = None
 
     def __del__(self):
         """
@@ -309,34 +856,114 @@ class Emulator(object):
         # self.terminate()     # The terminate function is no longer needed in python 3.8
         pass
 
-    def create_app(self, visible, extra_args):
+    def create_app(self, visible, extra_args, model=None, keep_alive=0):
         if os_name == "nt":
             if visible:
-                return wc3270App(extra_args)
-            return ws3270App(extra_args)
+                return wc3270App(extra_args, model, keep_alive)
+            return ws3270App(extra_args, model, keep_alive)
         if visible:
-            return x3270App(extra_args)
-        return s3270App(extra_args)
+            return x3270App(extra_args, model, keep_alive)
+        return s3270App(extra_args, model, keep_alive)
+
+    def screen_size(self):
+        """
+        Return the (rows, cols) of the screen, as reported in the status
+        line of the last command, or 24 x 80 if they are not known yet.
+        """
+        try:
+            return int(self.status.row_number), int(self.status.col_number)
+        except (TypeError, ValueError):
+            return DEFAULT_ROWS, DEFAULT_COLS
 
-    def exec_command(self, cmdstr):
+    def exec_command(self, cmdstr, sink=None):
         """
         Execute an x3270 command
 
         `cmdstr` gets sent directly to the x3270 subprocess on it's stdin.
+        `sink` is an optional bytearray the data of the response is written
+            to instead of the `data` of the returned Command, see Command.
         """
         if self.is_terminated:
             raise TerminatedError("This Emulator instance has been terminated")
+        if self._reads_screen_before(cmdstr):
+            return self.batch([cmdstr])[0]
 
-        # log.debug('sending command: %s', cmdstr)             # commented line to reduce log size
-        c = Command(self.app, cmdstr)
-        # start = time.time()                                  # unnecessary variable if the log is commented out.
-        c.execute()
-        # elapsed = time.time() - start                        # unnecessary variable if the log is commented out.
-        # log.debug('elapsed execution: {0}'.format(elapsed))  # commented line to reduce log size
-        self.status = Status(c.status_line)
+        c = Command(self.app, cmdstr, self.max_response_size, sink)
+        try:
+            if self.instrumentation is None:
+                c.execute()
+            else:
+                name = command_name(c.cmdstr).decode("utf-8")
+                with self.instrumentation.timer(WRITE, name):
+                    c.send()
+                with self.instrumentation.timer(RESPONSE, name):
+                    c.read_response()
+        finally:
+            self._after_command(c)
 
         return c
 
+    def _reads_screen_before(self, cmdstr):
+        if not isinstance(cmdstr, bytes):
+            return False
+        if not self.track_screen_changes and self.trace is None:
+            return False
+        return command_name(cmdstr) in AID_COMMANDS
+
+    def _timer(self, kind, name):
+        if self.instrumentation is None:
+            return nullcontext()
+        return self.instrumentation.timer(kind, name)
+
+    def _split_timer(self, kind, commands):
+        if self.instrumentation is None:
+            return nullcontext()
+        names = [command_name(c.cmdstr).decode("utf-8") for c in commands]
+        return self.instrumentation.split_timer(kind, names)
+
+    def _after_command(self, command):
+        """
+        Update the status and invalidate the cached screen if `command`
+        could have changed it
+        """
+        previous = self.status
+        if command.status_line is not None:
+            self.status = Status(command.status_line)
+        if command_name(command.cmdstr) not in READ_ONLY_COMMANDS:
+            self.invalidate_screen()
+        elif self._host_changed_screen(previous, self.status):
+            self.invalidate_screen()
+
+    @staticmethod
+    def _host_changed_screen(previous, current):
+        """
+        Host-driven updates can only be observed through the status line,
+        so any change besides the cursor position is treated as a screen change.
+        """
+        if not previous.as_string:
+            # nothing can be cached before the first status line was received
+            return False
+        attributes = (
+            "keyboard",
+            "screen_format",
+            "field_protection",
+            "connection_state",
+            "emulator_mode",
+            "row_number",
+            "col_number",
+        )
+        return any(
+            getattr(previous, name) != getattr(current, name) for name in attributes
+        )
+
+    def invalidate_screen(self):
+        """
+        Discard the cached screen snapshot, so the next call to
+        `screen_get` reads the screen from the emulator again.
+        """
+        self.screen_generation += 1
+        self._screen_cache.clear()
+
     def terminate(self):
         """
         terminates the underlying x3270 subprocess. Once called, this
@@ -412,31 +1039,208 @@ class Emulator(object):
                 )
             )
 
-    def move_to(self, ypos, xpos):
+    def wait_for_output(self, timeout):
         """
-        move the cursor to the given co-ordinates.  Co-ordinates are 1
-        based, as listed in the status area of the terminal.
+        Wait until the host changes the screen, for at most `timeout` seconds.
+
+        Returns True if the screen was changed and False if the wait timed out.
+        x3270 only accepts whole seconds, so `timeout` is rounded up.
+        """
+        return self._wait("Output", timeout)
+
+    def wait_for_unlock(self, timeout, interval=0.05):
+        """
+        Wait until the host unlocks the keyboard, for at most `timeout` seconds.
+
+        Returns True if the keyboard was unlocked and False if the wait timed out.
+        x3270 only accepts whole seconds, so timeouts below one second are not
+        waited for with Wait(), but by polling the status of the keyboard
+        every `interval` seconds.
+        """
+        if timeout >= 1:
+            return self._wait("Unlock", timeout)
+        deadline = time.monotonic() + timeout
+        while self.status.keyboard != b"U":
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(interval, remaining))
+            self.exec_command(b"Ignore")
+        return True
+
+    def wait_for_screen_change(self, timeout):
+        """
+        Wait until the screen differs from the screen when the last AID key
+        was sent, for at most `timeout` seconds. Without `track_screen_changes`,
+        or if the change was already returned by a previous call, wait
+        until the screen differs from the screen it was changed to.
+
+        The screen is only read again after x3270 reports output from the
+        host. Returns True if the screen changed and False if the wait
+        timed out.
+        """
+        deadline = time.monotonic() + timeout
+        checksum = self.screen_get(refresh=True).checksum
+        baseline = self.last_screen_checksum
+        if baseline is None:
+            baseline = self.last_screen_checksum = checksum
+        while checksum == baseline:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.wait_for_output(remaining):
+                return False
+            checksum = self.screen_get(refresh=True).checksum
+        self.last_screen_checksum = checksum
+        return True
+
+    def wait_for_stable_screen(self, stable_time, timeout, interval=0.05):
+        """
+        Wait until the screen has not changed for `stable_time` seconds,
+        for at most `timeout` seconds. The checksum of the screen is
+        compared every `interval` seconds.
+
+        Returns True if the screen became stable and False if the wait timed out.
+        """
+        deadline = time.monotonic() + timeout
+        checksum = self.screen_get(refresh=True).checksum
+        stable_since = time.monotonic()
+        while True:
+            now = time.monotonic()
+            if now - stable_since >= stable_time:
+                return True
+            if now >= deadline:
+                return False
+            time.sleep(
+                min(interval, deadline - now, stable_time - (now - stable_since))
+            )
+            current = self.screen_get(refresh=True).checksum
+            if current != checksum:
+                checksum = current
+                stable_since = time.monotonic()
+
+    @staticmethod
+    def _wait_command(condition, timeout):
+        timeout = max(1, int(math.ceil(timeout)))
+        return "Wait({0}, {1})".format(timeout, condition).encode("utf-8")
+
+    def _wait(self, condition, timeout):
+        try:
+            self.exec_command(self._wait_command(condition, timeout))
+        except CommandError as e:
+            if "timed out" not in str(e).lower():
+                raise
+            return False
+        return True
+
+    def batch(self, cmdstrs):
+        """
+        Execute several x3270 commands in a pipeline
+
+        All commands in `cmdstrs` are written to the emulator at once, and
+        their responses are read afterwards in the same order, which saves
+        one round trip per command compared to `exec_command`.
+
+        Returns the executed Command objects, each with its own `status_line`,
+        `data` and `error`. If any command failed, the CommandError of the
+        first failed command is raised after all responses have been read.
+        Note that the emulator still executes the commands following a
+        failed one.
         """
+        if self.is_terminated:
+            raise TerminatedError("This Emulator instance has been terminated")
+
+        commands = [
+            Command(self.app, cmdstr, self.max_response_size) for cmdstr in cmdstrs
+        ]
+        snapshot = None
+        for index, cmdstr in enumerate(cmdstrs):
+            if self._reads_screen_before(cmdstr):
+                aid = cmdstr
+                rows, cols = self.screen_size()
+                snapshot = Command(
+                    self.app,
+                    "Ascii(0,0,{0},{1})".format(rows, cols).encode("utf-8"),
+                    self.max_response_size,
+                )
+                commands.insert(index, snapshot)
+                break
+        with self._split_timer(WRITE, commands):
+            self.app.write(b"".join(c.cmdstr + b"\n" for c in commands))
+        first_error = None
+        for c in commands:
+            try:
+                with self._timer(RESPONSE, command_name(c.cmdstr).decode("utf-8")):
+                    c.read_response()
+            except CommandError as e:
+                c.error = e
+                if c is not snapshot:
+                    first_error = first_error or e
+            finally:
+                self._after_command(c)
+        if snapshot is not None:
+            commands.remove(snapshot)
+            if snapshot.error is None:
+                self.last_screen_checksum = screen_checksum(snapshot.data)
+                if self.trace is not None:
+                    self._record_trace(aid, snapshot.data, cols)
+        if first_error:
+            raise first_error
+        return commands
+
+    def _record_trace(self, aid, lines, cols):
+        # the AID key has already been sent, so a failing trace must not
+        # make the command fail
+        try:
+            screen = Screen([decode_text(line) for line in lines], col_number=cols)
+            self.trace.record(aid.decode("utf-8"), screen)
+        except Exception:
+            log.warning("could not record the screen in the trace", exc_info=True)
+
+    @staticmethod
+    def _move_to_command(ypos, xpos):
         # the screen's co-ordinates are 1 based, but the command is 0 based
         xpos -= 1
         ypos -= 1
-        self.exec_command("MoveCursor({0}, {1})".format(ypos, xpos).encode("utf-8"))
+        return "MoveCursor({0}, {1})".format(ypos, xpos).encode("utf-8")
+
+    @staticmethod
+    def _string_command(tosend):
+        # escape double quotes in the data to send
+        tosend = tosend.decode("utf-8").replace('"', '"')
+        return 'String("{0}")'.format(tosend).encode("utf-8")
 
-    def send_string(self, tosend, ypos=None, xpos=None):
+    def _at_position(self, cmdstrs, ypos, xpos):
+        """
+        Execute `cmdstrs` at screen co-ordinates `ypos`/`xpos` if they are
+        both given, moving the cursor in the same pipeline.
+        """
+        if xpos is not None and ypos is not None:
+            cmdstrs = [self._move_to_command(ypos, xpos)] + cmdstrs
+        if len(cmdstrs) == 1:
+            self.exec_command(cmdstrs[0])
+        else:
+            self.batch(cmdstrs)
+
+    def move_to(self, ypos, xpos):
+        """
+        move the cursor to the given co-ordinates.  Co-ordinates are 1
+        based, as listed in the status area of the terminal.
+        """
+        self.exec_command(self._move_to_command(ypos, xpos))
+
+    def send_string(self, tosend, ypos=None, xpos=None, enter=False):
         """
         Send a string to the screen at the current cursor location or at
         screen co-ordinates `ypos`/`xpos` if they are both given.
+        If `enter` is True, Enter is sent once the string has been written
+        successfully, so that no AID key reaches the host after e.g. a
+        keyboard lock made the string fail.
 
         Co-ordinates are 1 based, as listed in the status area of the
         terminal.
         """
-        if xpos is not None and ypos is not None:
-            self.move_to(ypos, xpos)
-
-        # escape double quotes in the data to send
-        tosend = tosend.decode("utf-8").replace('"', '"')
-
-        self.exec_command('String("{0}")'.format(tosend).encode("utf-8"))
+        self._at_position([self._string_command(tosend)], ypos, xpos)
+        if enter:
+            self.send_enter()
 
     def send_enter(self):
         self.exec_command(b"Enter")
@@ -474,7 +1278,52 @@ class Emulator(object):
         )
         # this usage of utf-8 should only return a single line of data
         assert len(cmd.data) == 1, cmd.data
-        return cmd.data[0].decode("unicode_escape")
+        return decode_text(cmd.data[0])
+
+    def screen_get(self, rows=None, cols=None, refresh=False):
+        """
+        Get a snapshot of the first `rows` x `cols` cells of the screen
+        with a single Ascii() command, instead of one ascii() command per row.
+        By default, the whole screen is read, see `screen_size`.
+
+        If screen caching is enabled, the snapshot is reused until a command
+        that can change the screen is executed, unless `refresh` is True.
+        The snapshot is not cached while the keyboard is locked, as the host
+        may still be updating the screen.
+        """
+        if rows is None or cols is None:
+            size = self.screen_size()
+            rows, cols = rows or size[0], cols or size[1]
+        key = (rows, cols)
+        if self.cache_screen and not refresh and key in self._screen_cache:
+            self.screen_cache_hits += 1
+            return self._screen_cache[key]
+        self.screen_cache_misses += 1
+        cmd = self.exec_command(
+            "Ascii(0,0,{0},{1})".format(rows, cols).encode("utf-8"),
+            sink=self._screen_buffer,
+        )
+        screen = Screen.from_ascii(self._screen_buffer, cmd.data_size, cols)
+        if self.cache_screen and self.status.keyboard == b"U":
+            self._screen_cache[key] = screen
+        return screen
+
+    def read_buffer(self, refresh=False):
+        """
+        Get a snapshot of the screen including its fields with a single
+        ReadBuffer(Ascii) command. It is cached like the snapshots of
+        `screen_get`.
+        """
+        key = "buffer"
+        if self.cache_screen and not refresh and key in self._screen_cache:
+            self.screen_cache_hits += 1
+            return self._screen_cache[key]
+        self.screen_cache_misses += 1
+        cmd = self.exec_command(b"ReadBuffer(Ascii)")
+        screen = Screen.from_read_buffer(cmd.data)
+        if self.cache_screen and self.status.keyboard == b"U":
+            self._screen_cache[key] = screen
+        return screen
 
     def string_found(self, ypos, xpos, string):
         """
@@ -488,12 +1337,20 @@ class Emulator(object):
         log.debug('string_found() saw "{0}"'.format(found))
         return found == string
 
-    def delete_field(self):
+    def delete_char(self, ypos=None, xpos=None):
+        """
+        Delete the character at the current cursor location or at screen
+        co-ordinates `ypos`/`xpos` if they are both given.
         """
-        Delete contents in field at current cursor location and positions
+        self._at_position([b"Delete"], ypos, xpos)
+
+    def delete_field(self, ypos=None, xpos=None):
+        """
+        Delete contents in field at current cursor location, or at screen
+        co-ordinates `ypos`/`xpos` if they are both given, and positions
         cursor at beginning of field.
         """
-        self.exec_command(b"DeleteField")
+        self._at_position([b"DeleteField"], ypos, xpos)
 
     def fill_field(self, ypos, xpos, tosend, length):
         """
@@ -511,10 +1368,29 @@ class Emulator(object):
         """
         if length - len(tosend) < 0:
             raise FieldTruncateError('length limit %d, but got "%s"' % (length, tosend))
-        if xpos is not None and ypos is not None:
-            self.move_to(ypos, xpos)
-        self.delete_field()
-        self.send_string(tosend)
+        self._at_position([b"DeleteField", self._string_command(tosend)], ypos, xpos)
+
+    def fill_fields(self, fields):
+        """
+        clears the fields at the positions given and inserts the strings,
+        with a single pipeline for all fields
+
+        fields: a list of (ypos, xpos, tosend)
+
+        Co-ordinates are 1 based, as listed in the status area of the
+        terminal.
+        """
+        cmdstrs = []
+        for ypos, xpos, tosend in fields:
+            cmdstrs.extend(
+                [
+                    self._move_to_command(ypos, xpos),
+                    b"DeleteField",
+                    self._string_command(tosend),
+                ]
+            )
+        if cmdstrs:
+            self.batch(cmdstrs)
 
     def save_screen(self, file_path):
         self.exec_command("PrintText(html,file,{0})".format(file_path).encode("utf-8"))
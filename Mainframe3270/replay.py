@@ -0,0 +1,200 @@
+"""
+Record the commands an emulator sends to x3270/s3270 together with their
+responses, and replay them later without an emulator and without a host.
+"""
+
+import json
+from collections import deque
+
+# commands that only read the screen or its status, or wait, which may be sent
+# more or less often than they were recorded. Commands that move the cursor are
+# not among them, as they change what the following commands do.
+SKIPPABLE_COMMANDS = frozenset(
+    [
+        b"ascii",
+        b"asciifield",
+        b"ebcdic",
+        b"ebcdicfield",
+        b"ignore",
+        b"query",
+        b"readbuffer",
+        b"wait",
+    ]
+)
+
+
+class ReplayError(Exception):
+    pass
+
+
+def command_key(cmdstr):
+    """
+    Return the key `cmdstr` is matched with in a transcript. The key is the
+    command with the action name in lower case, without the host of Connect()
+    and without the timeouts of Wait(), which differ between runs.
+    """
+    name, _, args = cmdstr.strip().partition(b"(")
+    name = name.strip().lower()
+    if name == b"connect":
+        return name
+    if name == b"wait":
+        args = b",".join(
+            arg.strip()
+            for arg in args.rstrip(b") ").split(b",")
+            if arg.strip() and not arg.strip().replace(b".", b"", 1).isdigit()
+        )
+        return name + b"(" + args + b")"
+    if args:
+        return name + b"(" + args
+    return name
+
+
+def _encode(line):
+    return line.decode("utf-8", "surrogateescape")
+
+
+def _decode(text):
+    return text.encode("utf-8", "surrogateescape")
+
+
+def read_transcript(path):
+    """
+    Return the (command, response lines) of the transcript at `path`
+    """
+    entries = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                entry = json.loads(line)
+                entries.append(
+                    (_decode(entry["command"]), [_decode(r) for r in entry["response"]])
+                )
+    return entries
+
+
+class RecordingApp(object):
+    """
+    Wraps the app of an Emulator, e.g. s3270App, and appends every command
+    written to it and the response read for it to a JSONL transcript, one
+    {"command": ..., "response": [...]} per line
+    """
+
+    def __init__(self, app, path):
+        self.app = app
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+        # commands written whose responses have not been read completely
+        self.pending = deque()
+        self.response = []
+        self.status_read = False
+
+    def connect(self, host):
+        return self.app.connect(host)
+
+    def close(self):
+        self.app.close()
+        self.file.close()
+
+    def write(self, data):
+        self.pending.extend(line for line in data.split(b"\n") if line.strip())
+        self.app.write(data)
+
+    def readline(self):
+        line = self.app.readline()
+        self.response.append(line.rstrip(b"\r\n"))
+        if self.status_read:
+            # the result line, ok or error, ends the response
+            self._write_entry()
+        elif not line.startswith(b"data:"):
+            self.status_read = True
+        return line
+
+    def _write_entry(self):
+        command = self.pending.popleft() if self.pending else b""
+        entry = {
+            "command": _encode(command),
+            "response": [_encode(line) for line in self.response],
+        }
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+        self.response = []
+        self.status_read = False
+
+
+class ReplayApp(object):
+    """
+    Stands in for the app of an Emulator, e.g. s3270App, and answers the
+    commands written to it from a transcript written by RecordingApp,
+    without any process, host or latency.
+
+    The commands are matched with the transcript in order. Commands that
+    only read the screen, like Ascii() or Query(), and Wait() may be sent
+    more or less often than they were recorded: further ones are
+    answered with the last recorded response to the same command, or for
+    Wait() with the last status, and recorded ones that are not sent are
+    skipped. Any other command that does not match the transcript raises
+    a ReplayError.
+    """
+
+    def __init__(self, transcript):
+        """
+        `transcript` is the path of a transcript, or a list of
+        (command, response lines) as returned by `read_transcript`
+        """
+        if isinstance(transcript, str):
+            transcript = read_transcript(transcript)
+        self.entries = [
+            (command_key(command), command, response)
+            for command, response in transcript
+        ]
+        self.position = 0
+        self.last_responses = {}
+        self.status_line = None
+        self.lines = deque()
+
+    def connect(self, host):
+        return False
+
+    def close(self):
+        pass
+
+    def write(self, data):
+        for cmdstr in data.split(b"\n"):
+            if cmdstr.strip():
+                self.lines.extend(line + b"\n" for line in self._answer(cmdstr))
+
+    def readline(self):
+        if self.lines:
+            return self.lines.popleft()
+        # like the pipe of an emulator that has exited
+        return b""
+
+    def _can_skip(self, key):
+        return key.split(b"(", 1)[0] in SKIPPABLE_COMMANDS
+
+    def _answer(self, cmdstr):
+        key = command_key(cmdstr)
+        for index in range(self.position, len(self.entries)):
+            entry_key, _, response = self.entries[index]
+            if entry_key == key:
+                self.position = index + 1
+                self.last_responses[key] = response
+                if len(response) >= 2:
+                    self.status_line = response[-2]
+                return response
+            if not self._can_skip(entry_key):
+                break
+        if key in self.last_responses and self._can_skip(key):
+            return self.last_responses[key]
+        if key.startswith(b"wait(") and self.status_line is not None:
+            return [self.status_line, b"ok"]
+        if key == b"quit":
+            return []
+        expected = "the end of the transcript"
+        if self.position < len(self.entries):
+            expected = self.entries[self.position][1].decode("utf-8", "replace")
+        raise ReplayError(
+            "{0} does not match the transcript at command {1}, expected {2}".format(
+                cmdstr.decode("utf-8", "replace"), self.position + 1, expected
+            )
+        )
@@ -0,0 +1,117 @@
+import hashlib
+import html
+import os
+import re
+import zipfile
+from typing import Set
+
+# how Take Screenshot stores screenshots, see x3270.take_screenshot
+FILE = "file"
+INLINE = "inline"
+TEXT = "text"
+ARCHIVE = "archive"
+SCREENSHOT_MODES = (FILE, INLINE, TEXT, ARCHIVE)
+
+# the archives written by this process, which are appended to instead of
+# replacing the archives of a previous run
+_written_archives: Set[str] = set()
+
+SCREEN_STYLE = (
+    "display: inline-block; margin: 0; padding: 4px; "
+    "font-family: monospace; background: black; color: #33ff33"
+)
+
+
+def render_text(screen):
+    """
+    Return the rows of `screen` as plain text, one line per row
+    """
+    return "\n".join(screen.rows)
+
+
+def render_html(screen):
+    """
+    Return `screen` as a html pre element, which can be embedded into the log
+    """
+    return '<pre style="%s">%s</pre>' % (
+        SCREEN_STYLE,
+        html.escape(render_text(screen), quote=False),
+    )
+
+
+def render_html_document(screen):
+    """
+    Return `screen` as a html document, like PrintText(html) writes it
+    """
+    return (
+        '<html><head><meta charset="utf-8"></head><body>%s</body></html>\n'
+        % render_html(screen)
+    )
+
+
+def screen_hash(screen):
+    """
+    Return a hash of the size and the text of `screen`, which names the
+    screenshots of equal screens alike
+    """
+    digest = hashlib.sha1(
+        ("%sx%s\n%s" % (screen.row_number, screen.col_number, screen.text)).encode(
+            "utf-8", "replace"
+        )
+    )
+    return digest.hexdigest()[:16]
+
+
+def archive_name(suite_name):
+    """
+    Return the file name of the screenshot archive of the suite `suite_name`
+    """
+    return "screenshots_%s.zip" % re.sub(r"[^\w.-]+", "_", suite_name).strip("_")
+
+
+class ScreenshotArchive(object):
+    """
+    Collects rendered screenshots in memory and writes them to a single
+    compressed zip archive, instead of one file per screenshot
+    """
+
+    def __init__(self):
+        # (file name in the archive, content)
+        self.entries = []
+        self.names = set()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def add(self, name, content):
+        self.entries.append((name, content))
+        self.names.add(name)
+
+    def write(self, path):
+        """
+        Write the collected screenshots to the archive at `path` and forget
+        them. An archive of a previous run is replaced, one written before by
+        this process is appended to, skipping the names it already contains.
+        Returns the number of screenshots written.
+        """
+        entries, self.entries = self.entries, []
+        self.names = set()
+        if not entries:
+            return 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        key = os.path.abspath(path)
+        mode = "a" if key in _written_archives and os.path.exists(path) else "w"
+        _written_archives.add(key)
+        written = 0
+        with zipfile.ZipFile(path, mode, zipfile.ZIP_DEFLATED) as archive:
+            existing = set(archive.namelist())
+            for name, content in entries:
+                if name not in existing:
+                    archive.writestr(name, content)
+                    written += 1
+        return written
@@ -0,0 +1,42 @@
+import re
+from functools import lru_cache
+
+from robot.utils import Matcher
+
+# number of compiled patterns of each kind kept by the pattern caches
+PATTERN_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_regex(pattern, flags=0):
+    """
+    Return the compiled regular expression `pattern`, compiling it only on first use
+    """
+    return re.compile(pattern, flags)
+
+
+@lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def glob_matcher(pattern):
+    """
+    Return a case and space sensitive robot.utils.Matcher for the glob `pattern`
+    """
+    return Matcher(pattern, caseless=False, spaceless=False)
+
+
+def pattern_cache_info():
+    """
+    Return a dictionary with the hits, misses and current size of each pattern cache
+    """
+    caches = {
+        "regex": compile_regex,
+        "match": glob_matcher,
+    }
+    info = {}
+    for name, cache in caches.items():
+        stats = cache.cache_info()
+        info[name] = {
+            "hits": stats.hits,
+            "misses": stats.misses,
+            "size": stats.currsize,
+        }
+    return info
@@ -0,0 +1,124 @@
+import atexit
+import logging
+import os
+import time
+
+from .lu_allocator import lu_allocator
+
+log = logging.getLogger(__name__)
+
+
+class SessionPool(object):
+    """
+    Keeps connected emulators after they have been closed, so the next
+    connection with the same parameters can reuse them instead of spawning
+    a new emulator and negotiating a new session with the host.
+    """
+
+    def __init__(self, max_size=0, max_idle=300):
+        """
+        `max_size` is the maximum number of idle emulators kept in the pool.
+            0 disables the pool.
+        `max_idle` is the number of seconds an idle emulator is kept before
+            it is terminated.
+        """
+        self.max_size = max_size
+        self.max_idle = max_idle
+        # (key, emulator, time it was returned, LU lease), the most recently
+        # returned last
+        self._idle = []
+
+    def __len__(self):
+        return len(self._idle)
+
+    @staticmethod
+    def make_key(visible, credential, extra_args=None, model=None):
+        """
+        Return the key under which emulators with these connection parameters are pooled
+        """
+        if isinstance(extra_args, list):
+            extra_args = tuple(extra_args)
+        elif extra_args is not None:
+            extra_args = os.fspath(extra_args)
+        return (bool(visible), credential, extra_args, model)
+
+    def checkout(self, key):
+        """
+        Return an idle emulator that is still connected with the parameters
+        of `key`, or None if there is none.
+        """
+        self.evict_expired()
+        for index in reversed(range(len(self._idle))):
+            if self._idle[index][0] != key:
+                continue
+            entry = self._idle.pop(index)
+            emulator = entry[1]
+            if self._is_healthy(emulator):
+                log.debug("reusing pooled emulator for %s", key[1])
+                emulator.invalidate_screen()
+                return emulator
+            self._terminate(entry)
+        return None
+
+    def checkin(self, key, emulator, lu_lease=None):
+        """
+        Return `emulator` to the pool. If the pool is full, the emulator
+        that has been idle the longest is terminated.
+
+        `lu_lease` is the (host, LU) leased from the lu_allocator for the
+        session of the emulator, which is released once the emulator is
+        terminated by the pool.
+
+        Returns False if the pool is disabled, in which case the caller
+        has to terminate the emulator itself.
+        """
+        if self.max_size <= 0:
+            return False
+        self.evict_expired()
+        while len(self._idle) >= self.max_size:
+            self._terminate(self._idle.pop(0))
+        self._idle.append((key, emulator, time.monotonic(), lu_lease))
+        return True
+
+    def evict_expired(self):
+        """
+        Terminate all emulators that have been idle longer than `max_idle` seconds
+        """
+        oldest_allowed = time.monotonic() - self.max_idle
+        expired = [entry for entry in self._idle if entry[2] < oldest_allowed]
+        self._idle = [entry for entry in self._idle if entry[2] >= oldest_allowed]
+        for entry in expired:
+            self._terminate(entry)
+
+    def clear(self):
+        """
+        Terminate all idle emulators
+        """
+        idle, self._idle = self._idle, []
+        for entry in idle:
+            self._terminate(entry)
+
+    @staticmethod
+    def _is_healthy(emulator):
+        from .py3270 import CommandError, TerminatedError
+
+        try:
+            return emulator.is_connected()
+        except (CommandError, TerminatedError, ValueError, OSError):
+            return False
+
+    @staticmethod
+    def _terminate(entry):
+        _, emulator, _, lu_lease = entry
+        try:
+            emulator.terminate()
+        except OSError:
+            pass
+        if lu_lease:
+            # unless the LU was acquired again for a new session meanwhile
+            lu_allocator.release_kept(*lu_lease)
+
+
+# shared by all library instances, so idle emulators survive the end of a suite
+session_pool = SessionPool()
+atexit.register(session_pool.clear)
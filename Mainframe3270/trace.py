@@ -0,0 +1,166 @@
+"""
+Session traces record the screens of an emulator session in a compact
+JSONL file, see TraceRecorder. They can be viewed or exported with
+
+    python -m Mainframe3270.trace TRACE [--html FILE]
+
+which prints every screen of the trace as text, or writes them all to a
+single html file.
+"""
+
+import argparse
+import html
+import json
+import sys
+import time
+
+from .screenshot import SCREEN_STYLE
+
+TRACE_VERSION = 1
+
+
+def row_changes(previous, current):
+    """
+    Return [row, col, text] for every row that differs between the lists of
+    rows `previous` and `current`. text replaces the characters of the row
+    from col, which is 0 based. A row whose length changed, e.g. because it
+    contained escaped characters, is returned as [row, text] with the whole
+    row instead.
+    """
+    changes = []
+    for index, (old, new) in enumerate(zip(previous, current)):
+        if old == new:
+            continue
+        if len(old) != len(new):
+            changes.append([index, new])
+            continue
+        start = 0
+        while old[start] == new[start]:
+            start += 1
+        end = len(new)
+        while old[end - 1] == new[end - 1]:
+            end -= 1
+        changes.append([index, start, new[start:end]])
+    return changes
+
+
+def apply_changes(rows, changes):
+    """
+    Apply the `changes` of a trace entry to the list of rows `rows` in place
+    """
+    for change in changes:
+        if len(change) == 2:
+            index, text = change
+            rows[index] = text
+            continue
+        index, col, text = change
+        row = rows[index]
+        end = col + len(text)
+        rows[index] = row[:col] + text + row[end:]
+
+
+class TraceRecorder(object):
+    """
+    Appends the screens of a session to a JSONL file. The first screen, and
+    every screen with another size than the previous one, is stored with
+    all of its rows. All other screens are stored as the changed parts of
+    their rows, so a trace of a whole session usually takes kilobytes.
+
+    Every line after the header is an entry like
+    {"time": 1.25, "key": "Enter", "changes": [[row, col, text], ...]},
+    see row_changes,
+    with "size": [rows, cols] and "rows" instead of "changes" for full
+    screens. "time" is the number of seconds since the trace was started,
+    "key" is the AID key that was sent on the screen, or null for the last
+    screen of the trace.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8")
+        self.start = time.monotonic()
+        self.rows = None
+        self.size = None
+        self.entries = 0
+        self._write({"trace": TRACE_VERSION, "start": time.time()})
+
+    def _write(self, entry):
+        self.file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def record(self, key, screen):
+        """
+        Record `screen`, the screen the AID key `key` was sent on
+        """
+        rows = list(screen.rows)
+        entry = {"time": round(time.monotonic() - self.start, 3), "key": key}
+        size = [screen.row_number, screen.col_number]
+        if self.rows is None or size != self.size:
+            self.size = size
+            entry["size"] = size
+            entry["rows"] = rows
+        else:
+            entry["changes"] = row_changes(self.rows, rows)
+        self.rows = rows
+        self.entries += 1
+        self._write(entry)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def read_trace(path):
+    """
+    Yield (time, key, rows) for every screen of the trace at `path`
+    """
+    rows = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            entry = json.loads(line)
+            if "trace" in entry:
+                # the header of a trace, several traces can be appended
+                continue
+            if "rows" in entry:
+                rows = list(entry["rows"])
+            else:
+                apply_changes(rows, entry["changes"])
+            yield entry["time"], entry["key"], list(rows)
+
+
+def export_text(path, output):
+    for number, (seconds, key, rows) in enumerate(read_trace(path), 1):
+        output.write("--- screen %s at %.3fs, key %s\n" % (number, seconds, key))
+        output.write("\n".join(rows) + "\n")
+
+
+def export_html(path, output):
+    output.write('<html><head><meta charset="utf-8"></head><body>\n')
+    for number, (seconds, key, rows) in enumerate(read_trace(path), 1):
+        output.write(
+            "<h4>screen %s at %.3fs, key %s</h4>\n"
+            % (number, seconds, html.escape(str(key)))
+        )
+        output.write(
+            '<pre style="%s">%s</pre>\n'
+            % (SCREEN_STYLE, html.escape("\n".join(rows), quote=False))
+        )
+    output.write("</body></html>\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m Mainframe3270.trace",
+        description="Show the screens of a session trace",
+    )
+    parser.add_argument("trace", help="path of the trace file")
+    parser.add_argument("--html", help="write the screens to this html file")
+    options = parser.parse_args(argv)
+    if options.html:
+        with open(options.html, "w", encoding="utf-8") as output:
+            export_html(options.trace, output)
+    else:
+        export_text(options.trace, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
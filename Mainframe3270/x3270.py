@@ -1,15 +1,46 @@
 import os
 import re
-import socket
 import time
-from typing import Any, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
 from robot.api import logger
 from robot.api.deco import keyword
-from robot.libraries.BuiltIn import BuiltIn, RobotNotRunningError
-from robot.utils import Matcher
 
-from .py3270 import Emulator
+from .instrumentation import SLEEP, Instrumentation
+from .lu_allocator import expand_lu_pool, lu_allocator
+from .replay import RecordingApp, ReplayApp
+from .screenshot import (
+    ARCHIVE,
+    FILE,
+    INLINE,
+    SCREENSHOT_MODES,
+    TEXT,
+    ScreenshotArchive,
+    archive_name,
+    render_html,
+    render_html_document,
+    render_text,
+    screen_hash,
+)
+from .search import compile_regex, glob_matcher, pattern_cache_info
+from .session_pool import SessionPool, session_pool
+from .trace import TraceRecorder
+
+if TYPE_CHECKING:
+    from .py3270 import Emulator, Screen
+
+# attributes of the current connection, which are kept for each alias while
+# another connection is the current one
+CONNECTION_ATTRIBUTES = (
+    "alias",
+    "mf",
+    "host",
+    "port",
+    "lu",
+    "credential",
+    "_session_key",
+    "_lu_lease",
+)
 
 
 class x3270(object):
@@ -20,18 +51,72 @@ class x3270(object):
         wait_time: float,
         wait_time_after_write: float,
         img_folder: str,
+        cache_screen: bool = False,
+        adaptive_wait: bool = False,
+        screen_stable_time: float = 0.0,
+        session_pool_size: int = 0,
+        session_max_idle: float = 300,
+        model: Optional[str] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        keep_alive: int = 0,
+        screenshot_mode: str = FILE,
+        deduplicate_screenshots: bool = False,
+        track_screen_changes: bool = False,
     ) -> None:
+        if screenshot_mode not in SCREENSHOT_MODES:
+            raise ValueError(
+                f"screenshot_mode must be one of {', '.join(SCREENSHOT_MODES)}, "
+                f"not '{screenshot_mode}'"
+            )
         self.visible = visible
         self.timeout = timeout
         self.wait = wait_time
         self.wait_write = wait_time_after_write
         self.imgfolder = img_folder
-        self.mf: Emulator = None  # type: ignore
-        # Try Catch to run in Pycharm, and make a documentation in libdoc with no error
-        try:
-            self.output_folder = BuiltIn().get_variable_value("${OUTPUT DIR}")
-        except RobotNotRunningError:
-            self.output_folder = os.getcwd()
+        self.cache_screen = cache_screen
+        self.adaptive_wait = adaptive_wait
+        self.screen_stable_time = screen_stable_time
+        self.model = model
+        self.instrumentation = instrumentation
+        self.keep_alive = keep_alive
+        self.screenshot_mode = screenshot_mode
+        self.deduplicate_screenshots = deduplicate_screenshots
+        self.track_screen_changes = track_screen_changes
+        self.screenshot_archive = ScreenshotArchive()
+        self.session_pool = None
+        if session_pool_size:
+            self.session_pool = session_pool
+            self.session_pool.max_size = session_pool_size
+            self.session_pool.max_idle = session_max_idle
+        self.alias: Optional[str] = None
+        self.host: Optional[str] = None
+        self.port: Optional[int] = None
+        self.lu: Optional[str] = None
+        self.credential: Optional[str] = None
+        self._session_key: Any = None
+        self._lu_lease: Optional[Tuple[str, str]] = None
+        self.mf: "Emulator" = None  # type: ignore
+        # the connections that are open besides the current one, by alias
+        self._connections: Dict[Optional[str], Dict[str, Any]] = {}
+        self._output_folder: Optional[str] = None
+
+    @property
+    def output_folder(self) -> str:
+        # BuiltIn is only imported and asked for the output directory when it is
+        # first needed, which keeps importing and instantiating the library cheap
+        if self._output_folder is None:
+            from robot.libraries.BuiltIn import BuiltIn, RobotNotRunningError
+
+            # Try Catch to run in Pycharm, and make a documentation in libdoc with no error
+            try:
+                self._output_folder = BuiltIn().get_variable_value("${OUTPUT DIR}")
+            except RobotNotRunningError:
+                self._output_folder = os.getcwd()
+        return self._output_folder
+
+    @output_folder.setter
+    def output_folder(self, value: str) -> None:
+        self._output_folder = value
 
     @keyword("Change Timeout")
     def change_timeout(self, seconds: int) -> None:
@@ -50,6 +135,10 @@ class x3270(object):
         LU: Optional[str] = None,
         port: int = 23,
         extra_args: Optional[Union[List[str], os.PathLike]] = None,
+        lu_pool: Optional[Union[List[str], str]] = None,
+        alias: Optional[str] = None,
+        record_transcript: Optional[str] = None,
+        replay_transcript: Optional[str] = None,
     ):
         """Create a connection to IBM3270 mainframe with the default port 23. To make a connection with the mainframe
         you only must inform the Host. You can pass the Logical Unit Name and the Port as optional.
@@ -67,6 +156,28 @@ class x3270(object):
 
         Please make sure the arguments you are providing are available for your specific x3270 application and version.
 
+        When tests run in parallel, e.g. with pabot, each connection needs its own LU. Instead of ``LU``,
+        you can pass a ``lu_pool``, either as a list, as a comma separated string or as a range like
+        ``TERM01-TERM16``. The first LU of the pool that is not leased by another process on the same machine
+        is then used, and released again by `Close Connection`. If all LUs are in use, the keyword fails.
+
+        If the library was imported with a ``session_pool_size``, an emulator that was closed with the same
+        host, LU, port and ``extra_args`` is reused, as long as it is still connected. It is on the screen
+        where it was left by `Close Connection`.
+
+        To keep several connections open at the same time, e.g. to one region for entering data and
+        to another for verifying it, give each of them an ``alias``. Opening a connection closes only
+        the current connection if it has the same alias, or if neither has an alias. Connections with
+        other aliases stay open, and `Switch Connection` makes one of them the current connection again.
+
+        To test keywords without a host, e.g. in CI, record the commands of a connection and the responses
+        of the emulator to a transcript file with ``record_transcript``. A connection opened with
+        ``replay_transcript`` then starts no emulator, but answers the commands from
+        the transcript, without waiting for a host and without sleeping for the ``wait_time``. The commands
+        must be sent in the same order as they were recorded, only commands that read the screen may be sent
+        more or less often. Relative paths of both transcripts are relative to the ``${OUTPUT DIR}``.
+        Connections that record or replay a transcript are not kept in the session pool.
+
         Example:
             | Open Connection | Hostname |
             | Open Connection | Hostname | LU=LUname |
@@ -74,27 +185,152 @@ class x3270(object):
             | ${extra_args}   | Create List | --accepthostname | myhost.com | --cafile | ${CURDIR}/cafile.crt |
             | Open Connection | Hostname | extra_args=${extra_args} |
             | Open Connection | Hostname | extra_args=${CURDIR}/argfile.txt |
+            | Open Connection | Hostname | lu_pool=TERM01-TERM16 |
+            | Open Connection | Hostname | LU=CICSLU | alias=cics |
+            | Open Connection | Hostname | record_transcript=login.jsonl |
+            | Open Connection | Hostname | replay_transcript=${CURDIR}/login.jsonl |
         """
+        if LU and lu_pool:
+            raise Exception("Either LU or lu_pool can be given, not both")
+        if self.mf and self.alias != alias:
+            self._park_connection()
+        if alias in self._connections:
+            self._restore_connection(alias)
+        if self.mf:
+            self.close_connection()
+        self.alias = alias
         self.host = host
-        self.lu = LU
         self.port = port
+        if lu_pool:
+            LU = lu_allocator.acquire(host, expand_lu_pool(lu_pool))
+            self._lu_lease = (host, LU)
+        self.lu = LU
+        try:
+            self._open_emulator(extra_args, record_transcript, replay_transcript)
+        except Exception:
+            # also if the emulator could not be spawned or the transcript not be opened
+            if self._lu_lease:
+                lu_allocator.release(*self._lu_lease)
+                self._lu_lease = None
+            raise
+
+    def _open_emulator(
+        self,
+        extra_args: Optional[Union[List[str], os.PathLike]],
+        record_transcript: Optional[str],
+        replay_transcript: Optional[str],
+    ) -> None:
         if self.lu:
             self.credential = "%s@%s:%s" % (self.lu, self.host, self.port)
         else:
             self.credential = "%s:%s" % (self.host, self.port)
-        if self.mf:
-            self.close_connection()
-        self.mf = Emulator(self.visible, self.timeout, extra_args)
+        self._session_key = SessionPool.make_key(
+            self.visible, self.credential, extra_args, self.model
+        )
+        if record_transcript:
+            record_transcript = os.path.join(self.output_folder, record_transcript)
+        if replay_transcript:
+            replay_transcript = os.path.join(self.output_folder, replay_transcript)
+        transcript = record_transcript or replay_transcript
+        if self.session_pool is not None and not transcript:
+            self.mf = self.session_pool.checkout(self._session_key)
+            if self.mf:
+                self.mf.timeout = self.timeout
+                self.mf.cache_screen = self.cache_screen
+                self.mf.instrumentation = self.instrumentation
+                self.mf.track_screen_changes = self.track_screen_changes
+                self.mf.last_screen_checksum = None
+                return
+        from .py3270 import Emulator
+
+        self.mf = Emulator(
+            self.visible,
+            self.timeout,
+            extra_args,
+            app=ReplayApp(replay_transcript) if replay_transcript else None,
+            cache_screen=self.cache_screen,
+            model=self.model,
+            instrumentation=self.instrumentation,
+            track_screen_changes=self.track_screen_changes,
+            keep_alive=self.keep_alive,
+        )
+        if record_transcript:
+            self.mf.app = RecordingApp(self.mf.app, record_transcript)
         self.mf.connect(self.credential)
 
     @keyword("Close Connection")
     def close_connection(self) -> None:
-        """Disconnect from the host."""
-        try:
-            self.mf.terminate()
-        except socket.error:
-            pass
+        """Disconnect from the host.
+
+        If the library was imported with a ``session_pool_size``, the emulator stays connected
+        and is kept for the next `Open Connection` with the same parameters. A LU leased from
+        a ``lu_pool`` is then kept for this connection as well.
+        """
+        if self.mf.trace is not None:
+            self.mf.trace.close()
+            self.mf.trace = None
+        # connections of transcripts are not reused, the transcript would be
+        # continued by them or would not match the host anymore
+        pooled = False
+        if self.session_pool is not None:
+            if not isinstance(self.mf.app, (RecordingApp, ReplayApp)):
+                pooled = self.session_pool.checkin(
+                    self._session_key, self.mf, self._lu_lease
+                )
+        if not pooled:
+            try:
+                self.mf.terminate()
+            except OSError:
+                pass
         self.mf = None  # type: ignore
+        self.alias = None
+        if self._lu_lease:
+            lu_allocator.release(*self._lu_lease, keep=pooled)
+            self._lu_lease = None
+
+    @keyword("Switch Connection")
+    def switch_connection(self, alias: Optional[str]) -> Optional[str]:
+        """Make the connection that was opened with `Open Connection` and the given ``alias``
+        the current connection. All following keywords use this connection.
+
+        The previous connection stays open. Its alias is returned, so that it can be switched back to.
+
+        Example:
+            | Open Connection   | Hostname | LU=CICSLU | alias=cics |
+            | Open Connection   | Hostname | LU=TSOLU  | alias=tso  |
+            | ${previous}       | Switch Connection | cics |
+            | Write             | my transaction |
+            | Switch Connection | ${previous} |
+        """
+        previous = self.alias
+        if alias == previous and self.mf:
+            return previous
+        if alias not in self._connections:
+            raise Exception(f"No connection with alias '{alias}' is open")
+        self._park_connection()
+        self._restore_connection(alias)
+        return previous
+
+    @keyword("Close All Connections")
+    def close_all_connections(self) -> None:
+        """Disconnect all connections that were opened with `Open Connection`, see `Close Connection`."""
+        if self.mf:
+            self.close_connection()
+        while self._connections:
+            self._restore_connection(next(iter(self._connections)))
+            self.close_connection()
+
+    def _park_connection(self) -> None:
+        if self.mf:
+            self._connections[self.alias] = {
+                name: getattr(self, name) for name in CONNECTION_ATTRIBUTES
+            }
+        for name in CONNECTION_ATTRIBUTES:
+            setattr(self, name, None)
+
+    def _restore_connection(self, alias: Optional[str]) -> None:
+        for name, value in self._connections.pop(alias).items():
+            setattr(self, name, value)
 
     @keyword("Change Wait Time")
     def change_wait_time(self, wait_time: float) -> None:
@@ -109,6 +345,10 @@ class x3270(object):
 
         If you want to change this value, just use this keyword passing the time in seconds.
 
+        If the library was imported with ``adaptive_wait=True``, the wait time is only the upper bound.
+        These keywords then return as soon as the host has unlocked the keyboard and, if ``screen_stable_time``
+        was set on library import, the screen has not changed for that time.
+
         Example:
             | Change Wait Time | 0.1 |
             | Change Wait Time | 2 |
@@ -147,13 +387,29 @@ class x3270(object):
         """
         self._check_limits(ypos, xpos)
         # Checks if the user has passed a length that will be larger than the x limit of the screen.
-        if (xpos + length) > (80 + 1):
+        if (xpos + length) > (self.mf.screen_size()[1] + 1):
             raise Exception(
                 "You have exceeded the x-axis limit of the mainframe screen"
             )
-        string = self.mf.string_get(ypos, xpos, length)
+        string = self.mf.screen_get().string_get(ypos, xpos, length)
         return string
 
+    @keyword("Read Field")
+    def read_field(self, ypos: int, xpos: int) -> str:
+        """Get the content of the field at screen co-ordinates ``ypos`` / ``xpos``, without trailing blanks.
+        The co-ordinates can be any cell of the field.
+
+        Co-ordinates are 1 based, as listed in the status area of the terminal.
+
+        Example:
+            | ${value} | Read Field | 8 | 10 |
+        """
+        self._check_limits(ypos, xpos)
+        field = self.mf.read_buffer().field_at(ypos, xpos)
+        if field is None:
+            raise Exception("There is no field at y=%s / x=%s" % (ypos, xpos))
+        return field.text.rstrip()
+
     @keyword("Read All Screen")
     def read_all_screen(self) -> str:
         """Read the current screen and returns all content in one string.
@@ -182,7 +438,40 @@ class x3270(object):
             | Execute Command | PF(1) |
         """
         self.mf.exec_command(cmd.encode("utf-8"))
-        time.sleep(self.wait)
+        # the command is arbitrary, so the screen has to be read again afterwards
+        self.mf.invalidate_screen()
+        self._wait_after_aid()
+
+    @keyword("Get Screen Cache Statistics")
+    def get_screen_cache_statistics(self) -> dict:
+        """Return a dictionary with the number of screen reads served from the cache (``hits``),
+        the number of reads sent to the emulator (``misses``) and the current screen ``generation``.
+
+        The generation is increased every time a command that can change the screen is executed.
+        Screen caching is enabled on library import with ``cache_screen=True``.
+
+        Example:
+            | ${stats} | Get Screen Cache Statistics |
+            | Should Be Equal As Integers | ${stats}[misses] | 1 |
+        """
+        return {
+            "hits": self.mf.screen_cache_hits,
+            "misses": self.mf.screen_cache_misses,
+            "generation": self.mf.screen_generation,
+        }
+
+    @keyword("Get Pattern Cache Statistics")
+    def get_pattern_cache_statistics(self) -> dict:
+        """Return a dictionary with the statistics of the caches for compiled patterns, which are shared by all
+        library instances. ``regex`` is used by `Page Should Match Regex` and `Page Should Not Match Regex`,
+        and ``match`` by `Page Should Contain Match` and `Page Should Not Contain Match`. Each entry has the
+        number of ``hits``, ``misses`` and the current ``size`` of the cache.
+
+        Example:
+            | ${stats} | Get Pattern Cache Statistics |
+            | Should Be Equal As Integers | ${stats}[regex][misses] | 1 |
+        """
+        return pattern_cache_info()
 
     @keyword("Set Screenshot Folder")
     def set_screenshot_folder(self, path: str) -> None:
@@ -208,17 +497,68 @@ class x3270(object):
         The Screenshot is printed in a iframe log, with the values of height=410 and width=670, you
         can change this values passing them to the keyword.
 
+        With the default ``screenshot_mode=file``, the emulator writes every screenshot to its own html file.
+        Other modes render the screenshot from the screen the library has read, without the emulator
+        writing a file, which is much faster when many screenshots are taken:
+
+        - ``inline`` embeds the screenshot as html into the log.
+        - ``text`` logs the screenshot as plain text.
+        - ``archive`` collects the screenshots of a suite in memory and writes them to a single zip archive
+          in the screenshot folder at the end of the suite, named after the suite.
+        ``height`` and ``width`` are only used with ``screenshot_mode=file``.
+
+        If the library was imported with ``deduplicate_screenshots=True``, the screenshot files and
+        archive entries are named after a hash of the screen instead of the time, and the library
+        renders them from the same screen the hash was computed of. A screen that has been saved
+        before is not saved again, and the log refers to the existing screenshot. Screens that only
+        differ in colors or highlighting are considered equal.
+
         Example:
             | Take Screenshot |
             | Take Screenshot | height=500 | width=700 |
         """
         filename_prefix = "screenshot"
         extension = "html"
-        filename_sufix = round(time.time() * 1000)
+        filename_sufix: Union[int, str] = round(time.time() * 1000)
+        if self.screenshot_mode == INLINE:
+            logger.write(
+                render_html(self.mf.screen_get(refresh=True)), level="INFO", html=True
+            )
+            return
+        if self.screenshot_mode == TEXT:
+            logger.info(render_text(self.mf.screen_get(refresh=True)))
+            return
+        screen = None
+        if self.deduplicate_screenshots:
+            screen = self.mf.screen_get(refresh=True)
+            filename_sufix = screen_hash(screen)
+        if self.screenshot_mode == ARCHIVE:
+            if screen is None:
+                screen = self.mf.screen_get(refresh=True)
+                # the number keeps names unique when several are taken in one millisecond
+                filename_sufix = "%s_%s" % (
+                    filename_sufix,
+                    len(self.screenshot_archive) + 1,
+                )
+            name = "%s_%s.%s" % (filename_prefix, filename_sufix, extension)
+            if name in self.screenshot_archive:
+                logger.info(
+                    "Screenshot %s is already in the archive of the suite" % name
+                )
+                return
+            self.screenshot_archive.add(name, render_html_document(screen))
+            logger.info("Screenshot %s is written to the archive of the suite" % name)
+            return
         filepath = os.path.join(
             self.imgfolder, "%s_%s.%s" % (filename_prefix, filename_sufix, extension)
         )
-        self.mf.save_screen(os.path.join(self.output_folder, filepath))
+        path = os.path.join(self.output_folder, filepath)
+        if screen is None:
+            self.mf.save_screen(path)
+        elif not os.path.exists(path):
+            # the file has the content the hash in its name was computed of
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(render_html_document(screen))
         logger.write(
             '<iframe src="%s" height="%s" width="%s"></iframe>'
             % (filepath.replace("\\", "/"), height, width),
@@ -226,6 +566,65 @@ class x3270(object):
             html=True,
         )
 
+    def write_screenshot_archive(self, suite_name: str) -> Optional[str]:
+        """Write the screenshots taken with ``screenshot_mode=archive`` to the archive of the suite
+        and return its path, or None if there were no screenshots."""
+        if not len(self.screenshot_archive):
+            return None
+        path = os.path.join(
+            self.output_folder, self.imgfolder, archive_name(suite_name)
+        )
+        count = self.screenshot_archive.write(path)
+        logger.info("%s screenshots are written to %s" % (count, path))
+        return path
+
+    @keyword("Start Session Trace")
+    def start_session_trace(self, path: Optional[str] = None) -> str:
+        """Start recording the screens of the current connection to a trace file, and return its path.
+
+        Every time an AID key is sent, e.g. by `Send Enter` or `Send PF`, the screen it is sent on is
+        recorded, and `Stop Session Trace` records the last screen. Only the parts of the screen that
+        changed since the previous screen are stored, so tracing a whole session is much cheaper than
+        taking a screenshot of every screen.
+
+        ``path`` is relative to the ``${OUTPUT DIR}``. By default, the trace is written to
+        ``session_trace_<time>.jsonl`` in the screenshot folder. The screens of a trace can be shown
+        with ``python -m Mainframe3270.trace <path>``, or exported to html with
+        ``python -m Mainframe3270.trace <path> --html <html path>``.
+
+        Example:
+            | ${trace} | Start Session Trace |
+            | Start Session Trace | traces/login.jsonl |
+        """
+        if self.mf.trace is not None:
+            self.mf.trace.close()
+        if path is None:
+            path = os.path.join(
+                self.imgfolder, "session_trace_%s.jsonl" % round(time.time() * 1000)
+            )
+        path = os.path.join(self.output_folder, path)
+        self.mf.trace = TraceRecorder(path)
+        logger.info("Recording the session trace to %s" % path)
+        return path
+
+    @keyword("Stop Session Trace")
+    def stop_session_trace(self) -> str:
+        """Record the current screen and stop the trace started by `Start Session Trace`.
+        Returns the path of the trace file.
+
+        Closing the connection stops the trace as well, without recording the current screen.
+        """
+        trace = self.mf.trace
+        if trace is None:
+            raise Exception("No session trace is recorded, use Start Session Trace")
+        try:
+            trace.record(None, self.mf.screen_get())
+        finally:
+            trace.close()
+            self.mf.trace = None
+        logger.info("Recorded %s screens to %s" % (trace.entries, trace.path))
+        return trace.path
+
     @keyword("Wait Field Detected")
     def wait_field_detected(self) -> None:
         """Wait until the screen is ready, the cursor has been positioned
@@ -255,9 +654,7 @@ class x3270(object):
             | Delete Char |
             | Delete Char | ypos=9 | xpos=25 |
         """
-        if ypos is not None and xpos is not None:
-            self.mf.move_to(ypos, xpos)
-        self.mf.exec_command(b"Delete")
+        self.mf.delete_char(ypos, xpos)
 
     @keyword("Delete Field")
     def delete_field(
@@ -274,15 +671,13 @@ class x3270(object):
             | Delete Field |
             | Delete Field | ypos=12 | xpos=6 |
         """
-        if ypos is not None and xpos is not None:
-            self.mf.move_to(ypos, xpos)
-        self.mf.delete_field()
+        self.mf.delete_field(ypos, xpos)
 
     @keyword("Send Enter")
     def send_enter(self) -> None:
         """Send an Enter to the screen."""
         self.mf.send_enter()
-        time.sleep(self.wait)
+        self._wait_after_aid()
 
     @keyword("Move Next Field")
     def move_next_field(self) -> None:
@@ -302,7 +697,7 @@ class x3270(object):
                | Send PF | 3 |
         """
         self.mf.exec_command(("PF(" + PF + ")").encode("utf-8"))
-        time.sleep(self.wait)
+        self._wait_after_aid()
 
     @keyword("Write")
     def write(self, txt: str) -> None:
@@ -346,6 +741,59 @@ class x3270(object):
         """
         self._write(txt, ypos, xpos)
 
+    @keyword("Fill Fields")
+    def fill_fields(self, fields: Union[dict, list]) -> None:
+        """Clear several fields and send a string to each of them, without sending Enter.
+
+        ``fields`` is either a list of ``(ypos, xpos, txt)`` entries, or a dictionary with the co-ordinates
+        ``ypos,xpos`` as keys and the strings as values. All co-ordinates are checked before anything is sent,
+        and all fields are then filled with a single write to the emulator, without waiting in between.
+
+        Co-ordinates are 1 based, as listed in the status area of the terminal.
+
+        Example:
+            | ${fields} | Create Dictionary | 5,20=myuser | 6,20=mypassword |
+            | Fill Fields | ${fields} |
+            | ${row}      | Create List | 5 | 20 | myuser |
+            | ${fields}   | Create List | ${row} |
+            | Fill Fields | ${fields} |
+        """
+        if isinstance(fields, dict):
+            fields = [
+                self._parse_position(key) + (value,) for key, value in fields.items()
+            ]
+        entries = []
+        for ypos, xpos, txt in fields:
+            ypos, xpos = int(ypos), int(xpos)
+            self._check_limits(ypos, xpos)
+            entries.append((ypos, xpos, txt.encode("unicode_escape")))
+        self.mf.fill_fields(entries)
+
+    @staticmethod
+    def _parse_position(position: Any) -> tuple:
+        if isinstance(position, str):
+            position = position.split(",")
+        ypos, xpos = position
+        return int(ypos), int(xpos)
+
+    @keyword("Write Field By Label")
+    def write_field_by_label(self, label: str, txt: str) -> None:
+        """Clear the first input field following the text ``label`` and send the string to it.
+
+        The field is looked up in the fields of the current screen, so the position of the field does not
+        need to be known. The keyword fails if there is no input field after the label or if the string
+        is longer than the field.
+
+        Example:
+            | Write Field By Label | Username: | myuser |
+        """
+        field = self.mf.read_buffer().field_by_label(label)
+        if field is None:
+            raise Exception('No input field found after the label "%s"' % label)
+        self.mf.fill_field(
+            field.row, field.col, txt.encode("unicode_escape"), field.length
+        )
+
     def _write(
         self,
         txt: Any,
@@ -356,46 +804,146 @@ class x3270(object):
         txt = txt.encode("unicode_escape")
         if ypos is not None and xpos is not None:
             self._check_limits(ypos, xpos)
-            self.mf.send_string(txt, ypos, xpos)
-        else:
-            self.mf.send_string(txt)
-        time.sleep(self.wait_write)
+        if enter and not self.wait_write:
+            # nothing to wait for in between the string and Enter
+            self.mf.send_string(txt, ypos, xpos, enter=True)
+            self._wait_after_aid()
+            return
+        self.mf.send_string(txt, ypos, xpos)
+        self._sleep(self.wait_write, "wait_time_after_write")
         for i in range(enter):
             self.mf.send_enter()
-            time.sleep(self.wait)
+            self._wait_after_aid()
+
+    def _wait_after_aid(self) -> None:
+        """Give the host time to answer an AID key, e.g. Enter or a PF key."""
+        if not self.adaptive_wait:
+            self._sleep(self.wait, "wait_time")
+            return
+        if self.wait <= 0:
+            return
+        deadline = time.monotonic() + self.wait
+        if not self.mf.wait_for_unlock(self.wait):
+            logger.warn(
+                "The keyboard was not unlocked within the wait_time of %s seconds"
+                % self.wait
+            )
+        if self.screen_stable_time:
+            self.mf.wait_for_stable_screen(
+                self.screen_stable_time, deadline - time.monotonic()
+            )
+
+    def _sleep(self, seconds: float, name: str) -> None:
+        if isinstance(self.mf.app, ReplayApp):
+            # a replayed host answers at once
+            return
+        time.sleep(seconds)
+        if self.instrumentation is not None:
+            self.instrumentation.record(SLEEP, name, seconds)
 
     @keyword("Wait Until String")
-    def wait_until_string(self, txt: str, timeout: int = 5) -> str:
+    def wait_until_string(self, txt: str, timeout: Union[int, float] = 5) -> str:
         """Wait until a string exists on the mainframe screen to perform the next step. If the string does not appear in
         5 seconds, the keyword will raise an exception. You can define a different timeout.
 
+        The screen is only read again after the emulator reports that the host has changed it,
+        so waiting does not put any load on the emulator. The emulator only waits in whole seconds,
+        so the keyword can take up to one second longer than the timeout before it fails, e.g. with
+        a timeout of 0.5 seconds.
+
         Example:
             | Wait Until String | something |
             | Wait Until String | something | timeout=10 |
+            | Wait Until String | something | timeout=0.5 |
         """
-        max_time = time.ctime(int(time.time()) + timeout)
-        while time.ctime(int(time.time())) < max_time:
-            result = self._search_string(str(txt))
-            if result:
-                return txt
-        raise Exception(
-            'String "' + txt + '" not found in ' + str(timeout) + " seconds"
-        )
+        deadline = time.monotonic() + timeout
+        screen = self.mf.screen_get(refresh=True)
+        while not self._search_string(str(txt), screen=screen):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.mf.wait_for_output(remaining):
+                raise Exception(
+                    'String "' + txt + '" not found in ' + str(timeout) + " seconds"
+                )
+            screen = self.mf.screen_get()
+        return txt
+
+    @keyword("Wait Until Screen Changes")
+    def wait_until_screen_changes(self, timeout: Union[int, float] = 5) -> None:
+        """Wait until the host changes the screen, compared to the screen when the last AID key, e.g. Enter
+        or a PF key, was sent. If the screen was already changed since then, the keyword returns immediately.
+        Calling the keyword again without sending an AID key in between waits for the next change.
+
+        Unless the library was imported with ``track_screen_changes=True``, the screen is only read before
+        the AID keys sent after the first use of the keyword. The first use therefore waits until the
+        screen differs from the screen when the keyword was called.
+
+        The screen is only compared again after the emulator reports output from the host. If the screen
+        does not change in 5 seconds, the keyword fails. You can define a different timeout. As the emulator
+        only waits in whole seconds, the keyword can take up to one second longer than the timeout before it
+        fails.
+
+        Example:
+            | Send Enter |
+            | Wait Until Screen Changes |
+            | Wait Until Screen Changes | timeout=10 |
+        """
+        # from now on, read the screen before every AID key
+        self.track_screen_changes = self.mf.track_screen_changes = True
+        if not self.mf.wait_for_screen_change(timeout):
+            raise Exception("The screen did not change in " + str(timeout) + " seconds")
+
+    @keyword("Wait Until Screen Stable")
+    def wait_until_screen_stable(
+        self, stable_time: Union[int, float] = 0.5, timeout: Union[int, float] = 5
+    ) -> None:
+        """Wait until the screen has not changed for ``stable_time`` seconds, e.g. while the host sends
+        a screen in several parts. If the screen is not stable within 5 seconds, the keyword fails. You can
+        define a different timeout, also in fractions of a second.
+
+        Example:
+            | Wait Until Screen Stable |
+            | Wait Until Screen Stable | stable_time=0.2 | timeout=10 |
+        """
+        if not self.mf.wait_for_stable_screen(stable_time, timeout):
+            raise Exception(
+                f"The screen was not stable for {stable_time} seconds within {timeout} seconds"
+            )
 
-    def _search_string(self, string: str, ignore_case: bool = False) -> bool:
-        """Search if a string exists on the mainframe screen and return True or False."""
+    def _search_string(
+        self, string: str, ignore_case: bool = False, screen: Optional["Screen"] = None
+    ) -> bool:
+        """Search if a string exists on the mainframe screen and return True or False.
 
-        def __read_screen(string: str, ignore_case: bool) -> bool:
-            for ypos in range(24):
-                line = self.mf.string_get(ypos + 1, 1, 80)
-                if ignore_case:
-                    line = line.lower()
-                if string in line:
-                    return True
-            return False
+        If no ``screen`` snapshot is given, a new one is read from the emulator.
+        """
+        if screen is None:
+            screen = self.mf.screen_get()
+        return screen.contains(string, ignore_case)
+
+    def _find_strings(self, list_string: List[str], ignore_case: bool = False) -> dict:
+        """Search all strings in a single snapshot of the mainframe screen.
 
-        status = __read_screen(string, ignore_case)
-        return status
+        Returns a dictionary with the strings found as keys and the positions ``(ypos, xpos)``
+        of their occurrences as values.
+        """
+        screen = self.mf.screen_get()
+        found = {}
+        for string in dict.fromkeys(list_string):
+            positions = screen.find_all(string, ignore_case)
+            if positions:
+                found[string] = positions
+        return found
+
+    @staticmethod
+    def _log_found_strings(found: dict) -> None:
+        for string, positions in found.items():
+            logger.info(
+                'The string "%s" was found at %s'
+                % (
+                    string,
+                    ", ".join("y=%s / x=%s" % position for position in positions),
+                )
+            )
 
     @keyword("Page Should Contain String")
     def page_should_contain_string(
@@ -469,12 +1017,10 @@ class x3270(object):
             message = error_message
         if ignore_case:
             list_string = [item.lower() for item in list_string]
-        for string in list_string:
-            result = self._search_string(string, ignore_case)
-            if result:
-                break
-        if not result:
+        found = self._find_strings(list_string, ignore_case)
+        if not found:
             raise Exception(message)
+        self._log_found_strings(found)
 
     @keyword("Page Should Not Contain Any String")
     def page_should_not_contain_any_string(
@@ -543,9 +1089,9 @@ class x3270(object):
         message = error_message
         if ignore_case:
             list_string = [item.lower() for item in list_string]
+        found = self._find_strings(list_string, ignore_case)
         for string in list_string:
-            result = self._search_string(string, ignore_case)
-            if result:
+            if string in found:
                 if message is None:
                     message = 'The string "' + string + '" was found'
                 raise Exception(message)
@@ -593,7 +1139,7 @@ class x3270(object):
         thus be escaped with another backslash (e.g. \\d\\w+).
         """
         page_text = self._read_all_screen()
-        if not re.findall(regex_pattern, page_text, re.MULTILINE):
+        if not compile_regex(regex_pattern, re.MULTILINE).search(page_text):
             raise Exception('No matches found for "' + regex_pattern + '" pattern')
 
     @keyword("Page Should Not Match Regex")
@@ -607,7 +1153,7 @@ class x3270(object):
         thus be escaped with another backslash (e.g. \\d\\w+).
         """
         page_text = self._read_all_screen()
-        if re.findall(regex_pattern, page_text, re.MULTILINE):
+        if compile_regex(regex_pattern, re.MULTILINE).search(page_text):
             raise Exception(
                 'There are matches found for "' + regex_pattern + '" pattern'
             )
@@ -640,8 +1186,7 @@ class x3270(object):
         if ignore_case:
             txt = txt.lower()
             all_screen = all_screen.lower()
-        matcher = Matcher(txt, caseless=False, spaceless=False)
-        result = matcher.match(all_screen)
+        result = glob_matcher(txt).match(all_screen)
         if not result:
             if message is None:
                 message = 'No matches found for "' + txt + '" pattern'
@@ -675,8 +1220,7 @@ class x3270(object):
         if ignore_case:
             txt = txt.lower()
             all_screen = all_screen.lower()
-        matcher = Matcher(txt, caseless=False, spaceless=False)
-        result = matcher.match(all_screen)
+        result = glob_matcher(txt).match(all_screen)
         if result:
             if message is None:
                 message = 'There are matches found for "' + txt + '" pattern'
@@ -684,10 +1228,7 @@ class x3270(object):
 
     def _read_all_screen(self) -> str:
         """Read all the mainframe screen and return in a single string."""
-        full_text = ""
-        for ypos in range(24):
-            full_text += self.mf.string_get(ypos + 1, 1, 80)
-        return full_text
+        return self.mf.screen_get().text
 
     def _compare_all_list_with_screen_text(
         self,
@@ -698,8 +1239,9 @@ class x3270(object):
     ) -> None:
         if ignore_case:
             list_string = [item.lower() for item in list_string]
+        found = self._find_strings(list_string, ignore_case)
         for string in list_string:
-            result = self._search_string(string, ignore_case)
+            result = string in found
             if not should_match and result:
                 if message is None:
                     message = 'The string "' + string + '" was found'
@@ -708,15 +1250,17 @@ class x3270(object):
                 if message is None:
                     message = 'The string "' + string + '" was not found'
                 raise Exception(message)
+        if should_match:
+            self._log_found_strings(found)
 
-    @staticmethod
-    def _check_limits(ypos: int, xpos: int):
+    def _check_limits(self, ypos: int, xpos: int):
         """Checks if the user has passed some coordinate y / x greater than that existing in the mainframe"""
-        if ypos > 24:
+        rows, cols = self.mf.screen_size()
+        if ypos > rows:
             raise Exception(
                 "You have exceeded the y-axis limit of the mainframe screen"
             )
-        if xpos > 80:
+        if xpos > cols:
             raise Exception(
                 "You have exceeded the x-axis limit of the mainframe screen"
             )
@@ -0,0 +1,60 @@
+import asyncio
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from Mainframe3270.x3270 import x3270
+
+from .tn3270_server import start_server
+
+pytest.importorskip("pytest_benchmark")
+pytestmark = pytest.mark.skipif(
+    shutil.which("s3270") is None, reason="s3270 is needed to connect to the server"
+)
+
+# seconds the server takes to answer an AID key
+LATENCY = float(os.environ.get("TN3270_SERVER_LATENCY", "0"))
+
+
+@pytest.fixture(scope="module")
+def server_port():
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(start_server(latency=LATENCY))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield server.sockets[0].getsockname()[1]
+    loop.call_soon_threadsafe(server.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def login_cycle(port, user):
+    library = x3270(
+        visible=False,
+        timeout=30,
+        wait_time=0,
+        wait_time_after_write=0,
+        img_folder=".",
+    )
+    library.open_connection("127.0.0.1", port=port)
+    try:
+        library.wait_field_detected()
+        library.write_bare_in_position(user, 5, 17)
+        library.send_enter()
+        library.wait_until_string("WELCOME " + user)
+        library.page_should_contain_string("YOU PRESSED ENTER")
+    finally:
+        library.close_connection()
+
+
+@pytest.mark.parametrize("sessions", [1, 4, 16])
+def test_login_cycles(benchmark, server_port, sessions):
+    def run_cycles():
+        with ThreadPoolExecutor(max_workers=sessions) as executor:
+            users = ["USER%d" % index for index in range(sessions)]
+            list(executor.map(lambda user: login_cycle(server_port, user), users))
+
+    benchmark(run_cycles)
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from Mainframe3270 import Mainframe3270
+
+pytest.importorskip("pytest_benchmark")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# imports Robot Framework first, which every run of the library pays anyway,
+# and prints the seconds the import of the library itself took
+IMPORT_LIBRARY = """
+import sys, time
+import robot.api, robotlibcore
+start = time.perf_counter()
+import Mainframe3270
+print(time.perf_counter() - start)
+print(",".join(sorted(sys.modules)))
+"""
+
+# modules that are only needed once a connection is opened or a keyword fails
+LAZY_MODULES = ["Mainframe3270.py3270", "robot.libraries.BuiltIn", "six"]
+
+
+def import_library():
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_LIBRARY],
+        env=env,
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    ).stdout
+    seconds, modules = output.splitlines()
+    return float(seconds), modules.split(",")
+
+
+def test_import_library(benchmark):
+    seconds, modules = benchmark.pedantic(import_library, rounds=10)
+
+    benchmark.extra_info["library_import_seconds"] = seconds
+    for module in LAZY_MODULES:
+        assert module not in modules
+
+
+def test_create_library(benchmark):
+    Mainframe3270()
+
+    library = benchmark(Mainframe3270)
+
+    assert "Open Connection" in library.get_keyword_names()
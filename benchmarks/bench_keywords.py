@@ -0,0 +1,60 @@
+import pytest
+
+from Mainframe3270.x3270 import x3270
+
+from .conftest import start_emulator
+
+pytest.importorskip("pytest_benchmark")
+
+STRINGS = ["FAKE S3270", "USERID", "PASSWORD", "ENTER", "BENCHMARK HOST"]
+
+
+def test_read_all_screen(benchmark, library: x3270):
+    screen = benchmark(library.read_all_screen)
+
+    assert "BENCHMARK HOST" in screen
+
+
+def test_read(benchmark, library: x3270):
+    assert benchmark(library.read, 3, 1, 6) == "USERID"
+
+
+def test_page_should_contain_string(benchmark, library: x3270):
+    benchmark(library.page_should_contain_string, "PASSWORD")
+
+
+def test_page_should_contain_all_strings(benchmark, library: x3270):
+    benchmark(library.page_should_contain_all_strings, STRINGS)
+
+
+def test_page_should_match_regex(benchmark, library: x3270):
+    benchmark(library.page_should_match_regex, r"USERID\s+===>")
+
+
+def test_write_bare_in_position(benchmark, library: x3270):
+    benchmark(library.write_bare_in_position, "myuser", 3, 15)
+
+    assert library.read(3, 15, 6) == "myuser"
+
+
+def test_write_in_position(benchmark, library: x3270):
+    benchmark(library.write_in_position, "myuser", 3, 15)
+
+
+def test_fill_fields(benchmark, library: x3270):
+    benchmark(library.fill_fields, [(3, 15, "myuser"), (4, 15, "secret")])
+
+
+def test_send_enter_and_wait_until_string(benchmark, library: x3270):
+    def send_enter_and_wait():
+        library.send_enter()
+        library.wait_until_string("READY")
+
+    benchmark(send_enter_and_wait)
+
+
+def test_session_startup(benchmark):
+    def start_and_stop():
+        start_emulator().terminate()
+
+    benchmark(start_and_stop)
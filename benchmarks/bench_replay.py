@@ -0,0 +1,43 @@
+import pytest
+
+from Mainframe3270.py3270 import Emulator
+from Mainframe3270.replay import RecordingApp, ReplayApp, read_transcript
+from Mainframe3270.x3270 import x3270
+
+from .conftest import FakeS3270App
+
+pytest.importorskip("pytest_benchmark")
+
+
+def login_flow(library: x3270):
+    library.mf.connect("localhost")
+    library.page_should_contain_string("USERID")
+    library.write_bare_in_position("myuser", 3, 15)
+    library.send_enter()
+    library.wait_until_string("READY")
+    library.page_should_contain_all_strings(["RESPONSE 1", "myuser"])
+    library.send_PF("3")
+    library.wait_until_string("RESPONSE 2")
+    assert library.read(3, 15, 6) == "myuser"
+    library.close_connection()
+
+
+@pytest.fixture(scope="module")
+def transcript(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("replay") / "transcript.jsonl")
+    library = x3270(False, 30, 0, 0, ".")
+    library.mf = Emulator(
+        app=RecordingApp(FakeS3270App(), path), track_screen_changes=True
+    )
+    login_flow(library)
+    return read_transcript(path)
+
+
+def test_replay_login_flow(benchmark, transcript):
+    library = x3270(False, 30, 0.5, 0, ".")
+
+    def replay():
+        library.mf = Emulator(app=ReplayApp(transcript), track_screen_changes=True)
+        login_flow(library)
+
+    benchmark(replay)
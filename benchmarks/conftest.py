@@ -0,0 +1,59 @@
+import os
+import sys
+
+import pytest
+
+from Mainframe3270.py3270 import Emulator, ExecutableAppLinux
+from Mainframe3270.x3270 import x3270
+
+FAKE_S3270 = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_s3270.py")
+
+# seconds the fake host takes to answer an AID key and to execute any command
+LATENCY = float(os.environ.get("FAKE_S3270_LATENCY", "0"))
+COMMAND_LATENCY = float(os.environ.get("FAKE_S3270_COMMAND_LATENCY", "0"))
+
+
+class FakeS3270App(ExecutableAppLinux):
+    """Runs fake_s3270.py with the current interpreter instead of s3270"""
+
+    def __init__(self, latency=LATENCY, command_latency=COMMAND_LATENCY):
+        self.executable = sys.executable
+        self.args = [
+            FAKE_S3270,
+            "--latency",
+            str(latency),
+            "--command-latency",
+            str(command_latency),
+        ]
+        super().__init__()
+
+    def close(self):
+        self.sp.wait()
+
+
+def start_emulator(**kwargs):
+    emulator = Emulator(app=FakeS3270App(), **kwargs)
+    emulator.connect("localhost")
+    return emulator
+
+
+@pytest.fixture
+def emulator():
+    emulator = start_emulator()
+    yield emulator
+    emulator.terminate()
+
+
+@pytest.fixture(params=[True, False], ids=["cached", "uncached"])
+def library(request):
+    library = x3270(
+        visible=False,
+        timeout=30,
+        wait_time=0,
+        wait_time_after_write=0,
+        img_folder=".",
+        cache_screen=request.param,
+    )
+    library.mf = start_emulator(cache_screen=request.param)
+    yield library
+    library.close_connection()
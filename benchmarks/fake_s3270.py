@@ -0,0 +1,192 @@
+"""
+A stand-in for s3270 that speaks its script protocol on stdin/stdout, without
+connecting to a host. It keeps a screen buffer that String() writes to, and
+answers every AID key (Enter, PF, PA, Clear) by showing the number of AID keys
+received so far in the message line, after the configured host latency.
+
+Usage: python fake_s3270.py [--latency SECONDS] [--command-latency SECONDS]
+                            [--rows ROWS] [--cols COLS] [s3270 options]
+
+Unknown options, like the -xrm options added by the library, are ignored.
+"""
+
+import argparse
+import re
+import sys
+import time
+
+AID_KEYS = {"enter", "pf", "pa", "clear", "sysreq", "attn"}
+NO_OPS = {
+    "backtab",
+    "down",
+    "home",
+    "ignore",
+    "left",
+    "newline",
+    "printtext",
+    "query",
+    "reset",
+    "right",
+    "tab",
+    "up",
+    "wait",
+}
+
+WELCOME = [
+    "FAKE S3270 BENCHMARK HOST",
+    "",
+    "USERID   ===>",
+    "PASSWORD ===>",
+    "",
+    "ENTER YOUR USERID AND PASSWORD AND PRESS ENTER",
+]
+
+
+class FakeEmulator(object):
+    def __init__(self, rows, cols, latency, command_latency, output):
+        self.rows = rows
+        self.cols = cols
+        self.latency = latency
+        self.command_latency = command_latency
+        self.output = output
+        self.buffer = [" "] * (rows * cols)
+        self.cursor = 0
+        self.host = None
+        self.aid_count = 0
+        for row, text in enumerate(WELCOME):
+            self.put_text(row * cols, text)
+
+    def put_text(self, offset, text):
+        for index, char in enumerate(text):
+            self.buffer[(offset + index) % len(self.buffer)] = char
+
+    def status(self, elapsed):
+        if self.host:
+            state, mode = "C({0})".format(self.host), "I"
+        else:
+            state, mode = "N", "N"
+        row, col = divmod(self.cursor, self.cols)
+        return "U F U {0} {1} 2 {2} {3} {4} {5} 0x0 {6:.3f}".format(
+            state, mode, self.rows, self.cols, row, col, elapsed
+        )
+
+    def execute(self, line):
+        start = time.monotonic()
+        match = re.match(r"\s*(\w+)\s*(?:\((.*)\))?\s*$", line)
+        if not match:
+            return self.respond(start, ["invalid command: " + line], ok=False)
+        name, args = match.group(1).lower(), match.group(2) or ""
+        if self.command_latency:
+            time.sleep(self.command_latency)
+        if name == "quit":
+            return False
+        handler = getattr(self, "do_" + name, None)
+        try:
+            if handler:
+                data = handler(args)
+            elif name in AID_KEYS:
+                data = self.aid()
+            elif name in NO_OPS:
+                data = []
+            else:
+                raise ValueError("Unknown action: " + name)
+        except (ValueError, IndexError) as error:
+            return self.respond(start, [str(error)], ok=False)
+        return self.respond(start, data)
+
+    def respond(self, start, data, ok=True):
+        lines = ["data: " + line for line in data]
+        lines.append(self.status(time.monotonic() - start))
+        lines.append("ok" if ok else "error")
+        self.output.write("\n".join(lines) + "\n")
+        self.output.flush()
+        return True
+
+    def aid(self):
+        if self.latency:
+            time.sleep(self.latency)
+        self.aid_count += 1
+        message = "RESPONSE {0} READY".format(self.aid_count).ljust(self.cols)
+        self.put_text((self.rows - 1) * self.cols, message)
+        return []
+
+    def do_connect(self, args):
+        if self.latency:
+            time.sleep(self.latency)
+        self.host = args.strip() or "localhost"
+        return []
+
+    def do_disconnect(self, args):
+        self.host = None
+        return []
+
+    def do_ascii(self, args):
+        numbers = [int(number) for number in args.split(",")] if args else []
+        if not numbers:
+            numbers = [0, 0, self.rows, self.cols]
+        if len(numbers) == 3:
+            start = numbers[0] * self.cols + numbers[1]
+            return ["".join(self.cells(start, numbers[2]))]
+        row, col, rows, cols = numbers
+        return [
+            "".join(self.cells((row + r) * self.cols + col, cols)) for r in range(rows)
+        ]
+
+    def cells(self, start, length):
+        return [self.buffer[(start + i) % len(self.buffer)] for i in range(length)]
+
+    def do_readbuffer(self, args):
+        return [
+            " ".join(
+                "{0:02x}".format(ord(char))
+                for char in self.cells(row * self.cols, self.cols)
+            )
+            for row in range(self.rows)
+        ]
+
+    def do_movecursor(self, args):
+        row, col = (int(number) for number in args.split(","))
+        self.cursor = row * self.cols + col
+        return []
+
+    def do_string(self, args):
+        text = args.strip()
+        if text.startswith('"') and text.endswith('"'):
+            text = text[1:-1]
+        self.put_text(self.cursor, text)
+        self.cursor = (self.cursor + len(text)) % len(self.buffer)
+        return []
+
+    def do_deletefield(self, args):
+        end = (self.cursor // self.cols + 1) * self.cols
+        self.put_text(self.cursor, " " * (end - self.cursor))
+        return []
+
+    def do_delete(self, args):
+        end = (self.cursor // self.cols + 1) * self.cols
+        rest = self.cells(self.cursor + 1, end - self.cursor - 1)
+        self.put_text(self.cursor, "".join(rest) + " ")
+        return []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--command-latency", type=float, default=0.0)
+    parser.add_argument("--rows", type=int, default=24)
+    parser.add_argument("--cols", type=int, default=80)
+    options, _ = parser.parse_known_args(argv)
+    emulator = FakeEmulator(
+        options.rows,
+        options.cols,
+        options.latency,
+        options.command_latency,
+        sys.stdout,
+    )
+    for line in sys.stdin:
+        if not emulator.execute(line.rstrip("\r\n")):
+            break
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+A minimal TN3270 server for end-to-end tests without a mainframe.
+
+It negotiates a plain TN3270 session (terminal type, binary and end of
+record, no TN3270E), sends scripted screens with protected and unprotected
+fields, and answers every AID key with the next screen. Texts of the screens
+can contain {0}, {1}, ... which are replaced with the contents of the input
+fields that were sent with the AID key, and {aid} with the name of the key.
+
+Usage: python tn3270_server.py [--host HOST] [--port PORT] [--latency SECONDS]
+                               [--script SCREENS.json]
+
+The script is a json list of screens, each a list of fields like
+{"row": 1, "col": 1, "text": "USERID", "protected": true, "length": 8}.
+Row and col are 1 based and refer to the first character of the field,
+the field attribute is placed in the cell before it.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+
+log = logging.getLogger(__name__)
+
+# telnet commands and options
+IAC = 0xFF
+DONT = 0xFE
+DO = 0xFD
+WONT = 0xFC
+WILL = 0xFB
+SB = 0xFA
+SE = 0xF0
+EOR = 0xEF
+BINARY = 0x00
+TERMINAL_TYPE = 0x18
+END_OF_RECORD = 0x19
+TN3270E = 0x28
+IS = 0x00
+SEND = 0x01
+
+# 3270 data stream
+ERASE_WRITE = 0xF5
+WCC_RESTORE_KEYBOARD = 0xC3
+ORDER_SF = 0x1D
+ORDER_SBA = 0x11
+ORDER_IC = 0x13
+ATTRIBUTE_PROTECTED = 0x20
+ATTRIBUTE_INTENSIFIED = 0x08
+
+# the 6 bit codes used for buffer addresses and field attributes
+CODES = bytes.fromhex(
+    "40c1c2c3c4c5c6c7c8c94a4b4c4d4e4f50d1d2d3d4d5d6d7d8d95a5b5c5d5e5f"
+    "6061e2e3e4e5e6e7e8e96a6b6c6d6e6ff0f1f2f3f4f5f6f7f8f97a7b7c7d7e7f"
+)
+
+AID_NAMES = {0x7D: "ENTER", 0x6D: "CLEAR", 0x6C: "PA1", 0x6E: "PA2", 0x6B: "PA3"}
+# the EBCDIC AID codes of PF1 to PF24
+PF_CODES = bytes.fromhex("f1f2f3f4f5f6f7f8f97a7b7cc1c2c3c4c5c6c7c8c94a4b4c")
+AID_NAMES.update({code: "PF%d" % (index + 1) for index, code in enumerate(PF_CODES)})
+# short read AIDs are sent without cursor address and fields
+SHORT_READ_AIDS = {0x6D, 0x6C, 0x6E, 0x6B}
+
+CODEPAGE = "cp037"
+ROWS = 24
+COLS = 80
+
+DEFAULT_SCREENS = [
+    [
+        {"row": 1, "col": 2, "text": "TN3270 TEST SERVER", "intensified": True},
+        {"row": 5, "col": 2, "text": "USERID   ===>"},
+        {"row": 5, "col": 17, "text": "", "protected": False, "length": 8},
+        {"row": 5, "col": 26, "text": ""},
+        {"row": 6, "col": 2, "text": "PASSWORD ===>"},
+        {"row": 6, "col": 17, "text": "", "protected": False, "length": 8},
+        {"row": 6, "col": 26, "text": ""},
+        {"row": 24, "col": 2, "text": "ENTER YOUR USERID AND PASSWORD"},
+    ],
+    [
+        {"row": 1, "col": 2, "text": "WELCOME {0}", "intensified": True},
+        {"row": 3, "col": 2, "text": "YOU PRESSED {aid}"},
+        {"row": 5, "col": 2, "text": "COMMAND  ===>"},
+        {"row": 5, "col": 17, "text": "", "protected": False, "length": 20},
+        {"row": 5, "col": 38, "text": ""},
+        {"row": 24, "col": 2, "text": "READY"},
+    ],
+]
+
+
+def encode_address(address):
+    return bytes([CODES[(address >> 6) & 0x3F], CODES[address & 0x3F]])
+
+
+def decode_address(data, offset=0):
+    high, low = data[offset], data[offset + 1]
+    if high & 0xC0 == 0:
+        # 14 bit address
+        return (high << 8 | low) & 0x3FFF
+    return (high & 0x3F) << 6 | (low & 0x3F)
+
+
+def escape_iac(data):
+    return data.replace(bytes([IAC]), bytes([IAC, IAC]))
+
+
+def build_screen(fields, inputs=(), aid=""):
+    """
+    Return the 3270 data stream that erases the screen and writes `fields`,
+    placing the cursor in the first unprotected field.
+    """
+    stream = bytearray([ERASE_WRITE, WCC_RESTORE_KEYBOARD])
+    cursor = None
+    for field in fields:
+        start = (field["row"] - 1) * COLS + field["col"] - 1
+        attribute = 0
+        if field.get("protected", True):
+            attribute |= ATTRIBUTE_PROTECTED
+        if field.get("intensified"):
+            attribute |= ATTRIBUTE_INTENSIFIED
+        stream += bytes([ORDER_SBA]) + encode_address((start - 1) % (ROWS * COLS))
+        stream += bytes([ORDER_SF, CODES[attribute]])
+        text = field.get("text", "").format(*inputs, aid=aid)
+        if "length" in field:
+            text = text[: field["length"]]
+        stream += text.encode(CODEPAGE)
+        if cursor is None and not field.get("protected", True):
+            cursor = start
+    if cursor is not None:
+        stream += bytes([ORDER_SBA]) + encode_address(cursor) + bytes([ORDER_IC])
+    return bytes(stream)
+
+
+def parse_input(record):
+    """
+    Return the AID and the contents of the modified fields of an inbound
+    record, ordered by their position on the screen.
+    """
+    aid = record[0]
+    if aid in SHORT_READ_AIDS or len(record) < 3:
+        return aid, []
+    fields = []
+    position = record.find(ORDER_SBA, 3)
+    while position >= 0:
+        start = position + 3
+        address = decode_address(record, position + 1)
+        position = record.find(ORDER_SBA, start)
+        end = len(record) if position < 0 else position
+        fields.append((address, record[start:end].decode(CODEPAGE)))
+    return aid, [text for _, text in sorted(fields)]
+
+
+class TN3270Session(object):
+    """
+    Serves the screens to one client connection
+    """
+
+    def __init__(self, reader, writer, screens, latency=0.0):
+        self.reader = reader
+        self.writer = writer
+        self.screens = screens
+        self.latency = latency
+        self.screen_index = 0
+
+    async def run(self):
+        try:
+            if not await self.negotiate():
+                return
+            self.send_record(build_screen(self.screens[0]))
+            while True:
+                record = await self.read_record()
+                if record is None:
+                    return
+                await self.answer(record)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.writer.close()
+
+    async def negotiate(self):
+        self.send_command(DO, TERMINAL_TYPE)
+        if not await self.expect_command(WILL, TERMINAL_TYPE):
+            return False
+        self.writer.write(bytes([IAC, SB, TERMINAL_TYPE, SEND, IAC, SE]))
+        terminal_type = await self.read_subnegotiation()
+        log.debug("terminal type %s", terminal_type)
+        for option in (END_OF_RECORD, BINARY):
+            self.send_command(DO, option)
+            self.send_command(WILL, option)
+        for _ in range(4):
+            command, option = await self.read_command()
+            if command in (WONT, DONT):
+                return False
+        return True
+
+    def send_command(self, command, option):
+        self.writer.write(bytes([IAC, command, option]))
+
+    async def read_command(self):
+        while True:
+            byte = (await self.reader.readexactly(1))[0]
+            if byte != IAC:
+                continue
+            command = (await self.reader.readexactly(1))[0]
+            if command == SB:
+                await self.read_subnegotiation(started=True)
+                continue
+            option = (await self.reader.readexactly(1))[0]
+            if command == WILL and option == TN3270E:
+                # only plain TN3270 is supported
+                self.send_command(DONT, TN3270E)
+                continue
+            return command, option
+
+    async def expect_command(self, expected, option):
+        command, received = await self.read_command()
+        return command == expected and received == option
+
+    async def read_subnegotiation(self, started=False):
+        if not started:
+            await self.reader.readuntil(bytes([IAC, SB]))
+        data = await self.reader.readuntil(bytes([IAC, SE]))
+        # option, IS and the terminal type
+        return data[2:-2].decode("ascii", "replace")
+
+    async def read_record(self):
+        record = bytearray()
+        while True:
+            try:
+                byte = (await self.reader.readexactly(1))[0]
+            except asyncio.IncompleteReadError:
+                return None
+            if byte != IAC:
+                record.append(byte)
+                continue
+            command = (await self.reader.readexactly(1))[0]
+            if command == EOR:
+                return bytes(record)
+            if command == IAC:
+                record.append(IAC)
+            elif command in (DO, DONT, WILL, WONT):
+                await self.reader.readexactly(1)
+
+    def send_record(self, record):
+        self.writer.write(escape_iac(record) + bytes([IAC, EOR]))
+
+    async def answer(self, record):
+        aid, inputs = parse_input(record)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        aid_name = AID_NAMES.get(aid, "%02X" % aid)
+        if aid_name in ("CLEAR", "PF3"):
+            self.screen_index = 0
+        else:
+            self.screen_index = (self.screen_index + 1) % len(self.screens)
+        screen = self.screens[self.screen_index]
+        # unused placeholders are replaced with blanks
+        inputs = list(inputs) + [""] * 10
+        self.send_record(build_screen(screen, inputs, aid_name))
+        await self.writer.drain()
+
+
+async def start_server(host="127.0.0.1", port=0, screens=None, latency=0.0):
+    """
+    Start the server and return the asyncio server, the port it listens on
+    is in server.sockets[0].getsockname()[1].
+    """
+    screens = screens or DEFAULT_SCREENS
+
+    async def handle(reader, writer):
+        await TN3270Session(reader, writer, screens, latency).run()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3270)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--script")
+    options = parser.parse_args(argv)
+    screens = None
+    if options.script:
+        with open(options.script) as file:
+            screens = json.load(file)
+
+    async def serve():
+        server = await start_server(
+            options.host, options.port, screens, options.latency
+        )
+        print("listening on %s:%s" % server.sockets[0].getsockname()[:2])
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
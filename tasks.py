@@ -4,9 +4,9 @@ from invoke import task
 @task
 def lint_python(c):
     """Perform python code formatting with black, isort and flake8"""
-    c.run("black ./setup.py ./tasks.py Mainframe3270/ utest/")
-    c.run("isort ./setup.py ./tasks.py Mainframe3270/ utest/")
-    c.run("flake8 ./setup.py ./tasks.py Mainframe3270/ utest/")
+    c.run("black ./setup.py ./tasks.py Mainframe3270/ utest/ benchmarks/")
+    c.run("isort ./setup.py ./tasks.py Mainframe3270/ utest/ benchmarks/")
+    c.run("flake8 ./setup.py ./tasks.py Mainframe3270/ utest/ benchmarks/")
     c.run("mypy ./setup.py ./tasks.py Mainframe3270/")
 
 
@@ -38,6 +38,17 @@ def atest(c):
     c.run("robot --loglevel DEBUG atest/")
 
 
+@task
+def benchmark(c):
+    """Runs the benchmarks against a fake s3270 process.
+
+    The results are saved under .benchmarks/, to compare them with
+    `pytest-benchmark compare`. Set FAKE_S3270_LATENCY to simulate the
+    response time of the host in seconds.
+    """
+    c.run("pytest benchmarks/ -o python_files=bench_*.py --benchmark-autosave")
+
+
 @task(utest, atest)
 def test(c):
     """Runs unit and acceptance tests.
@@ -0,0 +1,55 @@
+from robotlibcore import DynamicCore
+
+from Mainframe3270 import Mainframe3270
+
+
+class UncachedMainframe3270(Mainframe3270):
+    add_library_components = DynamicCore.add_library_components
+
+
+def spec_tuple(spec):
+    return (spec.argument_specification, spec.documentation, spec.argument_types)
+
+
+def test_keyword_specs_equal_dynamic_core():
+    under_test = Mainframe3270()
+    expected = UncachedMainframe3270()
+
+    assert under_test.get_keyword_names() == expected.get_keyword_names()
+    assert sorted(under_test.attributes) == sorted(expected.attributes)
+    for name, spec in expected.keywords_spec.items():
+        assert spec_tuple(under_test.keywords_spec[name]) == spec_tuple(spec)
+
+
+def test_keyword_specs_are_built_once(mocker):
+    Mainframe3270()
+    m_build = mocker.patch("robotlibcore.KeywordBuilder.build")
+
+    Mainframe3270()
+
+    m_build.assert_not_called()
+
+
+def test_keywords_are_bound_to_instance():
+    under_test = Mainframe3270()
+
+    assert under_test.keywords["Open Connection"].__self__ is under_test.x3270
+    assert under_test.keywords["log_timing_report"].__self__ is under_test
+
+
+def test_falls_back_to_dynamic_core_without_its_attributes(mocker):
+    m_add = mocker.patch("robotlibcore.DynamicCore.add_library_components")
+    under_test = Mainframe3270.__new__(Mainframe3270)
+
+    under_test.add_library_components([under_test])
+
+    m_add.assert_called_once_with(under_test, [under_test], None, None)
+
+
+def test_falls_back_to_dynamic_core_without_keyword_builder(mocker):
+    mocker.patch("Mainframe3270.KeywordBuilder", None)
+    m_add = mocker.patch("robotlibcore.DynamicCore.add_library_components")
+
+    under_test = Mainframe3270()
+
+    assert [under_test.x3270] in [c[0][1] for c in m_add.call_args_list]
@@ -0,0 +1,76 @@
+import json
+
+import pytest
+from pytest_mock import MockerFixture
+from robot.api import logger
+
+from Mainframe3270 import Mainframe3270
+from Mainframe3270.instrumentation import KEYWORD
+
+
+def test_timing_disabled_by_default():
+    under_test = Mainframe3270()
+
+    assert under_test.instrumentation is None
+    assert not hasattr(under_test, "ROBOT_LIBRARY_LISTENER")
+    with pytest.raises(Exception, match="No timing is recorded"):
+        under_test.log_timing_report()
+
+
+def test_run_keyword_records_duration(mocker: MockerFixture):
+    mocker.patch("robotlibcore.DynamicCore.run_keyword")
+    under_test = Mainframe3270(timing_report="timing.json")
+
+    under_test.run_keyword("Send Enter", [], {})
+
+    assert len(under_test.instrumentation.histograms[(KEYWORD, "Send Enter")]) == 1
+
+
+def test_run_keyword_records_duration_of_failed_keyword(mocker: MockerFixture):
+    mocker.patch("robotlibcore.DynamicCore.run_keyword", side_effect=Exception)
+    under_test = Mainframe3270(
+        run_on_failure_keyword="None", timing_report="timing.json"
+    )
+
+    with pytest.raises(Exception):
+        under_test.run_keyword("Send Enter", [], {})
+
+    assert len(under_test.instrumentation.histograms[(KEYWORD, "Send Enter")]) == 1
+
+
+def test_end_suite_writes_report(tmp_path, mocker: MockerFixture):
+    mocker.patch("robot.api.logger.info")
+    under_test = Mainframe3270(timing_report="timing.json")
+    under_test.x3270.output_folder = str(tmp_path)
+    under_test.instrumentation.record(KEYWORD, "Send Enter", 0.25)
+
+    under_test.ROBOT_LIBRARY_LISTENER[0].end_suite("Suite", {"longname": "Top.Suite"})
+
+    logger.info.assert_called_with(under_test.instrumentation.format_summary())
+    with open(tmp_path / "timing.json") as file:
+        report = json.load(file)
+    assert report["Top.Suite"]["keyword"]["Send Enter"]["p50"] == 0.25
+
+
+def test_log_timing_report(tmp_path, mocker: MockerFixture):
+    mocker.patch("robot.api.logger.info")
+    mocker.patch(
+        "robot.libraries.BuiltIn.BuiltIn.get_variable_value", return_value="Suite"
+    )
+    under_test = Mainframe3270(timing_report="timing.json")
+    under_test.x3270.output_folder = str(tmp_path)
+    under_test.instrumentation.record(KEYWORD, "Send Enter", 0.25)
+
+    report = under_test.log_timing_report()
+
+    assert report["keyword"]["Send Enter"]["count"] == 1
+    assert (tmp_path / "timing.json").exists()
+
+
+def test_end_suite_writes_screenshot_archive(mocker: MockerFixture):
+    under_test = Mainframe3270(screenshot_mode="archive")
+    m_write = mocker.patch.object(under_test.x3270, "write_screenshot_archive")
+
+    under_test.ROBOT_LIBRARY_LISTENER[0].end_suite("Suite", {"longname": "Top.Suite"})
+
+    m_write.assert_called_with("Top.Suite")
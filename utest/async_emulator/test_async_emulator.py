@@ -0,0 +1,231 @@
+import asyncio
+
+import pytest
+from pytest_mock import MockerFixture
+
+from Mainframe3270.async_emulator import AsyncEmulator, AsyncExecutableApp
+from Mainframe3270.py3270 import CommandError, ResponseSizeError, TerminatedError
+
+STATUS = b"U F U C(pub400.com) I 2 24 80 0 0 0x0 0.000\n"
+
+
+class FakeStdin(object):
+    def __init__(self, process):
+        self.process = process
+
+    def write(self, data):
+        for cmdstr in data.splitlines():
+            self.process.commands.append(cmdstr)
+            response = self.process.respond(cmdstr)
+            if response:
+                self.process.stdout.feed_data(response)
+
+    async def drain(self):
+        pass
+
+
+class FakeProcess(object):
+    """Answers every command like s3270, with the responses given per command name."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.commands = []
+        self.returncode = None
+        self.stdin = FakeStdin(self)
+        self.stdout = asyncio.StreamReader()
+
+    def respond(self, cmdstr):
+        name = cmdstr.split(b"(")[0]
+        if name in self.responses:
+            return self.responses[name]
+        if name == b"Quit":
+            # s3270 exits without a response
+            self.stdout.feed_eof()
+            return b""
+        return STATUS + b"ok\n"
+
+    def kill(self):
+        self.returncode = -9
+
+    async def wait(self):
+        return self.returncode
+
+
+class FakeProcesses(object):
+    def __init__(self):
+        self.responses = {}
+        self.processes = []
+
+    async def create_subprocess_exec(self, *args, **kwargs):
+        process = FakeProcess(self.responses)
+        self.processes.append(process)
+        return process
+
+
+@pytest.fixture
+def fake_processes(mocker: MockerFixture):
+    fake_processes = FakeProcesses()
+    mocker.patch(
+        "asyncio.create_subprocess_exec",
+        side_effect=fake_processes.create_subprocess_exec,
+    )
+    return fake_processes
+
+
+def test_async_executable_app_args():
+    under_test = AsyncExecutableApp(["--charset", "german"])
+
+    assert under_test.executable == "s3270"
+    assert under_test.args == [
+        "-xrm",
+        "s3270.unlockDelay: False",
+        "--charset",
+        "german",
+    ]
+
+
+def test_connect(fake_processes):
+    async def run():
+        async with AsyncEmulator() as under_test:
+            await under_test.connect("myhost")
+            assert await under_test.is_connected()
+            return fake_processes.processes[0].commands
+
+    commands = asyncio.run(run())
+
+    assert commands == [b"Connect(myhost)", b"ignore", b"Quit"]
+
+
+def test_string_get(fake_processes):
+    fake_processes.responses.update({b"ascii": b"data: abc\n" + STATUS + b"ok\n"})
+
+    async def run():
+        async with AsyncEmulator() as under_test:
+            return await under_test.string_get(1, 2, 3)
+
+    assert asyncio.run(run()) == "abc"
+    assert fake_processes.processes[0].commands[0] == b"ascii(0,1,3)"
+
+
+def test_read_buffer(fake_processes):
+    fake_processes.responses.update(
+        {b"ReadBuffer": b"data: SF(c0=60) 41 42\n" + STATUS + b"ok\n"}
+    )
+
+    async def run():
+        async with AsyncEmulator() as under_test:
+            return await under_test.read_buffer()
+
+    screen = asyncio.run(run())
+    assert screen.fields[0].text == "AB"
+
+
+def test_command_error(fake_processes):
+    fake_processes.responses.update(
+        {b"MoveCursor": b"data: invalid\n" + STATUS + b"error\n"}
+    )
+
+    async def run():
+        async with AsyncEmulator() as under_test:
+            with pytest.raises(CommandError, match="invalid"):
+                await under_test.send_string(b"abc", 30, 1)
+            # the pipeline is still in sync after the error
+            await under_test.send_enter()
+            return fake_processes.processes[0].commands
+
+    commands = asyncio.run(run())
+
+    assert commands[:3] == [b"MoveCursor(29, 0)", b'String("abc")', b"Enter"]
+
+
+def test_send_string_with_enter(fake_processes):
+    async def run():
+        async with AsyncEmulator() as under_test:
+            await under_test.send_string(b"abc", 5, 10, enter=True)
+            return fake_processes.processes[0].commands
+
+    commands = asyncio.run(run())
+
+    assert commands[:3] == [b"MoveCursor(4, 9)", b'String("abc")', b"Enter"]
+
+
+def test_send_string_with_enter_does_not_send_enter_on_error(fake_processes):
+    fake_processes.responses.update(
+        {b"String": b"data: Keyboard locked\n" + STATUS + b"error\n"}
+    )
+
+    async def run():
+        async with AsyncEmulator() as under_test:
+            with pytest.raises(CommandError, match="Keyboard locked"):
+                await under_test.send_string(b"abc", 5, 10, enter=True)
+            return fake_processes.processes[0].commands
+
+    commands = asyncio.run(run())
+
+    assert b"Enter" not in commands
+
+
+def test_max_response_size(fake_processes):
+    fake_processes.responses.update(
+        {
+            b"ascii": b"data: abc\ndata: def\n" + STATUS + b"ok\n",
+            b"Query": b"data: abc\n" + STATUS + b"ok\n",
+        }
+    )
+
+    async def run():
+        async with AsyncEmulator(max_response_size=4) as under_test:
+            with pytest.raises(ResponseSizeError):
+                await under_test.exec_command(b"ascii")
+            # the pipeline is still in sync after the error
+            sink = bytearray()
+            await under_test.exec_command(b"Query", sink=sink)
+            return sink
+
+    assert asyncio.run(run()) == b"abc\n"
+
+
+def test_command_timeout_kills_emulator(fake_processes):
+    # without a response the command never finishes
+    fake_processes.responses.update({b"Enter": b""})
+
+    async def run():
+        under_test = AsyncEmulator(command_timeout=0.01)
+        with pytest.raises(asyncio.TimeoutError):
+            await under_test.send_enter()
+        return under_test
+
+    under_test = asyncio.run(run())
+
+    assert under_test.is_terminated
+    assert fake_processes.processes[0].returncode == -9
+    with pytest.raises(TerminatedError):
+        asyncio.run(under_test.send_enter())
+
+
+def test_sessions_on_one_event_loop(fake_processes):
+    async def run():
+        emulators = [AsyncEmulator() for i in range(5)]
+        await asyncio.gather(
+            *(e.connect("host%s" % i) for i, e in enumerate(emulators))
+        )
+        await asyncio.gather(*(e.terminate() for e in emulators))
+        return emulators
+
+    emulators = asyncio.run(run())
+
+    assert all(e.is_terminated for e in emulators)
+    assert sorted(e.last_host for e in emulators) == ["host%s" % i for i in range(5)]
+
+
+def test_wait_for_output_timed_out(fake_processes):
+    fake_processes.responses.update(
+        {b"Wait": b"data: Wait: Timed out\n" + STATUS + b"error\n"}
+    )
+
+    async def run():
+        async with AsyncEmulator() as under_test:
+            return await under_test.wait_for_output(0.5)
+
+    assert not asyncio.run(run())
+    assert fake_processes.processes[0].commands[0] == b"Wait(1, Output)"
@@ -0,0 +1,110 @@
+import json
+
+import pytest
+from pytest_mock import MockerFixture
+
+from Mainframe3270.instrumentation import (
+    KEYWORD,
+    RESPONSE,
+    SLEEP,
+    WRITE,
+    Histogram,
+    Instrumentation,
+)
+
+
+@pytest.fixture
+def under_test():
+    return Instrumentation()
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for seconds in range(1, 101):
+        histogram.add(seconds / 100)
+
+    assert len(histogram) == 100
+    assert histogram.percentile(50) == 0.5
+    assert histogram.percentile(95) == 0.95
+    assert histogram.percentile(99) == 0.99
+    assert histogram.percentile(0) == 0.01
+
+
+def test_histogram_keeps_bounded_sample():
+    histogram = Histogram(max_samples=10)
+    for seconds in range(1, 1001):
+        histogram.add(seconds / 1000)
+
+    assert len(histogram) == 1000
+    assert len(histogram.samples) == 10
+    assert histogram.summary()["max"] == 1.0
+    assert histogram.total == pytest.approx(500.5)
+
+
+def test_histogram_empty():
+    assert Histogram().percentile(50) == 0.0
+    assert Histogram().summary()["max"] == 0.0
+
+
+def test_record(under_test: Instrumentation):
+    under_test.record(KEYWORD, "Send Enter", 0.2)
+    under_test.record(KEYWORD, "Send Enter", 0.4)
+    under_test.record(SLEEP, "wait_time", 0.5)
+
+    summary = under_test.summary()
+
+    assert summary[KEYWORD]["Send Enter"]["count"] == 2
+    assert summary[KEYWORD]["Send Enter"]["total"] == pytest.approx(0.6)
+    assert summary[KEYWORD]["Send Enter"]["p99"] == 0.4
+    assert summary[SLEEP]["wait_time"]["p50"] == 0.5
+
+
+def test_timer(mocker: MockerFixture, under_test: Instrumentation):
+    mocker.patch("time.perf_counter", side_effect=[1.0, 1.25])
+
+    with under_test.timer(RESPONSE, "enter"):
+        pass
+
+    assert under_test.histograms[(RESPONSE, "enter")].samples == [0.25]
+
+
+def test_split_timer(mocker: MockerFixture, under_test: Instrumentation):
+    mocker.patch("time.perf_counter", side_effect=[1.0, 1.5])
+
+    with under_test.split_timer(WRITE, ["movecursor", "string"]):
+        pass
+
+    assert under_test.histograms[(WRITE, "movecursor")].samples == [0.25]
+    assert under_test.histograms[(WRITE, "string")].samples == [0.25]
+
+
+def test_format_summary(under_test: Instrumentation):
+    under_test.record(KEYWORD, "Send Enter", 0.25)
+
+    lines = under_test.format_summary().splitlines()
+
+    assert lines[0].split() == ["kind", "name", "count", "total", "p50", "p95", "p99"]
+    assert lines[1].split() == [
+        "keyword",
+        "Send",
+        "Enter",
+        "1",
+        "250.0",
+        "250.0",
+        "250.0",
+        "250.0",
+    ]
+
+
+def test_write_json(tmp_path, under_test: Instrumentation):
+    path = str(tmp_path / "timing.json")
+    with open(path, "w") as file:
+        json.dump({"Other Suite": {}}, file)
+    under_test.record(KEYWORD, "Send Enter", 0.25)
+
+    under_test.write_json(path, "My Suite")
+
+    with open(path) as file:
+        report = json.load(file)
+    assert report["Other Suite"] == {}
+    assert report["My Suite"]["keyword"]["Send Enter"]["count"] == 1
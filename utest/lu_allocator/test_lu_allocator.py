@@ -0,0 +1,125 @@
+import json
+import os
+
+import pytest
+from pytest_mock import MockerFixture
+
+from Mainframe3270.lu_allocator import LUAllocationError, LUAllocator, expand_lu_pool
+
+LUS = ["TERM01", "TERM02"]
+
+
+@pytest.fixture
+def under_test(tmp_path):
+    return LUAllocator(str(tmp_path))
+
+
+def leases(allocator):
+    with open(allocator.registry_path) as file:
+        return json.load(file)
+
+
+def test_expand_lu_pool_list():
+    assert expand_lu_pool(["TERM01", "TERMX"]) == ["TERM01", "TERMX"]
+
+
+def test_expand_lu_pool_string():
+    assert expand_lu_pool("TERM01, TERMX") == ["TERM01", "TERMX"]
+
+
+def test_expand_lu_pool_range():
+    assert expand_lu_pool("TERM08-TERM11,TERMX") == [
+        "TERM08",
+        "TERM09",
+        "TERM10",
+        "TERM11",
+        "TERMX",
+    ]
+
+
+@pytest.mark.parametrize("lu_pool", ["TERM01-LU02", "TERMA-TERMB"])
+def test_expand_lu_pool_invalid_range(lu_pool):
+    with pytest.raises(ValueError, match="Invalid LU range"):
+        expand_lu_pool(lu_pool)
+
+
+def test_acquire(under_test: LUAllocator):
+    assert under_test.acquire("myhost", LUS) == "TERM01"
+    assert under_test.acquire("myhost", LUS) == "TERM02"
+    assert leases(under_test) == {
+        "myhost": {"TERM01": os.getpid(), "TERM02": os.getpid()}
+    }
+
+
+def test_acquire_per_host(under_test: LUAllocator):
+    assert under_test.acquire("myhost", LUS) == "TERM01"
+    assert under_test.acquire("otherhost", LUS) == "TERM01"
+
+
+def test_acquire_leased_by_other_process(mocker: MockerFixture, tmp_path):
+    mocker.patch("Mainframe3270.lu_allocator._pid_alive", return_value=True)
+    other = LUAllocator(str(tmp_path))
+    mocker.patch.object(LUAllocator, "pid", 1)
+    other.acquire("myhost", ["TERM01"])
+    mocker.patch.object(LUAllocator, "pid", 2)
+    under_test = LUAllocator(str(tmp_path))
+
+    assert under_test.acquire("myhost", LUS) == "TERM02"
+    with pytest.raises(
+        LUAllocationError, match="All LUs of the pool are in use on myhost"
+    ):
+        under_test.acquire("myhost", LUS)
+
+
+def test_acquire_reclaims_lease_of_dead_process(
+    mocker: MockerFixture, under_test: LUAllocator
+):
+    mocker.patch("Mainframe3270.lu_allocator._pid_alive", return_value=False)
+    with open(under_test.registry_path, "w") as file:
+        json.dump({"myhost": {"TERM01": 1}}, file)
+
+    assert under_test.acquire("myhost", LUS) == "TERM01"
+
+
+def test_release(under_test: LUAllocator):
+    under_test.acquire("myhost", LUS)
+    under_test.release("myhost", "TERM01")
+
+    assert leases(under_test) == {"myhost": {}}
+    assert under_test.acquire("myhost", LUS) == "TERM01"
+
+
+def test_release_keep(under_test: LUAllocator):
+    under_test.acquire("myhost", LUS)
+    under_test.acquire("myhost", LUS)
+    under_test.release("myhost", "TERM02", keep=True)
+
+    assert leases(under_test) == {
+        "myhost": {"TERM01": os.getpid(), "TERM02": os.getpid()}
+    }
+    assert under_test.acquire("myhost", LUS) == "TERM02"
+
+
+def test_release_kept(under_test: LUAllocator):
+    under_test.acquire("myhost", LUS)
+    under_test.release("myhost", "TERM01", keep=True)
+    under_test.release_kept("myhost", "TERM01")
+
+    assert leases(under_test) == {"myhost": {}}
+
+
+def test_release_kept_acquired_again(under_test: LUAllocator):
+    under_test.acquire("myhost", LUS)
+    under_test.release("myhost", "TERM01", keep=True)
+    under_test.acquire("myhost", LUS)
+    under_test.release_kept("myhost", "TERM01")
+
+    assert leases(under_test) == {"myhost": {"TERM01": os.getpid()}}
+
+
+def test_release_all(under_test: LUAllocator):
+    under_test.acquire("myhost", LUS)
+    under_test.acquire("otherhost", LUS)
+    under_test.release_all()
+
+    assert leases(under_test) == {"myhost": {}, "otherhost": {}}
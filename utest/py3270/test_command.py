@@ -3,7 +3,12 @@ import warnings
 import pytest
 from pytest_mock import MockerFixture
 
-from Mainframe3270.py3270 import Command, CommandError, ExecutableAppLinux
+from Mainframe3270.py3270 import (
+    Command,
+    CommandError,
+    ExecutableAppLinux,
+    ResponseSizeError,
+)
 
 
 def test_command_default(mocker: MockerFixture):
@@ -97,3 +102,102 @@ def test_handle_result_not_ok_or_error(mocker: MockerFixture):
         ValueError, match='expected "ok" or "error" result, but received: abc'
     ):
         under_test.execute()
+
+
+RESPONSE = [
+    b"data: abc\n",
+    b"data: defg\n",
+    b"U U U C(pub400.com) C 4 43 80 4 24 0x0 0.000\n",
+    b"ok\n",
+]
+
+
+def test_execute_into_sink(mocker: MockerFixture):
+    mocker.patch("subprocess.Popen")
+    mocker.patch(
+        "Mainframe3270.py3270.ExecutableAppLinux.readline", side_effect=RESPONSE
+    )
+    app = ExecutableAppLinux()
+    sink = bytearray(16)
+    under_test = Command(app, b"abc", sink=sink)
+
+    under_test.execute()
+
+    assert under_test.data == []
+    assert under_test.data_size == 9
+    assert sink == b"abc\ndefg\n" + bytes(7)
+
+
+def test_execute_into_sink_that_is_too_small(mocker: MockerFixture):
+    mocker.patch("subprocess.Popen")
+    mocker.patch(
+        "Mainframe3270.py3270.ExecutableAppLinux.readline", side_effect=RESPONSE
+    )
+    app = ExecutableAppLinux()
+    sink = bytearray()
+    under_test = Command(app, b"abc", sink=sink)
+
+    under_test.execute()
+
+    assert sink == b"abc\ndefg\n"
+
+
+def test_iter_response(mocker: MockerFixture):
+    mocker.patch("subprocess.Popen")
+    mocker.patch(
+        "Mainframe3270.py3270.ExecutableAppLinux.readline", side_effect=RESPONSE
+    )
+    app = ExecutableAppLinux()
+    under_test = Command(app, b"abc")
+    under_test.send()
+
+    assert list(under_test.iter_response()) == [b"abc", b"defg"]
+    assert under_test.data == []
+    assert under_test.response_size == 9
+    assert under_test.status_line is not None
+
+
+def test_iter_response_error(mocker: MockerFixture):
+    mocker.patch("subprocess.Popen")
+    mocker.patch(
+        "Mainframe3270.py3270.ExecutableAppLinux.readline",
+        side_effect=[b"data: first\n", b"data: invalid\n", b"U U U\n", b"error\n"],
+    )
+    app = ExecutableAppLinux()
+    under_test = Command(app, b"abc")
+
+    with pytest.raises(CommandError, match="^invalid$"):
+        list(under_test.iter_response())
+
+
+def test_max_response_size(mocker: MockerFixture):
+    mocker.patch("subprocess.Popen")
+    readline = mocker.patch(
+        "Mainframe3270.py3270.ExecutableAppLinux.readline", side_effect=RESPONSE
+    )
+    app = ExecutableAppLinux()
+    under_test = Command(app, b"abc", max_response_size=8)
+
+    with pytest.raises(
+        ResponseSizeError,
+        match="The response of abc exceeds the maximum size of 8 bytes",
+    ):
+        under_test.execute()
+
+    # the whole response was read nevertheless
+    assert readline.call_count == 4
+    assert under_test.data == [b"abc"]
+    assert under_test.response_size == 9
+
+
+def test_max_response_size_not_exceeded(mocker: MockerFixture):
+    mocker.patch("subprocess.Popen")
+    mocker.patch(
+        "Mainframe3270.py3270.ExecutableAppLinux.readline", side_effect=RESPONSE
+    )
+    app = ExecutableAppLinux()
+    under_test = Command(app, b"abc", max_response_size=9)
+
+    under_test.execute()
+
+    assert under_test.data == [b"abc", b"defg"]
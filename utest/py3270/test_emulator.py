@@ -1,9 +1,18 @@
 import errno
 import os
+import time
 
 import pytest
 
-from Mainframe3270.py3270 import Emulator, TerminatedError
+from Mainframe3270.instrumentation import RESPONSE, WRITE, Instrumentation
+from Mainframe3270.py3270 import (
+    CommandError,
+    Emulator,
+    FieldTruncateError,
+    Screen,
+    Status,
+    TerminatedError,
+)
 
 CURDIR = os.path.dirname(os.path.realpath(__file__))
 
@@ -38,6 +47,41 @@ def test_emulator_visible(mock_windows):
     ]
 
 
+def test_emulator_with_model(mock_windows):
+    under_test = Emulator(model="5")
+
+    assert under_test.app.args == [
+        "-xrm",
+        "ws3270.unlockDelay: False",
+        "-xrm",
+        "ws3270.model: 5",
+    ]
+
+
+def test_emulator_visible_with_model(mock_windows):
+    under_test = Emulator(visible=True, model="4")
+
+    assert under_test.app.args[-1] == "wc3270.model: 4"
+
+
+def test_emulator_none_windows_with_model(mock_posix):
+    under_test = Emulator(model="3")
+
+    assert under_test.app.args[-2:] == ["-xrm", "s3270.model: 3"]
+
+
+def test_emulator_with_keep_alive(mock_windows):
+    under_test = Emulator(keep_alive=60)
+
+    assert under_test.app.args[-2:] == ["-xrm", "ws3270.nopSeconds: 60"]
+
+
+def test_emulator_none_windows_with_keep_alive(mock_posix):
+    under_test = Emulator(keep_alive=60)
+
+    assert under_test.app.args[-2:] == ["-xrm", "s3270.nopSeconds: 60"]
+
+
 def test_emulator_none_windows(mock_posix):
     under_test = Emulator()
 
@@ -177,3 +221,492 @@ def test_is_connected_NotConnectedException(mock_windows):
     under_test = Emulator()
 
     assert not under_test.is_connected()
+
+
+def test_screen_get(mock_windows, mocker):
+    mocker.patch("Mainframe3270.py3270.ExecutableAppWin.write")
+    mocker.patch(
+        "Mainframe3270.py3270.ExecutableAppWin.readline",
+        side_effect=[
+            b"data: abc",
+            b"data: def",
+            b"U F U C(pub400.com) I 2 24 80 0 0 0x0 0.000",
+            b"ok",
+        ],
+    )
+    under_test = Emulator()
+
+    screen = under_test.screen_get(2, 3)
+
+    under_test.app.write.assert_called_once_with(b"Ascii(0,0,2,3)\n")
+    assert screen.rows == ["abc", "def"]
+
+
+def test_screen_size_unknown(mock_windows):
+    under_test = Emulator()
+
+    assert under_test.screen_size() == (24, 80)
+
+
+def test_screen_size_from_status(mock_windows):
+    under_test = Emulator()
+    under_test.status = Status(b"U F U C(pub400.com) I 5 27 132 0 0 0x0 0.000")
+
+    assert under_test.screen_size() == (27, 132)
+
+
+def test_screen_get_whole_screen(mock_windows, mocker):
+    mocker.patch("Mainframe3270.py3270.ExecutableAppWin.write")
+    mocker.patch(
+        "Mainframe3270.py3270.ExecutableAppWin.readline",
+        side_effect=[b"data: abc", UNLOCKED, b"ok"],
+    )
+    under_test = Emulator()
+    under_test.status = Status(b"U F U C(pub400.com) I 4 43 80 0 0 0x0 0.000")
+
+    under_test.screen_get()
+
+    under_test.app.write.assert_called_once_with(b"Ascii(0,0,43,80)\n")
+
+
+def _mock_responses(mocker, *statuses):
+    """Mock one Ascii() response with the given status line per command."""
+    side_effect = []
+    for status in statuses:
+        side_effect.extend([b"data: abc", status, b"ok"])
+    mocker.patch("Mainframe3270.py3270.ExecutableAppWin.write")
+    mocker.patch(
+        "Mainframe3270.py3270.ExecutableAppWin.readline", side_effect=side_effect
+    )
+
+
+UNLOCKED = b"U F U C(pub400.com) I 2 24 80 0 0 0x0 0.000"
+LOCKED = b"L F U C(pub400.com) I 2 24 80 0 0 0x0 0.000"
+
+
+def test_screen_get_cached(mock_windows, mocker):
+    _mock_responses(mocker, UNLOCKED)
+    under_test = Emulator(cache_screen=True)
+
+    first = under_test.screen_get()
+    second = under_test.screen_get()
+
+    assert first is second
+    under_test.app.write.assert_called_once()
+    assert under_test.screen_cache_hits == 1
+    assert under_test.screen_cache_misses == 1
+
+
+def test_screen_get_not_cached_by_default(mock_windows, mocker):
+    _mock_responses(mocker, UNLOCKED, UNLOCKED)
+    under_test = Emulator()
+
+    under_test.screen_get()
+    under_test.screen_get()
+
+    assert under_test.app.write.call_count == 2
+    assert under_test.screen_cache_hits == 0
+
+
+def test_screen_get_refresh(mock_windows, mocker):
+    _mock_responses(mocker, UNLOCKED, UNLOCKED)
+    under_test = Emulator(cache_screen=True)
+
+    under_test.screen_get()
+    under_test.screen_get(refresh=True)
+
+    assert under_test.app.write.call_count == 2
+
+
+def test_screen_get_not_cached_while_keyboard_locked(mock_windows, mocker):
+    _mock_responses(mocker, LOCKED, LOCKED)
+    under_test = Emulator(cache_screen=True)
+
+    under_test.screen_get()
+    under_test.screen_get()
+
+    assert under_test.app.write.call_count == 2
+
+
+def test_screen_cache_invalidated_by_command(mock_windows, mocker):
+    _mock_responses(mocker, UNLOCKED, UNLOCKED, UNLOCKED)
+    under_test = Emulator(cache_screen=True)
+
+    under_test.screen_get()
+    under_test.exec_command(b"Enter")
+    under_test.screen_get()
+
+    assert under_test.screen_generation == 1
+    assert under_test.screen_cache_misses == 2
+
+
+def test_screen_cache_not_invalidated_by_read_only_command(mock_windows, mocker):
+    _mock_responses(mocker, UNLOCKED, UNLOCKED)
+    under_test = Emulator(cache_screen=True)
+
+    under_test.screen_get()
+    under_test.exec_command(b"MoveCursor(1, 1)")
+    under_test.screen_get()
+
+    assert under_test.screen_generation == 0
+    assert under_test.screen_cache_hits == 1
+
+
+def test_screen_cache_invalidated_by_status_change(mock_windows, mocker):
+    disconnected = b"U F U N I 2 24 80 0 0 0x0 0.000"
+    _mock_responses(mocker, UNLOCKED, disconnected, disconnected)
+    under_test = Emulator()
+
+    under_test.screen_get()
+    under_test.exec_command(b"ignore")
+    under_test.screen_get()
+
+    assert under_test.screen_generation == 1
+    assert under_test.screen_cache_misses == 2
+
+
+def test_wait_for_output(mock_windows, mocker):
+    mocker.patch("Mainframe3270.py3270.Emulator.exec_command")
+    under_test = Emulator()
+
+    assert under_test.wait_for_output(0.2)
+
+    Emulator.exec_command.assert_called_once_with(b"Wait(1, Output)")
+
+
+def test_wait_for_output_timed_out(mock_windows, mocker):
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.exec_command",
+        side_effect=CommandError("Wait: Timed out"),
+    )
+    under_test = Emulator()
+
+    assert not under_test.wait_for_output(2.5)
+
+    Emulator.exec_command.assert_called_once_with(b"Wait(3, Output)")
+
+
+def test_wait_for_output_other_error(mock_windows, mocker):
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.exec_command",
+        side_effect=CommandError("Not connected"),
+    )
+    under_test = Emulator()
+
+    with pytest.raises(CommandError, match="Not connected"):
+        under_test.wait_for_output(1)
+
+
+def test_wait_for_unlock(mock_windows, mocker):
+    mocker.patch("Mainframe3270.py3270.Emulator.exec_command")
+    under_test = Emulator()
+
+    assert under_test.wait_for_unlock(1.5)
+
+    Emulator.exec_command.assert_called_once_with(b"Wait(2, Unlock)")
+
+
+def test_wait_for_unlock_below_one_second_polls(mock_windows, mocker):
+    _mock_responses(mocker, LOCKED, UNLOCKED)
+    mocker.patch("time.sleep")
+    under_test = Emulator()
+    under_test.exec_command(b"Enter")
+
+    assert under_test.wait_for_unlock(0.5)
+
+    assert under_test.app.write.call_args_list[-1] == mocker.call(b"Ignore\n")
+    time.sleep.assert_called_once_with(0.05)
+
+
+def test_wait_for_unlock_below_one_second_timed_out(mock_windows, mocker):
+    _mock_responses(mocker, LOCKED)
+    mocker.patch("time.monotonic", side_effect=[10.0, 10.5])
+    under_test = Emulator()
+    under_test.exec_command(b"Enter")
+
+    assert not under_test.wait_for_unlock(0.25)
+
+    under_test.app.write.assert_called_once_with(b"Enter\n")
+
+
+def test_wait_for_stable_screen(mock_windows, mocker):
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"])
+    )
+    under_test = Emulator()
+
+    assert under_test.wait_for_stable_screen(0.01, 1, interval=0.001)
+
+
+def test_wait_for_stable_screen_timed_out(mock_windows, mocker):
+    screens = (Screen([str(i)]) for i in range(10000))
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get",
+        side_effect=lambda refresh: next(screens),
+    )
+    under_test = Emulator()
+
+    assert not under_test.wait_for_stable_screen(1, 0.02, interval=0.001)
+
+
+def test_wait_for_screen_change(mock_windows, mocker):
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get",
+        side_effect=[Screen(["abc"]), Screen(["abc"]), Screen(["def"])],
+    )
+    mocker.patch("Mainframe3270.py3270.Emulator.wait_for_output", return_value=True)
+    under_test = Emulator()
+
+    assert under_test.wait_for_screen_change(5)
+
+    assert Emulator.wait_for_output.call_count == 2
+    assert under_test.last_screen_checksum == Screen(["def"]).checksum
+
+
+def test_wait_for_screen_change_since_last_aid(mock_windows, mocker):
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["def"])
+    )
+    mocker.patch("Mainframe3270.py3270.Emulator.wait_for_output")
+    under_test = Emulator()
+    under_test.last_screen_checksum = Screen(["abc"]).checksum
+
+    assert under_test.wait_for_screen_change(5)
+
+    Emulator.wait_for_output.assert_not_called()
+
+
+def test_wait_for_screen_change_timed_out(mock_windows, mocker):
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"])
+    )
+    mocker.patch("Mainframe3270.py3270.Emulator.wait_for_output", return_value=False)
+    under_test = Emulator()
+
+    assert not under_test.wait_for_screen_change(1)
+
+
+def test_track_screen_changes(mock_windows, mocker):
+    _mock_responses(mocker, UNLOCKED, LOCKED)
+    under_test = Emulator(track_screen_changes=True)
+
+    command = under_test.exec_command(b"Enter")
+
+    under_test.app.write.assert_called_once_with(b"Ascii(0,0,24,80)\nEnter\n")
+    assert command.cmdstr == b"Enter"
+    assert under_test.last_screen_checksum == Screen(["abc"]).checksum
+
+
+def test_track_screen_changes_in_batch(mock_windows, mocker):
+    _mock_responses(mocker, UNLOCKED, UNLOCKED, LOCKED)
+    under_test = Emulator(track_screen_changes=True)
+
+    commands = under_test.batch([b'String("abc")', b"PF(3)"])
+
+    under_test.app.write.assert_called_once_with(
+        b'String("abc")\nAscii(0,0,24,80)\nPF(3)\n'
+    )
+    assert [c.cmdstr for c in commands] == [b'String("abc")', b"PF(3)"]
+
+
+def test_track_screen_changes_not_for_other_commands(mock_windows, mocker):
+    _mock_responses(mocker, UNLOCKED)
+    under_test = Emulator(track_screen_changes=True)
+
+    under_test.exec_command(b"Tab")
+
+    under_test.app.write.assert_called_once_with(b"Tab\n")
+    assert under_test.last_screen_checksum is None
+
+
+def test_trace_records_screen_before_aid_key(mock_windows, mocker):
+    _mock_responses(mocker, UNLOCKED, LOCKED)
+    under_test = Emulator()
+    under_test.trace = mocker.Mock()
+
+    under_test.exec_command(b"PF(3)")
+
+    under_test.app.write.assert_called_once_with(b"Ascii(0,0,24,80)\nPF(3)\n")
+    key, screen = under_test.trace.record.call_args[0]
+    assert key == "PF(3)"
+    assert screen.rows == ["abc"]
+
+
+def test_trace_error_does_not_fail_aid_key(mock_windows, mocker):
+    _mock_responses(mocker, UNLOCKED, LOCKED)
+    under_test = Emulator()
+    under_test.trace = mocker.Mock()
+    under_test.trace.record.side_effect = OSError("disk full")
+
+    command = under_test.exec_command(b"Enter")
+
+    assert command.cmdstr == b"Enter"
+    assert under_test.status.keyboard == b"L"
+
+
+def test_batch(mock_windows, mocker):
+    _mock_responses(mocker, UNLOCKED, LOCKED)
+    under_test = Emulator()
+
+    commands = under_test.batch([b"MoveCursor(0, 0)", b"Enter"])
+
+    under_test.app.write.assert_called_once_with(b"MoveCursor(0, 0)\nEnter\n")
+    assert [c.status_line for c in commands] == [UNLOCKED, LOCKED]
+    assert [c.data for c in commands] == [[b"abc"], [b"abc"]]
+    assert under_test.status.keyboard == b"L"
+
+
+def test_batch_error(mock_windows, mocker):
+    mocker.patch("Mainframe3270.py3270.ExecutableAppWin.write")
+    mocker.patch(
+        "Mainframe3270.py3270.ExecutableAppWin.readline",
+        side_effect=[
+            b"data: invalid",
+            UNLOCKED,
+            b"error",
+            b"data: abc",
+            UNLOCKED,
+            b"ok",
+        ],
+    )
+    under_test = Emulator()
+
+    with pytest.raises(CommandError, match="invalid"):
+        under_test.batch([b"MoveCursor(99, 99)", b"ascii(0,0,3)"])
+
+    # the response of the second command was consumed as well
+    assert under_test.app.readline.call_count == 6
+
+
+def test_batch_when_is_terminated(mock_windows):
+    under_test = Emulator()
+    under_test.is_terminated = True
+
+    with pytest.raises(
+        TerminatedError, match="This Emulator instance has been terminated"
+    ):
+        under_test.batch([b"abc"])
+
+
+def test_send_string_with_enter(mock_windows, mocker):
+    _mock_responses(mocker, UNLOCKED, UNLOCKED, LOCKED)
+    under_test = Emulator()
+
+    under_test.send_string(b"abc", 5, 10, enter=True)
+
+    assert under_test.app.write.call_args_list == [
+        mocker.call(b'MoveCursor(4, 9)\nString("abc")\n'),
+        mocker.call(b"Enter\n"),
+    ]
+
+
+def test_send_string_with_enter_does_not_send_enter_on_error(mock_windows, mocker):
+    mocker.patch("Mainframe3270.py3270.ExecutableAppWin.write")
+    mocker.patch(
+        "Mainframe3270.py3270.ExecutableAppWin.readline",
+        side_effect=[
+            UNLOCKED,
+            b"ok",
+            b"data: Keyboard locked",
+            LOCKED,
+            b"error",
+        ],
+    )
+    under_test = Emulator()
+
+    with pytest.raises(CommandError, match="Keyboard locked"):
+        under_test.send_string(b"abc", 5, 10, enter=True)
+
+    under_test.app.write.assert_called_once_with(b'MoveCursor(4, 9)\nString("abc")\n')
+
+
+def test_fill_field(mock_windows, mocker):
+    mocker.patch("Mainframe3270.py3270.Emulator.batch")
+    under_test = Emulator()
+
+    under_test.fill_field(5, 5, b"abc", 5)
+
+    Emulator.batch.assert_called_once_with(
+        [b"MoveCursor(4, 4)", b"DeleteField", b'String("abc")']
+    )
+
+
+def test_fill_field_truncate(mock_windows):
+    under_test = Emulator()
+
+    with pytest.raises(FieldTruncateError):
+        under_test.fill_field(5, 5, b"abcdef", 5)
+
+
+def test_fill_fields_single_write(mock_windows, mocker):
+    mocker.patch("Mainframe3270.py3270.ExecutableAppWin.write")
+    mocker.patch(
+        "Mainframe3270.py3270.ExecutableAppWin.readline",
+        side_effect=[UNLOCKED, b"ok"] * 6,
+    )
+    under_test = Emulator()
+
+    under_test.fill_fields([(1, 1, b"a"), (2, 1, b"b")])
+
+    under_test.app.write.assert_called_once_with(
+        b'MoveCursor(0, 0)\nDeleteField\nString("a")\n'
+        b'MoveCursor(1, 0)\nDeleteField\nString("b")\n'
+    )
+
+
+def test_fill_fields_empty(mock_windows, mocker):
+    mocker.patch("Mainframe3270.py3270.Emulator.batch")
+    under_test = Emulator()
+
+    under_test.fill_fields([])
+
+    Emulator.batch.assert_not_called()
+
+
+def test_read_buffer(mock_windows, mocker):
+    mocker.patch("Mainframe3270.py3270.ExecutableAppWin.write")
+    mocker.patch(
+        "Mainframe3270.py3270.ExecutableAppWin.readline",
+        side_effect=[b"data: SF(c0=60) 41 42", UNLOCKED, b"ok"],
+    )
+    under_test = Emulator(cache_screen=True)
+
+    screen = under_test.read_buffer()
+
+    under_test.app.write.assert_called_once_with(b"ReadBuffer(Ascii)\n")
+    assert screen.text == " AB"
+    assert screen.fields[0].text == "AB"
+    assert under_test.read_buffer() is screen
+
+
+def test_exec_command_instrumented(mock_windows, mocker):
+    mocker.patch("Mainframe3270.py3270.ExecutableAppWin.write")
+    mocker.patch(
+        "Mainframe3270.py3270.ExecutableAppWin.readline",
+        side_effect=[UNLOCKED, b"ok"],
+    )
+    instrumentation = Instrumentation()
+    under_test = Emulator(instrumentation=instrumentation)
+
+    under_test.exec_command(b"PF(3)")
+
+    assert len(instrumentation.histograms[(WRITE, "pf")]) == 1
+    assert len(instrumentation.histograms[(RESPONSE, "pf")]) == 1
+
+
+def test_batch_instrumented(mock_windows, mocker):
+    mocker.patch("Mainframe3270.py3270.ExecutableAppWin.write")
+    mocker.patch(
+        "Mainframe3270.py3270.ExecutableAppWin.readline",
+        side_effect=[UNLOCKED, b"ok"] * 2,
+    )
+    instrumentation = Instrumentation()
+    under_test = Emulator(instrumentation=instrumentation)
+
+    under_test.batch([b"MoveCursor(0, 0)", b"Enter"])
+
+    assert (WRITE, "batch") not in instrumentation.histograms
+    assert len(instrumentation.histograms[(WRITE, "movecursor")]) == 1
+    assert len(instrumentation.histograms[(WRITE, "enter")]) == 1
+    assert len(instrumentation.histograms[(RESPONSE, "movecursor")]) == 1
+    assert len(instrumentation.histograms[(RESPONSE, "enter")]) == 1
@@ -0,0 +1,184 @@
+import pytest
+
+from Mainframe3270.py3270 import Field, Screen, screen_checksum
+
+
+@pytest.fixture
+def under_test():
+    return Screen(["abc", "def", "ghi"])
+
+
+def test_screen(under_test: Screen):
+    assert under_test.rows == ["abc", "def", "ghi"]
+    assert under_test.text == "abcdefghi"
+    assert under_test.row_number == 3
+    assert under_test.col_number == 3
+
+
+def test_string_get(under_test: Screen):
+    assert under_test.string_get(2, 2, 2) == "ef"
+
+
+def test_string_get_wraps_to_next_row(under_test: Screen):
+    assert under_test.string_get(1, 3, 3) == "cde"
+
+
+def test__str__(under_test: Screen):
+    assert str(under_test) == "abc\ndef\nghi"
+
+
+def test_from_ascii():
+    buffer = bytearray(b"abc\ndef\nghi\nstale")
+
+    screen = Screen.from_ascii(buffer, 12)
+
+    assert screen.text == "abcdefghi"
+    assert screen.rows == ["abc", "def", "ghi"]
+    assert screen.row_number == 3
+    assert screen.col_number == 3
+
+
+def test_from_ascii_with_escapes():
+    screen = Screen.from_ascii(bytearray(b"a\\x41c\ndef\n"), 13)
+
+    assert screen.rows == ["aAc", "def"]
+
+
+def test_from_ascii_with_escapes_keeps_row_offsets():
+    buffer = bytearray(b"C:\\tEMP\nabcdefg\nTARGET \n")
+
+    screen = Screen.from_ascii(buffer, len(buffer), 7)
+
+    assert screen.rows[0] == "C:\tEMP"
+    assert screen.col_number == 7
+    assert screen.string_get(3, 1, 6) == "TARGET"
+    assert screen.find_all("TARGET") == [(3, 1)]
+
+
+def test_from_ascii_empty():
+    screen = Screen.from_ascii(bytearray(), 0)
+
+    assert screen.rows == []
+    assert screen.col_number == 0
+
+
+def test_checksum():
+    ascii_screen = Screen.from_ascii(bytearray(b"abc\ndef\n"), 8)
+
+    assert ascii_screen.checksum == screen_checksum([b"abc", b"def"])
+    assert Screen(["abc", "def"]).checksum == ascii_screen.checksum
+    assert Screen(["abc", "deF"]).checksum != ascii_screen.checksum
+
+
+def test_row(under_test: Screen):
+    assert under_test.row(2) == "def"
+
+
+def test_find_all():
+    screen = Screen(["abcab", "cabcx"])
+
+    assert screen.find_all("abc") == [(1, 1), (2, 2)]
+    assert screen.find_all("x") == [(2, 5)]
+    assert screen.find_all("") == [(1, 1)]
+    assert screen.find_all("z") == []
+
+
+def test_find_all_does_not_match_across_rows(under_test: Screen):
+    assert under_test.find_all("cd") == []
+
+
+def test_find_all_rows_of_different_length():
+    screen = Screen(["ab", "abc", "a"])
+
+    assert screen.find_all("a") == [(1, 1), (2, 1), (3, 1)]
+    assert screen.find_all("bc") == [(2, 2)]
+
+
+def test_find_all_ignore_case():
+    screen = Screen(["aBc", "ABC"])
+
+    assert screen.find_all("abc", ignore_case=True) == [(1, 1), (2, 1)]
+    assert screen.find_all("ABC") == [(2, 1)]
+
+
+def test_find_all_ignore_case_keeps_offsets():
+    # the lower case of "İ" has two characters
+    screen = Screen(["İab", "cde"])
+
+    assert screen.find_all("ab", ignore_case=True) == [(1, 2)]
+    assert screen.find_all("cd", ignore_case=True) == [(2, 1)]
+
+
+def test_contains(under_test: Screen):
+    assert under_test.contains("ef")
+    assert under_test.contains("GHI", ignore_case=True)
+    assert not under_test.contains("cd")
+
+
+# 2 rows of 6 cells: a protected label field and an unprotected numeric field
+READ_BUFFER = [
+    b"SF(c0=e8) 49 44 3a SF(c0=d0) 31",
+    b"32 SA(41=f1) 00 00 00 00 c3a4",
+]
+
+
+@pytest.fixture
+def formatted():
+    return Screen.from_read_buffer(READ_BUFFER)
+
+
+def test_from_read_buffer(formatted: Screen):
+    assert formatted.rows == [" ID: 1", "2    ä"]
+    assert [field.start for field in formatted.fields] == [1, 5]
+    assert [field.length for field in formatted.fields] == [3, 7]
+    assert [field.text for field in formatted.fields] == ["ID:", "12    ä"]
+
+
+def test_from_read_buffer_field_attributes(formatted: Screen):
+    label, value = formatted.fields
+
+    assert label.protected and label.intensified and not label.numeric
+    assert not value.protected and value.numeric and not value.intensified
+    assert (value.row, value.col) == (1, 6)
+
+
+def test_from_read_buffer_unformatted():
+    screen = Screen.from_read_buffer([b"41 42"])
+
+    assert screen.text == "AB"
+    assert screen.fields == []
+    assert screen.field_at(1, 1) is None
+
+
+def test_field_at(formatted: Screen):
+    assert formatted.field_at(1, 3) is formatted.fields[0]
+    assert formatted.field_at(2, 4) is formatted.fields[1]
+
+
+def test_field_at_wraps_around_to_last_field(formatted: Screen):
+    screen = Screen.from_read_buffer([b"41 SF(c0=60) 42"])
+
+    assert screen.field_at(1, 1) is screen.fields[0]
+    assert screen.fields[0].text == "BA"
+
+
+def test_field_at_field_attribute(formatted: Screen):
+    assert formatted.field_at(1, 5) is None
+
+
+def test_field_at_unknown_fields(under_test: Screen):
+    assert under_test.field_at(1, 1) is None
+
+
+def test_field_by_label(formatted: Screen):
+    assert formatted.field_by_label("ID:") is formatted.fields[1]
+
+
+def test_field_by_label_not_found(formatted: Screen):
+    assert formatted.field_by_label("Name:") is None
+
+
+def test_field_hidden_and_modified():
+    field = Field(0, 1, 0x0D, 1, 1)
+
+    assert field.hidden and field.modified and not field.intensified
@@ -0,0 +1,161 @@
+import json
+
+import pytest
+from pytest_mock import MockerFixture
+
+from Mainframe3270.py3270 import Emulator
+from Mainframe3270.replay import (
+    RecordingApp,
+    ReplayApp,
+    ReplayError,
+    command_key,
+    read_transcript,
+)
+
+UNLOCKED = b"U F U C(myhost) I 2 24 80 0 0 0x0 0.000"
+LOCKED = b"L F U C(myhost) I 2 24 80 0 0 0x0 0.000"
+
+TRANSCRIPT = [
+    (b"Connect(myhost)", [UNLOCKED, b"ok"]),
+    (b"Ascii(0,0,24,80)", [b"data: LOGIN", UNLOCKED, b"ok"]),
+    (b'String("me")', [UNLOCKED, b"ok"]),
+    (b"Ascii(0,0,24,80)", [b"data: LOGIN me", UNLOCKED, b"ok"]),
+    (b"Enter", [LOCKED, b"ok"]),
+    (b"Wait(4.5, Unlock)", [UNLOCKED, b"ok"]),
+    (b"Ascii(0,0,24,80)", [b"data: WELCOME", UNLOCKED, b"ok"]),
+]
+
+
+def test_command_key():
+    assert command_key(b"Enter") == b"enter"
+    assert command_key(b"PF(3)") == b"pf(3)"
+    assert command_key(b'String("a b")') == b'string("a b")'
+    assert command_key(b"Connect(L:myhost:992)") == b"connect"
+    assert command_key(b"Wait(4.5, Unlock)") == command_key(b"Wait(30, Unlock)")
+    assert command_key(b"Wait(Output)") == b"wait(Output)"
+
+
+def test_replay_answers_from_transcript():
+    under_test = ReplayApp(TRANSCRIPT)
+
+    under_test.write(b"Connect(myhost)\nAscii(0,0,24,80)\n")
+
+    assert [under_test.readline() for _ in range(5)] == [
+        UNLOCKED + b"\n",
+        b"ok\n",
+        b"data: LOGIN\n",
+        UNLOCKED + b"\n",
+        b"ok\n",
+    ]
+    assert under_test.readline() == b""
+
+
+def test_replay_emulator():
+    under_test = Emulator(app=ReplayApp(TRANSCRIPT))
+
+    under_test.connect("otherhost")
+    assert under_test.screen_get().rows == ["LOGIN"]
+    under_test.send_string(b"me")
+    under_test.send_enter()
+    under_test.wait_for_unlock(30)
+
+    assert under_test.screen_get().rows == ["WELCOME"]
+
+
+def test_replay_repeats_last_screen():
+    under_test = Emulator(app=ReplayApp(TRANSCRIPT), cache_screen=False)
+    under_test.connect("myhost")
+
+    assert under_test.screen_get().rows == ["LOGIN"]
+    assert under_test.screen_get().rows == ["LOGIN"]
+
+
+def test_replay_skips_screens_that_are_not_read():
+    under_test = Emulator(app=ReplayApp(TRANSCRIPT))
+    under_test.connect("myhost")
+    under_test.send_string(b"me")
+    under_test.send_enter()
+
+    assert under_test.screen_get().rows == ["WELCOME"]
+
+
+def test_replay_mismatch():
+    under_test = Emulator(app=ReplayApp(TRANSCRIPT))
+    under_test.connect("myhost")
+
+    with pytest.raises(
+        ReplayError,
+        match="PF\\(3\\) does not match the transcript at command 2, "
+        "expected Ascii\\(0,0,24,80\\)",
+    ):
+        under_test.exec_command(b"PF(3)")
+
+
+def test_replay_does_not_skip_cursor_movement():
+    under_test = ReplayApp(
+        [
+            (b"MoveCursor(4, 9)", [UNLOCKED, b"ok"]),
+            (b'String("me")', [UNLOCKED, b"ok"]),
+        ]
+    )
+
+    with pytest.raises(ReplayError, match="expected MoveCursor\\(4, 9\\)"):
+        under_test.write(b'String("me")\n')
+
+
+def test_replay_quit():
+    under_test = Emulator(app=ReplayApp(TRANSCRIPT))
+
+    under_test.terminate()
+
+    assert under_test.is_terminated
+
+
+def test_recording_app(tmp_path, mocker: MockerFixture):
+    app = mocker.Mock()
+    app.connect.return_value = False
+    app.readline.side_effect = [
+        UNLOCKED,
+        b"ok",
+        b"data: LOGIN\n",
+        UNLOCKED + b"\n",
+        b"ok\n",
+    ]
+    path = str(tmp_path / "transcript.jsonl")
+    under_test = Emulator(app=RecordingApp(app, path))
+
+    under_test.connect("myhost")
+    under_test.screen_get(1, 5)
+    under_test.app.close()
+
+    app.close.assert_called_once()
+    assert read_transcript(path) == [
+        (b"Connect(myhost)", [UNLOCKED, b"ok"]),
+        (b"Ascii(0,0,1,5)", [b"data: LOGIN", UNLOCKED, b"ok"]),
+    ]
+    with open(path) as file:
+        assert json.loads(file.readline())["command"] == "Connect(myhost)"
+
+
+def test_read_transcript_of_any_bytes(tmp_path, mocker: MockerFixture):
+    app = mocker.Mock()
+    app.readline.side_effect = [b"data: \xff\xfe", UNLOCKED, b"ok"]
+    path = str(tmp_path / "transcript.jsonl")
+    recording = RecordingApp(app, path)
+
+    recording.write(b"Ascii()\n")
+    for _ in range(3):
+        recording.readline()
+    recording.close()
+
+    assert read_transcript(path)[0][1][0] == b"data: \xff\xfe"
+    assert ReplayApp(path).entries[0][0] == b"ascii()"
+
+
+def test_replay_wait_that_was_not_recorded():
+    under_test = Emulator(app=ReplayApp(TRANSCRIPT))
+    under_test.connect("myhost")
+
+    under_test.wait_for_field()
+
+    assert under_test.status.keyboard == b"U"
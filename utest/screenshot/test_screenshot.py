@@ -0,0 +1,117 @@
+import zipfile
+
+from Mainframe3270.py3270 import Screen
+from Mainframe3270.screenshot import (
+    ScreenshotArchive,
+    archive_name,
+    render_html,
+    render_html_document,
+    render_text,
+    screen_hash,
+)
+
+SCREEN = Screen(["USERID <me>", "PASSWORD & "])
+
+
+def test_render_text():
+    assert render_text(SCREEN) == "USERID <me>\nPASSWORD & "
+
+
+def test_render_html_escapes_screen():
+    html = render_html(SCREEN)
+
+    assert html.startswith("<pre ")
+    assert html.endswith(">USERID &lt;me&gt;\nPASSWORD &amp; </pre>")
+
+
+def test_render_html_document():
+    document = render_html_document(SCREEN)
+
+    assert document.startswith("<html>")
+    assert render_html(SCREEN) in document
+
+
+def test_archive_name():
+    assert archive_name("Top.My Suite/1") == "screenshots_Top.My_Suite_1.zip"
+
+
+def test_write_archive(tmp_path):
+    path = str(tmp_path / "images" / "screenshots.zip")
+    under_test = ScreenshotArchive()
+    under_test.add("screenshot_1.html", "first")
+    under_test.add("screenshot_2.html", "second")
+
+    assert under_test.write(path) == 2
+
+    assert len(under_test) == 0
+    with zipfile.ZipFile(path) as archive:
+        assert archive.namelist() == ["screenshot_1.html", "screenshot_2.html"]
+        assert archive.read("screenshot_2.html") == b"second"
+
+
+def test_write_appends_to_archive(tmp_path):
+    path = str(tmp_path / "screenshots.zip")
+    under_test = ScreenshotArchive()
+    under_test.add("screenshot_1.html", "first")
+    under_test.write(path)
+    under_test.add("screenshot_2.html", "second")
+
+    under_test.write(path)
+
+    with zipfile.ZipFile(path) as archive:
+        assert archive.namelist() == ["screenshot_1.html", "screenshot_2.html"]
+
+
+def test_write_skips_names_in_archive(tmp_path):
+    path = str(tmp_path / "screenshots.zip")
+    under_test = ScreenshotArchive()
+    under_test.add("screenshot_1.html", "first")
+    under_test.write(path)
+    under_test.add("screenshot_1.html", "first")
+    under_test.add("screenshot_2.html", "second")
+
+    assert under_test.write(path) == 1
+
+    with zipfile.ZipFile(path) as archive:
+        assert archive.namelist() == ["screenshot_1.html", "screenshot_2.html"]
+
+
+def test_write_replaces_archive_of_previous_run(tmp_path):
+    path = str(tmp_path / "screenshots.zip")
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("screenshot_1.html", "first")
+    under_test = ScreenshotArchive()
+    under_test.add("screenshot_1.html", "first")
+
+    assert under_test.write(path) == 1
+
+    with zipfile.ZipFile(path) as archive:
+        assert archive.namelist() == ["screenshot_1.html"]
+
+
+def test_write_empty_archive(tmp_path):
+    path = tmp_path / "screenshots.zip"
+
+    assert ScreenshotArchive().write(str(path)) == 0
+
+    assert not path.exists()
+
+
+def test_screen_hash_of_equal_screens():
+    assert screen_hash(Screen(["USERID <me>", "PASSWORD & "])) == screen_hash(SCREEN)
+
+
+def test_screen_hash_of_different_screens():
+    assert screen_hash(Screen(["USERID <me>", "PASSWORD * "])) != screen_hash(SCREEN)
+    assert screen_hash(Screen(["USERID <me>PASSWORD & "])) != screen_hash(SCREEN)
+
+
+def test_archive_contains_added_names(tmp_path):
+    under_test = ScreenshotArchive()
+    under_test.add("screenshot_1.html", "first")
+
+    assert "screenshot_1.html" in under_test
+
+    under_test.write(str(tmp_path / "screenshots.zip"))
+
+    assert "screenshot_1.html" not in under_test
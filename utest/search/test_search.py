@@ -0,0 +1,22 @@
+import re
+
+from Mainframe3270.search import compile_regex, glob_matcher, pattern_cache_info
+
+
+def test_compile_regex_cached():
+    compile_regex.cache_clear()
+
+    first = compile_regex(r"\d+", re.MULTILINE)
+    second = compile_regex(r"\d+", re.MULTILINE)
+
+    assert first is second
+    assert pattern_cache_info()["regex"] == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_glob_matcher_cached():
+    glob_matcher.cache_clear()
+
+    assert glob_matcher("*abc*") is glob_matcher("*abc*")
+    assert glob_matcher("*abc*").match("xabcx")
+    assert not glob_matcher("*ABC*").match("xabcx")
+    assert pattern_cache_info()["match"] == {"hits": 2, "misses": 2, "size": 2}
@@ -0,0 +1,125 @@
+import socket
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from Mainframe3270.py3270 import TerminatedError
+from Mainframe3270.session_pool import SessionPool
+
+KEY = (False, "myhost:23", None, None)
+OTHER_KEY = (False, "otherhost:23", None, None)
+
+
+def make_emulator(connected=True):
+    emulator = MagicMock()
+    emulator.is_connected.return_value = connected
+    return emulator
+
+
+@pytest.fixture
+def under_test():
+    return SessionPool(max_size=2, max_idle=300)
+
+
+def test_make_key():
+    assert SessionPool.make_key(True, "myhost:23", ["--charset", "german"]) == (
+        True,
+        "myhost:23",
+        ("--charset", "german"),
+        None,
+    )
+    assert SessionPool.make_key(False, "myhost:23") == KEY
+    assert SessionPool.make_key(False, "myhost:23", model="4") != KEY
+
+
+def test_checkout_empty(under_test: SessionPool):
+    assert under_test.checkout(KEY) is None
+
+
+def test_checkin_and_checkout(under_test: SessionPool):
+    emulator = make_emulator()
+
+    assert under_test.checkin(KEY, emulator)
+
+    assert under_test.checkout(OTHER_KEY) is None
+    assert under_test.checkout(KEY) is emulator
+    assert len(under_test) == 0
+    emulator.invalidate_screen.assert_called_once()
+
+
+def test_checkin_disabled():
+    under_test = SessionPool()
+
+    assert not under_test.checkin(KEY, make_emulator())
+    assert len(under_test) == 0
+
+
+def test_checkin_full_evicts_oldest(under_test: SessionPool):
+    emulators = [make_emulator() for i in range(3)]
+
+    for emulator in emulators:
+        under_test.checkin(KEY, emulator)
+
+    assert len(under_test) == 2
+    emulators[0].terminate.assert_called_once()
+    assert under_test.checkout(KEY) is emulators[2]
+
+
+def test_checkout_disconnected(under_test: SessionPool):
+    emulator = make_emulator(connected=False)
+    under_test.checkin(KEY, emulator)
+
+    assert under_test.checkout(KEY) is None
+    emulator.terminate.assert_called_once()
+
+
+def test_checkout_terminated(under_test: SessionPool):
+    emulator = make_emulator()
+    emulator.is_connected.side_effect = TerminatedError
+    under_test.checkin(KEY, emulator)
+
+    assert under_test.checkout(KEY) is None
+
+
+def test_evict_expired(mocker: MockerFixture, under_test: SessionPool):
+    mocker.patch("time.monotonic", side_effect=[0.0, 0.0, 100.0, 100.0, 400.0])
+    old, new = make_emulator(), make_emulator()
+    under_test.checkin(KEY, old)
+    under_test.checkin(KEY, new)
+
+    under_test.evict_expired()
+
+    old.terminate.assert_called_once()
+    new.terminate.assert_not_called()
+    assert len(under_test) == 1
+
+
+def test_clear(under_test: SessionPool):
+    emulator = make_emulator()
+    emulator.terminate.side_effect = socket.error
+    under_test.checkin(KEY, emulator)
+
+    under_test.clear()
+
+    emulator.terminate.assert_called_once()
+    assert len(under_test) == 0
+
+
+def test_terminate_releases_lu_lease(mocker: MockerFixture, under_test: SessionPool):
+    m_release_kept = mocker.patch("Mainframe3270.lu_allocator.LUAllocator.release_kept")
+    under_test.checkin(KEY, make_emulator(), ("myhost", "TERM01"))
+    under_test.checkin(OTHER_KEY, make_emulator())
+
+    under_test.clear()
+
+    m_release_kept.assert_called_once_with("myhost", "TERM01")
+
+
+def test_checkin_full_releases_lu_lease(mocker: MockerFixture, under_test: SessionPool):
+    m_release_kept = mocker.patch("Mainframe3270.lu_allocator.LUAllocator.release_kept")
+    under_test.checkin(KEY, make_emulator(), ("myhost", "TERM01"))
+    under_test.checkin(KEY, make_emulator(), ("myhost", "TERM02"))
+    under_test.checkin(KEY, make_emulator(), ("myhost", "TERM03"))
+
+    m_release_kept.assert_called_once_with("myhost", "TERM01")
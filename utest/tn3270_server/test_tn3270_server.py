@@ -0,0 +1,88 @@
+import asyncio
+
+from benchmarks.tn3270_server import (
+    AID_NAMES,
+    BINARY,
+    CODEPAGE,
+    DO,
+    END_OF_RECORD,
+    EOR,
+    IAC,
+    IS,
+    ORDER_SBA,
+    SB,
+    SE,
+    SEND,
+    TERMINAL_TYPE,
+    WILL,
+    encode_address,
+    start_server,
+)
+
+
+def test_aid_names():
+    assert AID_NAMES[0xF1] == "PF1"
+    assert AID_NAMES[0xF3] == "PF3"
+    assert AID_NAMES[0xF9] == "PF9"
+    assert AID_NAMES[0x7A] == "PF10"
+    assert AID_NAMES[0x7C] == "PF12"
+    assert AID_NAMES[0xC1] == "PF13"
+    assert AID_NAMES[0xC9] == "PF21"
+    assert AID_NAMES[0x4A] == "PF22"
+    assert AID_NAMES[0x4C] == "PF24"
+
+
+async def negotiate(reader, writer):
+    assert await reader.readexactly(3) == bytes([IAC, DO, TERMINAL_TYPE])
+    writer.write(bytes([IAC, WILL, TERMINAL_TYPE]))
+    subnegotiation = await reader.readuntil(bytes([IAC, SE]))
+    assert subnegotiation == bytes([IAC, SB, TERMINAL_TYPE, SEND, IAC, SE])
+    writer.write(bytes([IAC, SB, TERMINAL_TYPE, IS]) + b"IBM-3278-2")
+    writer.write(bytes([IAC, SE]))
+    options = await reader.readexactly(12)
+    expected = [IAC, DO, END_OF_RECORD, IAC, WILL, END_OF_RECORD]
+    expected += [IAC, DO, BINARY, IAC, WILL, BINARY]
+    assert options == bytes(expected)
+    for option in (END_OF_RECORD, BINARY):
+        writer.write(bytes([IAC, WILL, option, IAC, DO, option]))
+
+
+async def read_text(reader):
+    record = await reader.readuntil(bytes([IAC, EOR]))
+    return record[:-2].decode(CODEPAGE)
+
+
+def send_aid(writer, aid, fields=()):
+    record = bytes([aid]) + encode_address(0)
+    for address, text in fields:
+        record += bytes([ORDER_SBA]) + encode_address(address)
+        record += text.encode(CODEPAGE)
+    writer.write(record + bytes([IAC, EOR]))
+
+
+def test_session():
+    async def run():
+        server = await start_server()
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            await negotiate(reader, writer)
+            screens = [await read_text(reader)]
+            # PF5 with the user id typed into row 5, column 17
+            send_aid(writer, 0xF5, [(4 * 80 + 16, "USER")])
+            screens.append(await read_text(reader))
+            send_aid(writer, 0xF3)
+            screens.append(await read_text(reader))
+            return screens
+        finally:
+            writer.close()
+            server.close()
+            await server.wait_closed()
+
+    first, second, third = asyncio.run(run())
+
+    assert "TN3270 TEST SERVER" in first
+    assert "WELCOME USER" in second
+    assert "YOU PRESSED PF5" in second
+    # PF3 returns to the first screen
+    assert "TN3270 TEST SERVER" in third
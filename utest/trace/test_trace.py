@@ -0,0 +1,128 @@
+import io
+import json
+
+from Mainframe3270.py3270 import Screen
+from Mainframe3270.trace import (
+    TraceRecorder,
+    apply_changes,
+    export_html,
+    main,
+    read_trace,
+    row_changes,
+)
+
+LOGIN = Screen(["WELCOME   ", "USERID    ", "          "])
+MENU = Screen(["WELCOME   ", "USERID ME ", "READY     "])
+
+
+def record(path, *screens):
+    recorder = TraceRecorder(str(path))
+    for key, screen in screens:
+        recorder.record(key, screen)
+    recorder.close()
+    return recorder
+
+
+def test_row_changes():
+    changes = row_changes(LOGIN.rows, MENU.rows)
+
+    assert changes == [[1, 7, "ME"], [2, 0, "READY"]]
+
+
+def test_apply_changes():
+    rows = list(LOGIN.rows)
+
+    apply_changes(rows, row_changes(LOGIN.rows, MENU.rows))
+
+    assert rows == MENU.rows
+
+
+def test_row_changes_of_rows_with_other_length():
+    changes = row_changes(["abc", "def"], ["abcd", "de"])
+
+    assert changes == [[0, "abcd"], [1, "de"]]
+
+
+def test_apply_changes_of_rows_with_other_length():
+    rows = ["abc", "def"]
+
+    apply_changes(rows, row_changes(rows, ["abcd", "de"]))
+
+    assert rows == ["abcd", "de"]
+
+
+def test_recorder_writes_deltas(tmp_path):
+    path = tmp_path / "trace.jsonl"
+
+    recorder = record(path, ("Enter", LOGIN), ("PF(3)", MENU))
+
+    assert recorder.entries == 2
+    header, first, second = [json.loads(line) for line in path.read_text().splitlines()]
+    assert header["trace"] == 1
+    assert first["size"] == [3, 10]
+    assert first["rows"] == LOGIN.rows
+    assert second["key"] == "PF(3)"
+    assert second["changes"] == [[1, 7, "ME"], [2, 0, "READY"]]
+    assert "rows" not in second
+
+
+def test_recorder_writes_full_screen_after_size_change(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    wide = Screen(["WELCOME             ", "READY               "])
+
+    record(path, ("Enter", LOGIN), ("Enter", wide))
+
+    last = json.loads(path.read_text().splitlines()[-1])
+    assert last["size"] == [2, 20]
+    assert last["rows"] == wide.rows
+
+
+def test_read_trace(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    record(path, ("Enter", LOGIN), ("PF(3)", MENU), (None, LOGIN))
+
+    screens = list(read_trace(str(path)))
+
+    assert [key for _, key, _ in screens] == ["Enter", "PF(3)", None]
+    assert [rows for _, _, rows in screens] == [LOGIN.rows, MENU.rows, LOGIN.rows]
+
+
+def test_read_appended_traces(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    record(path, ("Enter", LOGIN))
+    record(path, ("Enter", MENU))
+
+    assert [rows for _, _, rows in read_trace(str(path))] == [LOGIN.rows, MENU.rows]
+
+
+def test_export_text(tmp_path, capsys):
+    path = tmp_path / "trace.jsonl"
+    record(path, ("Enter", LOGIN), ("PF(3)", MENU))
+
+    main([str(path)])
+
+    output = capsys.readouterr().out
+    assert "--- screen 2 at " in output
+    assert "key PF(3)\nWELCOME   \nUSERID ME \nREADY     \n" in output
+
+
+def test_export_html(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    html_path = tmp_path / "trace.html"
+    record(path, ("Enter", Screen(["<ME>"])))
+
+    main([str(path), "--html", str(html_path)])
+
+    html = html_path.read_text()
+    assert html.startswith("<html>")
+    assert "&lt;ME&gt;" in html
+
+
+def test_export_html_to_stream(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    record(path, ("Enter", LOGIN), ("Enter", MENU))
+    output = io.StringIO()
+
+    export_html(str(path), output)
+
+    assert output.getvalue().count("<pre ") == 2
@@ -10,6 +10,13 @@ X3270_DEFAULT_ARGS = {
     "wait_time": 0.5,
     "wait_time_after_write": 0.0,
     "img_folder": ".",
+    "cache_screen": True,
+    "adaptive_wait": False,
+    "screen_stable_time": 0.0,
+    "session_pool_size": 0,
+    "session_max_idle": 300,
+    "model": None,
+    "instrumentation": None,
 }
 
 
@@ -14,6 +14,7 @@ def test_default_args():
     assert under_test.wait == 0.5
     assert under_test.wait_write == 0.0
     assert under_test.imgfolder == "."
+    assert under_test.cache_screen is False
     under_test.mf is None
 
 
@@ -23,9 +24,10 @@ def test_output_folder_robotframework_running(mocker: MockerFixture):
         return_value="/home/output",
     )
     under_test = x3270(**X3270_DEFAULT_ARGS)
+    m_get_variable_value.assert_not_called()
 
-    m_get_variable_value.assert_called_with("${OUTPUT DIR}")
     assert under_test.output_folder == "/home/output"
+    m_get_variable_value.assert_called_once_with("${OUTPUT DIR}")
 
 
 def test_output_folder_robotframework_not_running(under_test: x3270):
@@ -4,11 +4,15 @@ import pytest
 from pytest_mock import MockerFixture
 from robot.api import logger
 
+from Mainframe3270.py3270 import Emulator, Screen
+from Mainframe3270.search import compile_regex
 from Mainframe3270.x3270 import x3270
 
 
 def test_page_should_contain_string(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
     mocker.patch("robot.api.logger.info")
 
     under_test.page_should_contain_string("abc")
@@ -19,7 +23,9 @@ def test_page_should_contain_string(mocker: MockerFixture, under_test: x3270):
 def test_page_should_contain_string_ignore_case(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="aBc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["aBc"] * 24)
+    )
     mocker.patch("robot.api.logger.info")
 
     under_test.page_should_contain_string("abc", ignore_case=True)
@@ -28,7 +34,9 @@ def test_page_should_contain_string_ignore_case(
 
 
 def test_page_should_contain_string_fails(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(Exception, match='The string "def" was not found'):
         under_test.page_should_contain_string("def")
@@ -37,14 +45,18 @@ def test_page_should_contain_string_fails(mocker: MockerFixture, under_test: x32
 def test_page_should_contain_string_custom_message(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(Exception, match="my error message"):
         under_test.page_should_contain_string("def", error_message="my error message")
 
 
 def test_page_should_not_contain_string(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     under_test.page_should_not_contain_string("ABC")
 
@@ -52,13 +64,17 @@ def test_page_should_not_contain_string(mocker: MockerFixture, under_test: x3270
 def test_page_should_not_contain_string_ignore_case(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     under_test.page_should_not_contain_string("def", ignore_case=True)
 
 
 def test_page_should_not_contain_string_fails(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(Exception, match='The string "ABC" was found'):
         under_test.page_should_not_contain_string("ABC", ignore_case=True)
@@ -67,7 +83,9 @@ def test_page_should_not_contain_string_fails(mocker: MockerFixture, under_test:
 def test_page_should_not_contain_string_custom_message(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(Exception, match="my error message"):
         under_test.page_should_not_contain_string(
@@ -76,21 +94,44 @@ def test_page_should_not_contain_string_custom_message(
 
 
 def test_page_should_contain_any_string(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     under_test.page_should_contain_any_string(["abc", "def"])
 
 
+def test_page_should_contain_any_string_logs_positions(
+    mocker: MockerFixture, under_test: x3270
+):
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get",
+        return_value=Screen(["xabc", "abcx"]),
+    )
+    mocker.patch("robot.api.logger.info")
+
+    under_test.page_should_contain_any_string(["abc", "def"])
+
+    Emulator.screen_get.assert_called_once()
+    logger.info.assert_called_once_with(
+        'The string "abc" was found at y=1 / x=2, y=2 / x=1'
+    )
+
+
 def test_page_should_contain_any_string_ignore_case(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     under_test.page_should_contain_any_string(["ABC", "def"], ignore_case=True)
 
 
 def test_page_should_contain_any_string_fails(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(
         Exception, match=re.escape("The strings \"['def', 'ghi']\" were not found")
@@ -101,7 +142,9 @@ def test_page_should_contain_any_string_fails(mocker: MockerFixture, under_test:
 def test_page_should_contain_any_string_custom_message(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(Exception, match="my error message"):
         under_test.page_should_contain_any_string(
@@ -110,7 +153,9 @@ def test_page_should_contain_any_string_custom_message(
 
 
 def test_page_should_contain_all_strings(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", side_effect=["abc", "def"])
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc", "def"])
+    )
 
     under_test.page_should_contain_all_strings(["abc", "def"])
 
@@ -118,7 +163,9 @@ def test_page_should_contain_all_strings(mocker: MockerFixture, under_test: x327
 def test_page_should_contain_all_strings_ignore_case(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", side_effect=["AbC", "DeF"])
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["AbC", "DeF"])
+    )
 
     under_test.page_should_contain_all_strings(["abc", "def"], ignore_case=True)
 
@@ -126,7 +173,9 @@ def test_page_should_contain_all_strings_ignore_case(
 def test_page_should_contain_all_strings_fails(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value=["def"])
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["def"])
+    )
 
     with pytest.raises(Exception, match='The string "ghi" was not found'):
         under_test.page_should_contain_all_strings(["def", "ghi"])
@@ -135,7 +184,9 @@ def test_page_should_contain_all_strings_fails(
 def test_page_should_contain_all_strings_custom_message(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(Exception, match="my error message"):
         under_test.page_should_contain_all_strings(
@@ -144,7 +195,9 @@ def test_page_should_contain_all_strings_custom_message(
 
 
 def test_page_should_not_contain_any_string(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     under_test.page_should_not_contain_any_string(["def", "ghi"])
 
@@ -152,7 +205,9 @@ def test_page_should_not_contain_any_string(mocker: MockerFixture, under_test: x
 def test_page_should_not_contain_any_string_fails(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(Exception, match='The string "abc" was found'):
         under_test.page_should_not_contain_any_string(["abc", "def"])
@@ -161,7 +216,9 @@ def test_page_should_not_contain_any_string_fails(
 def test_page_should_not_contain_any_string_ignore_case(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="ABC")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["ABC"] * 24)
+    )
 
     with pytest.raises(Exception, match='The string "abc" was found'):
         under_test.page_should_not_contain_any_string(["abc", "def"], ignore_case=True)
@@ -170,7 +227,9 @@ def test_page_should_not_contain_any_string_ignore_case(
 def test_page_should_not_contain_any_string_custom_message(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(Exception, match="my error message"):
         under_test.page_should_not_contain_any_string(
@@ -179,7 +238,9 @@ def test_page_should_not_contain_any_string_custom_message(
 
 
 def test_page_should_not_contain_all_strings(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     under_test.page_should_not_contain_all_strings(["def", "ghi"])
 
@@ -187,7 +248,9 @@ def test_page_should_not_contain_all_strings(mocker: MockerFixture, under_test:
 def test_page_should_not_contain_all_strings_ignore_case(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(Exception, match='The string "abc" was found'):
         under_test.page_should_not_contain_all_strings(["ABC", "def"], ignore_case=True)
@@ -196,7 +259,9 @@ def test_page_should_not_contain_all_strings_ignore_case(
 def test_page_should_not_contain_all_strings_fails(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(Exception, match='The string "abc" was found'):
         under_test.page_should_not_contain_all_strings(["abc", "def"])
@@ -205,7 +270,9 @@ def test_page_should_not_contain_all_strings_fails(
 def test_page_should_not_contain_all_strings_custom_message(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(Exception, match="my error message"):
         under_test.page_should_not_contain_all_strings(
@@ -214,7 +281,9 @@ def test_page_should_not_contain_all_strings_custom_message(
 
 
 def test_page_should_contain_string_x_times(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="a")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["a"] * 24)
+    )
 
     under_test.page_should_contain_string_x_times("a", 24)
 
@@ -222,7 +291,9 @@ def test_page_should_contain_string_x_times(mocker: MockerFixture, under_test: x
 def test_page_should_contain_string_x_times_ignore_case(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="a")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["a"] * 24)
+    )
 
     under_test.page_should_contain_string_x_times("A", 24, ignore_case=True)
 
@@ -230,7 +301,9 @@ def test_page_should_contain_string_x_times_ignore_case(
 def test_page_should_contain_string_x_times_fails(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="a")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["a"] * 24)
+    )
 
     with pytest.raises(
         Exception, match='The string "a" was not found "1" times, it appears "24" times'
@@ -246,7 +319,9 @@ def test_page_should_contain_string_x_times_fails(
 def test_page_should_contain_string_x_times_custom_message(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="a")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["a"] * 24)
+    )
 
     with pytest.raises(Exception, match="my error message"):
         under_test.page_should_contain_string_x_times(
@@ -255,13 +330,35 @@ def test_page_should_contain_string_x_times_custom_message(
 
 
 def test_page_should_match_regex(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     under_test.page_should_match_regex(r"\w+")
 
 
+def test_page_should_match_regex_reuses_compiled_pattern(
+    mocker: MockerFixture, under_test: x3270
+):
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
+    compile_regex.cache_clear()
+
+    under_test.page_should_match_regex(r"b\w")
+    under_test.page_should_match_regex(r"b\w")
+
+    assert under_test.get_pattern_cache_statistics()["regex"] == {
+        "hits": 1,
+        "misses": 1,
+        "size": 1,
+    }
+
+
 def test_page_should_match_regex_fails(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(
         Exception, match=re.escape(r'No matches found for "\d+" pattern')
@@ -270,13 +367,17 @@ def test_page_should_match_regex_fails(mocker: MockerFixture, under_test: x3270)
 
 
 def test_page_should_not_match_regex(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     under_test.page_should_not_match_regex(r"\d+")
 
 
 def test_page_should_not_match_regex_fails(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="a")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["a"] * 24)
+    )
 
     with pytest.raises(
         Exception, match=re.escape('There are matches found for "[a]+" pattern')
@@ -285,13 +386,17 @@ def test_page_should_not_match_regex_fails(mocker: MockerFixture, under_test: x3
 
 
 def test_page_should_contain_match(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     under_test.page_should_contain_match("*a?c*")
 
 
 def test_page_should_contain_match_fails(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(
         Exception, match=re.escape('No matches found for "*e?g*" pattern')
@@ -302,7 +407,9 @@ def test_page_should_contain_match_fails(mocker: MockerFixture, under_test: x327
 def test_page_should_contain_match_ignore_case(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="ABC")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["ABC"] * 24)
+    )
 
     under_test.page_should_contain_match("*a?c*", ignore_case=True)
 
@@ -310,20 +417,26 @@ def test_page_should_contain_match_ignore_case(
 def test_page_should_contain_match_custom_message(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(Exception, match="my error message"):
         under_test.page_should_contain_match("*def*", error_message="my error message")
 
 
 def test_page_should_not_contain_match(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     under_test.page_should_not_contain_match("*def*")
 
 
 def test_page_should_not_contain_match_fails(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(
         Exception, match=re.escape('There are matches found for "*abc*" pattern')
@@ -334,7 +447,9 @@ def test_page_should_not_contain_match_fails(mocker: MockerFixture, under_test:
 def test_page_should_not_contain_match_ignore_case(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(
         Exception, match=re.escape('There are matches found for "*abc*" pattern')
@@ -345,7 +460,9 @@ def test_page_should_not_contain_match_ignore_case(
 def test_page_should_not_contain_match_custom_message(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     with pytest.raises(Exception, match="my error message"):
         under_test.page_should_not_contain_match(
@@ -1,7 +1,9 @@
 import time
 
 from pytest_mock import MockerFixture
+from robot.api import logger
 
+from Mainframe3270.instrumentation import SLEEP, Instrumentation
 from Mainframe3270.py3270 import Emulator
 from Mainframe3270.x3270 import x3270
 
@@ -14,6 +16,7 @@ def test_execute_command(mocker: MockerFixture, under_test: x3270):
     under_test.execute_command("cmd")
 
     Emulator.exec_command.assert_called_with("cmd".encode("utf-8"))
+    assert under_test.mf.screen_generation == 1
     time.sleep.assert_called_with(under_test.wait)
 
 
@@ -28,13 +31,11 @@ def test_delete_char(mocker: MockerFixture, under_test: x3270):
 
 
 def test_delete_char_in_position(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.move_to")
-    mocker.patch("Mainframe3270.py3270.Emulator.exec_command")
+    mocker.patch("Mainframe3270.py3270.Emulator.batch")
 
     under_test.delete_char(5, 5)
 
-    Emulator.move_to.assert_called_with(5, 5)
-    Emulator.exec_command.assert_called_with(b"Delete")
+    Emulator.batch.assert_called_with([b"MoveCursor(4, 4)", b"Delete"])
 
 
 def test_delete_field(mocker: MockerFixture, under_test: x3270):
@@ -48,13 +49,11 @@ def test_delete_field(mocker: MockerFixture, under_test: x3270):
 
 
 def test_delete_field_in_position(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.move_to")
-    mocker.patch("Mainframe3270.py3270.Emulator.exec_command")
+    mocker.patch("Mainframe3270.py3270.Emulator.batch")
 
     under_test.delete_field(5, 5)
 
-    Emulator.move_to.assert_called_with(5, 5)
-    Emulator.exec_command.assert_called_with(b"DeleteField")
+    Emulator.batch.assert_called_with([b"MoveCursor(4, 4)", b"DeleteField"])
 
 
 def test_send_enter(mocker: MockerFixture, under_test: x3270):
@@ -89,3 +88,73 @@ def test_send_pf(mocker: MockerFixture, under_test: x3270):
     under_test.send_PF("5")
 
     Emulator.exec_command.assert_called_with("PF(5)".encode("utf-8"))
+
+
+def test_send_enter_adaptive_wait(mocker: MockerFixture, under_test: x3270):
+    mocker.patch("Mainframe3270.py3270.Emulator.send_enter")
+    mocker.patch("Mainframe3270.py3270.Emulator.wait_for_unlock")
+    mocker.patch("Mainframe3270.py3270.Emulator.wait_for_stable_screen")
+    mocker.patch("time.sleep")
+    under_test.adaptive_wait = True
+
+    under_test.send_enter()
+
+    Emulator.wait_for_unlock.assert_called_once_with(under_test.wait)
+    Emulator.wait_for_stable_screen.assert_not_called()
+    time.sleep.assert_not_called()
+
+
+def test_send_enter_adaptive_wait_without_wait_time(
+    mocker: MockerFixture, under_test: x3270
+):
+    mocker.patch("Mainframe3270.py3270.Emulator.send_enter")
+    mocker.patch("Mainframe3270.py3270.Emulator.wait_for_unlock")
+    under_test.adaptive_wait = True
+    under_test.wait = 0
+
+    under_test.send_enter()
+
+    Emulator.wait_for_unlock.assert_not_called()
+
+
+def test_send_enter_adaptive_wait_logs_locked_keyboard(
+    mocker: MockerFixture, under_test: x3270
+):
+    mocker.patch("Mainframe3270.py3270.Emulator.send_enter")
+    mocker.patch("Mainframe3270.py3270.Emulator.wait_for_unlock", return_value=False)
+    mocker.patch("robot.api.logger.warn")
+    under_test.adaptive_wait = True
+
+    under_test.send_enter()
+
+    logger.warn.assert_called_once_with(
+        "The keyboard was not unlocked within the wait_time of 0.5 seconds"
+    )
+
+
+def test_send_pf_adaptive_wait_with_screen_stable_time(
+    mocker: MockerFixture, under_test: x3270
+):
+    mocker.patch("Mainframe3270.py3270.Emulator.exec_command")
+    mocker.patch("Mainframe3270.py3270.Emulator.wait_for_unlock")
+    mocker.patch("Mainframe3270.py3270.Emulator.wait_for_stable_screen")
+    mocker.patch("time.monotonic", side_effect=[10.0, 10.25])
+    under_test.adaptive_wait = True
+    under_test.screen_stable_time = 0.1
+
+    under_test.send_PF("3")
+
+    Emulator.wait_for_unlock.assert_called_once_with(under_test.wait)
+    Emulator.wait_for_stable_screen.assert_called_once_with(0.1, 0.25)
+
+
+def test_send_enter_records_sleep(mocker: MockerFixture, under_test: x3270):
+    mocker.patch("Mainframe3270.py3270.Emulator.send_enter")
+    mocker.patch("time.sleep")
+    under_test.instrumentation = Instrumentation()
+
+    under_test.send_enter()
+
+    assert under_test.instrumentation.histograms[(SLEEP, "wait_time")].samples == [
+        under_test.wait
+    ]
@@ -1,9 +1,15 @@
+import json
+import os
 import socket
 
+import pytest
 from pytest_mock import MockerFixture
 
 import Mainframe3270
+from Mainframe3270.lu_allocator import lu_allocator
 from Mainframe3270.py3270 import Emulator
+from Mainframe3270.replay import RecordingApp
+from Mainframe3270.session_pool import SessionPool, session_pool
 from Mainframe3270.x3270 import x3270
 
 from .conftest import X3270_DEFAULT_ARGS
@@ -67,3 +73,317 @@ def test_close_connection_socket_error(mocker: MockerFixture, under_test: x3270)
     under_test.close_connection()
 
     assert under_test.mf is None
+
+
+def test_open_connection_tracks_screen_changes_only_if_enabled(
+    mocker: MockerFixture,
+):
+    mocker.patch("Mainframe3270.py3270.Emulator.create_app")
+    mocker.patch("Mainframe3270.py3270.Emulator.connect")
+    mocker.patch("Mainframe3270.py3270.Emulator.terminate")
+    under_test = x3270(**X3270_DEFAULT_ARGS)
+
+    under_test.open_connection("myhost")
+    assert not under_test.mf.track_screen_changes
+
+    under_test.track_screen_changes = True
+    under_test.open_connection("myhost")
+    assert under_test.mf.track_screen_changes
+
+
+def test_open_connection_from_session_pool(mocker: MockerFixture):
+    mocker.patch("Mainframe3270.py3270.Emulator.create_app")
+    m_connect = mocker.patch("Mainframe3270.py3270.Emulator.connect")
+    mocker.patch("Mainframe3270.py3270.Emulator.is_connected", return_value=True)
+    m_terminate = mocker.patch("Mainframe3270.py3270.Emulator.terminate")
+    under_test = x3270(**X3270_DEFAULT_ARGS)
+    under_test.session_pool = SessionPool(max_size=1)
+
+    under_test.open_connection("myhost")
+    emulator = under_test.mf
+    under_test.close_connection()
+    under_test.open_connection("myhost")
+
+    assert under_test.mf is emulator
+    m_connect.assert_called_once_with("myhost:23")
+    m_terminate.assert_not_called()
+
+
+def test_open_connection_session_pool_other_host(mocker: MockerFixture):
+    mocker.patch("Mainframe3270.py3270.Emulator.create_app")
+    m_connect = mocker.patch("Mainframe3270.py3270.Emulator.connect")
+    mocker.patch("Mainframe3270.py3270.Emulator.is_connected", return_value=True)
+    under_test = x3270(**X3270_DEFAULT_ARGS)
+    under_test.session_pool = SessionPool(max_size=1)
+
+    under_test.open_connection("myhost")
+    emulator = under_test.mf
+    under_test.close_connection()
+    under_test.open_connection("otherhost")
+
+    assert under_test.mf is not emulator
+    assert m_connect.call_count == 2
+
+
+def test_session_pool_size_configures_shared_pool():
+    under_test = x3270(
+        **dict(X3270_DEFAULT_ARGS, session_pool_size=4, session_max_idle=60)
+    )
+
+    assert under_test.session_pool is session_pool
+    assert session_pool.max_size == 4
+    assert session_pool.max_idle == 60
+    session_pool.max_size = 0
+
+
+def test_open_connection_with_lu_pool(mocker: MockerFixture):
+    mocker.patch("Mainframe3270.py3270.Emulator.create_app")
+    mocker.patch("Mainframe3270.py3270.Emulator.connect")
+    m_acquire = mocker.patch(
+        "Mainframe3270.lu_allocator.LUAllocator.acquire", return_value="TERM02"
+    )
+    under_test = x3270(**X3270_DEFAULT_ARGS)
+    under_test.open_connection("myhost", lu_pool="TERM01-TERM02")
+
+    m_acquire.assert_called_with("myhost", ["TERM01", "TERM02"])
+    assert under_test.lu == "TERM02"
+    assert under_test.credential == "TERM02@myhost:23"
+
+
+def test_open_connection_with_lu_and_lu_pool():
+    under_test = x3270(**X3270_DEFAULT_ARGS)
+
+    with pytest.raises(Exception, match="Either LU or lu_pool can be given, not both"):
+        under_test.open_connection("myhost", "lu", lu_pool="TERM01-TERM02")
+
+
+def test_open_connection_with_lu_pool_releases_lu_on_error(mocker: MockerFixture):
+    mocker.patch("Mainframe3270.py3270.Emulator.create_app")
+    mocker.patch("Mainframe3270.py3270.Emulator.connect", side_effect=socket.error)
+    mocker.patch(
+        "Mainframe3270.lu_allocator.LUAllocator.acquire", return_value="TERM01"
+    )
+    m_release = mocker.patch("Mainframe3270.lu_allocator.LUAllocator.release")
+    under_test = x3270(**X3270_DEFAULT_ARGS)
+
+    with pytest.raises(socket.error):
+        under_test.open_connection("myhost", lu_pool="TERM01")
+
+    m_release.assert_called_with("myhost", "TERM01")
+
+
+def test_pooled_session_releases_lu_when_terminated(mocker: MockerFixture, tmp_path):
+    mocker.patch("Mainframe3270.py3270.Emulator.create_app")
+    mocker.patch("Mainframe3270.py3270.Emulator.connect")
+    m_terminate = mocker.patch("Mainframe3270.py3270.Emulator.terminate")
+    mocker.patch.object(lu_allocator, "lease_dir", str(tmp_path))
+    under_test = x3270(**X3270_DEFAULT_ARGS)
+    under_test.session_pool = SessionPool(max_size=1)
+
+    under_test.open_connection("myhost", lu_pool="TERM01")
+    under_test.close_connection()
+
+    assert lu_allocator._held == {("myhost", "TERM01"): False}
+    under_test.session_pool.clear()
+
+    m_terminate.assert_called_once()
+    assert lu_allocator._held == {}
+    with open(lu_allocator.registry_path) as file:
+        assert json.load(file) == {"myhost": {}}
+
+
+def test_open_connection_with_lu_pool_releases_lu_if_emulator_fails(
+    mocker: MockerFixture,
+):
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.create_app",
+        side_effect=FileNotFoundError("s3270"),
+    )
+    mocker.patch(
+        "Mainframe3270.lu_allocator.LUAllocator.acquire", return_value="TERM01"
+    )
+    m_release = mocker.patch("Mainframe3270.lu_allocator.LUAllocator.release")
+    under_test = x3270(**X3270_DEFAULT_ARGS)
+
+    with pytest.raises(FileNotFoundError):
+        under_test.open_connection("myhost", lu_pool="TERM01")
+
+    m_release.assert_called_with("myhost", "TERM01")
+    assert under_test._lu_lease is None
+
+
+def test_close_connection_releases_lu(mocker: MockerFixture, under_test: x3270):
+    mocker.patch("Mainframe3270.py3270.Emulator.terminate")
+    m_release = mocker.patch("Mainframe3270.lu_allocator.LUAllocator.release")
+    under_test._lu_lease = ("myhost", "TERM01")
+    under_test.close_connection()
+
+    m_release.assert_called_with("myhost", "TERM01", keep=False)
+    assert under_test._lu_lease is None
+
+
+def test_open_connection_with_model(mocker: MockerFixture):
+    m_create_app = mocker.patch("Mainframe3270.py3270.Emulator.create_app")
+    mocker.patch("Mainframe3270.py3270.Emulator.connect")
+    under_test = x3270(**dict(X3270_DEFAULT_ARGS, model="4"))
+
+    under_test.open_connection("myhost")
+
+    m_create_app.assert_called_with(True, None, "4", 0)
+    assert under_test._session_key[-1] == "4"
+
+
+def test_open_connection_with_keep_alive(mocker: MockerFixture):
+    m_create_app = mocker.patch("Mainframe3270.py3270.Emulator.create_app")
+    mocker.patch("Mainframe3270.py3270.Emulator.connect")
+    under_test = x3270(**dict(X3270_DEFAULT_ARGS, keep_alive=60))
+
+    under_test.open_connection("myhost")
+
+    m_create_app.assert_called_with(True, None, None, 60)
+
+
+@pytest.fixture
+def aliased(mocker: MockerFixture):
+    mocker.patch("Mainframe3270.py3270.Emulator.create_app")
+    mocker.patch("Mainframe3270.py3270.Emulator.connect")
+    mocker.patch("Mainframe3270.py3270.Emulator.terminate")
+    under_test = x3270(**X3270_DEFAULT_ARGS)
+    under_test.open_connection("myhost", LU="CICSLU", alias="cics")
+    under_test.open_connection("myhost", LU="TSOLU", alias="tso")
+    return under_test
+
+
+def test_open_connection_with_alias_keeps_other_connections(aliased: x3270):
+    assert aliased.alias == "tso"
+    assert aliased.lu == "TSOLU"
+    assert list(aliased._connections) == ["cics"]
+    Emulator.terminate.assert_not_called()
+
+
+def test_open_connection_with_same_alias_replaces_connection(aliased: x3270):
+    tso = aliased.mf
+
+    aliased.open_connection("otherhost", alias="cics")
+
+    assert aliased.alias == "cics"
+    assert aliased.host == "otherhost"
+    assert list(aliased._connections) == ["tso"]
+    assert aliased._connections["tso"]["mf"] is tso
+    Emulator.terminate.assert_called_once()
+
+
+def test_open_connection_without_alias_replaces_connection(mocker: MockerFixture):
+    mocker.patch("Mainframe3270.py3270.Emulator.create_app")
+    mocker.patch("Mainframe3270.py3270.Emulator.connect")
+    mocker.patch("Mainframe3270.py3270.Emulator.terminate")
+    under_test = x3270(**X3270_DEFAULT_ARGS)
+    under_test.open_connection("myhost")
+
+    under_test.open_connection("otherhost")
+
+    assert under_test.host == "otherhost"
+    assert under_test._connections == {}
+    Emulator.terminate.assert_called_once()
+
+
+def test_switch_connection(aliased: x3270):
+    tso = aliased.mf
+
+    previous = aliased.switch_connection("cics")
+
+    assert previous == "tso"
+    assert aliased.alias == "cics"
+    assert aliased.lu == "CICSLU"
+    assert aliased.credential == "CICSLU@myhost:23"
+    assert aliased._connections["tso"]["mf"] is tso
+
+    aliased.switch_connection(previous)
+
+    assert aliased.mf is tso
+    assert aliased.lu == "TSOLU"
+
+
+def test_switch_to_current_connection(aliased: x3270):
+    assert aliased.switch_connection("tso") == "tso"
+    assert list(aliased._connections) == ["cics"]
+
+
+def test_switch_connection_unknown_alias(aliased: x3270):
+    with pytest.raises(Exception, match="No connection with alias 'ims' is open"):
+        aliased.switch_connection("ims")
+
+    assert aliased.alias == "tso"
+
+
+def test_close_connection_keeps_other_connections(aliased: x3270):
+    aliased.close_connection()
+
+    assert aliased.mf is None
+    assert aliased.alias is None
+    assert list(aliased._connections) == ["cics"]
+    aliased.switch_connection("cics")
+    assert aliased.lu == "CICSLU"
+
+
+def test_close_all_connections(aliased: x3270):
+    aliased.close_all_connections()
+
+    assert aliased.mf is None
+    assert aliased._connections == {}
+    assert Emulator.terminate.call_count == 2
+
+
+def write_transcript(path):
+    with open(path, "w") as file:
+        for command, response in [
+            ("Connect(myhost:23)", ["U F U C(myhost) I 2 24 80 0 0 0x0 0.000", "ok"]),
+            (
+                "Ascii(0,0,24,80)",
+                ["data: WELCOME", "U F U C(myhost) I 2 24 80 0 0 0x0 0.000", "ok"],
+            ),
+            ("Enter", ["U F U C(myhost) I 2 24 80 0 0 0x0 0.000", "ok"]),
+        ]:
+            file.write(json.dumps({"command": command, "response": response}) + "\n")
+
+
+def test_open_connection_replay_transcript(tmp_path, mocker: MockerFixture):
+    m_create_app = mocker.patch("Mainframe3270.py3270.Emulator.create_app")
+    m_sleep = mocker.patch("time.sleep")
+    path = str(tmp_path / "transcript.jsonl")
+    write_transcript(path)
+    under_test = x3270(**dict(X3270_DEFAULT_ARGS, session_pool_size=4))
+
+    under_test.open_connection("myhost", replay_transcript=path)
+    under_test.send_enter()
+    under_test.close_connection()
+
+    m_create_app.assert_not_called()
+    m_sleep.assert_not_called()
+    assert session_pool._idle == []
+
+
+def test_open_connection_replay_transcript_relative_to_output_dir(
+    tmp_path, mocker: MockerFixture
+):
+    m_create_app = mocker.patch("Mainframe3270.py3270.Emulator.create_app")
+    write_transcript(str(tmp_path / "transcript.jsonl"))
+    under_test = x3270(**X3270_DEFAULT_ARGS)
+    under_test.output_folder = str(tmp_path)
+
+    under_test.open_connection("myhost", replay_transcript="transcript.jsonl")
+    under_test.send_enter()
+
+    m_create_app.assert_not_called()
+
+
+def test_open_connection_record_transcript(tmp_path, mocker: MockerFixture):
+    mocker.patch("Mainframe3270.py3270.Emulator.create_app")
+    mocker.patch("Mainframe3270.py3270.Emulator.connect")
+    under_test = x3270(**X3270_DEFAULT_ARGS)
+    under_test.output_folder = str(tmp_path)
+
+    under_test.open_connection("myhost", record_transcript="transcript.jsonl")
+
+    assert isinstance(under_test.mf.app, RecordingApp)
+    assert under_test.mf.app.path == os.path.join(str(tmp_path), "transcript.jsonl")
@@ -1,21 +1,24 @@
 import pytest
 from pytest_mock import MockerFixture
 
-from Mainframe3270.py3270 import Emulator
+from Mainframe3270.py3270 import Emulator, Screen, Status
 from Mainframe3270.x3270 import x3270
 
 
 def test_read(under_test: x3270, mocker: MockerFixture):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get",
+        return_value=Screen(["abc".ljust(80)] * 24),
+    )
 
     string = under_test.read(1, 1, 3)
 
-    Emulator.string_get.assert_called_once_with(1, 1, 3)
+    Emulator.screen_get.assert_called_once()
     assert string == "abc"
 
 
 def test_read_fails_check_y_axis_limit(under_test: x3270, mocker: MockerFixture):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get")
+    mocker.patch("Mainframe3270.py3270.Emulator.screen_get")
     with pytest.raises(
         Exception, match="You have exceeded the y-axis limit of the mainframe screen"
     ):
@@ -23,7 +26,7 @@ def test_read_fails_check_y_axis_limit(under_test: x3270, mocker: MockerFixture)
 
 
 def test_read_fails_check_x_axis_limit(under_test: x3270, mocker: MockerFixture):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get")
+    mocker.patch("Mainframe3270.py3270.Emulator.screen_get")
     with pytest.raises(
         Exception, match="You have exceeded the x-axis limit of the mainframe screen"
     ):
@@ -31,7 +34,7 @@ def test_read_fails_check_x_axis_limit(under_test: x3270, mocker: MockerFixture)
 
 
 def test_read_exceeds_x_axis(under_test: x3270, mocker: MockerFixture):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get")
+    mocker.patch("Mainframe3270.py3270.Emulator.screen_get")
     with pytest.raises(
         Exception, match="You have exceeded the x-axis limit of the mainframe screen"
     ):
@@ -39,6 +42,60 @@ def test_read_exceeds_x_axis(under_test: x3270, mocker: MockerFixture):
 
 
 def test_read_all_screen(under_test: x3270, mocker: MockerFixture):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="a")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["a"] * 24)
+    )
     content = under_test.read_all_screen()
     assert content == "a" * 24
+
+
+def test_get_screen_cache_statistics(under_test: x3270):
+    under_test.mf.screen_cache_hits = 3
+    under_test.mf.screen_cache_misses = 1
+    under_test.mf.screen_generation = 2
+
+    assert under_test.get_screen_cache_statistics() == {
+        "hits": 3,
+        "misses": 1,
+        "generation": 2,
+    }
+
+
+FIELDS = Screen.from_read_buffer([b"SF(c0=e0) 49 44 3a SF(c0=c0) 61 62 00 00"])
+
+
+def test_read_field(under_test: x3270, mocker: MockerFixture):
+    mocker.patch("Mainframe3270.py3270.Emulator.read_buffer", return_value=FIELDS)
+
+    assert under_test.read_field(1, 7) == "ab"
+
+
+def test_read_field_no_field(under_test: x3270, mocker: MockerFixture):
+    mocker.patch("Mainframe3270.py3270.Emulator.read_buffer", return_value=FIELDS)
+
+    with pytest.raises(Exception, match="There is no field at y=1 / x=5"):
+        under_test.read_field(1, 5)
+
+
+def test_read_model_5(under_test: x3270, mocker: MockerFixture):
+    under_test.mf.status = Status(b"U F U C(pub400.com) I 5 27 132 0 0 0x0 0.000")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get",
+        return_value=Screen(["abc".rjust(132)] * 27),
+    )
+
+    assert under_test.read(27, 130, 3) == "abc"
+
+
+def test_read_model_5_exceeds_x_axis(under_test: x3270, mocker: MockerFixture):
+    under_test.mf.status = Status(b"U F U C(pub400.com) I 5 27 132 0 0 0x0 0.000")
+    mocker.patch("Mainframe3270.py3270.Emulator.screen_get")
+
+    with pytest.raises(
+        Exception, match="You have exceeded the y-axis limit of the mainframe screen"
+    ):
+        under_test.read(28, 1, 1)
+    with pytest.raises(
+        Exception, match="You have exceeded the x-axis limit of the mainframe screen"
+    ):
+        under_test.read(1, 130, 4)
@@ -1,10 +1,19 @@
 import os
+import re
+import zipfile
 
+import pytest
 from pytest_mock import MockerFixture
 from robot.api import logger
 
+from Mainframe3270.py3270 import Screen
+from Mainframe3270.screenshot import render_html, render_html_document, screen_hash
 from Mainframe3270.x3270 import x3270
 
+from .conftest import X3270_DEFAULT_ARGS
+
+SCREEN = Screen(["WELCOME", "READY  "])
+
 
 def test_set_screenshot_folder(under_test: x3270):
     path = os.getcwd()
@@ -39,3 +48,97 @@ def test_take_screenshot(mocker: MockerFixture, under_test: x3270):
         level="INFO",
         html=True,
     )
+
+
+def test_invalid_screenshot_mode():
+    with pytest.raises(ValueError, match="screenshot_mode must be one of"):
+        x3270(**dict(X3270_DEFAULT_ARGS, screenshot_mode="png"))
+
+
+def test_take_screenshot_inline(mocker: MockerFixture, under_test: x3270):
+    m_save_screen = mocker.patch("Mainframe3270.py3270.Emulator.save_screen")
+    mocker.patch("Mainframe3270.py3270.Emulator.screen_get", return_value=SCREEN)
+    mocker.patch("robot.api.logger.write")
+    under_test.screenshot_mode = "inline"
+
+    under_test.take_screenshot()
+
+    logger.write.assert_called_with(render_html(SCREEN), level="INFO", html=True)
+    m_save_screen.assert_not_called()
+
+
+def test_take_screenshot_text(mocker: MockerFixture, under_test: x3270):
+    mocker.patch("Mainframe3270.py3270.Emulator.screen_get", return_value=SCREEN)
+    mocker.patch("robot.api.logger.info")
+    under_test.screenshot_mode = "text"
+
+    under_test.take_screenshot()
+
+    logger.info.assert_called_with("WELCOME\nREADY  ")
+
+
+def test_take_screenshot_archive(tmp_path, mocker: MockerFixture, under_test: x3270):
+    m_save_screen = mocker.patch("Mainframe3270.py3270.Emulator.save_screen")
+    mocker.patch("Mainframe3270.py3270.Emulator.screen_get", return_value=SCREEN)
+    mocker.patch("robot.api.logger.info")
+    under_test.screenshot_mode = "archive"
+    under_test.output_folder = str(tmp_path)
+
+    under_test.take_screenshot()
+    under_test.take_screenshot()
+    path = under_test.write_screenshot_archive("Top.Suite")
+
+    m_save_screen.assert_not_called()
+    assert path == os.path.join(str(tmp_path), ".", "screenshots_Top.Suite.zip")
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        assert len(names) == 2
+        assert all(re.match(r"screenshot_\d+_[12]\.html$", name) for name in names)
+        assert "WELCOME" in archive.read(names[0]).decode("utf-8")
+
+
+def test_write_screenshot_archive_without_screenshots(under_test: x3270):
+    assert under_test.write_screenshot_archive("Top.Suite") is None
+
+
+def test_take_screenshot_deduplicated(
+    tmp_path, mocker: MockerFixture, under_test: x3270
+):
+    m_save_screen = mocker.patch("Mainframe3270.py3270.Emulator.save_screen")
+    m_screen_get = mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=SCREEN
+    )
+    mocker.patch("robot.api.logger.write")
+    under_test.deduplicate_screenshots = True
+    under_test.output_folder = str(tmp_path)
+
+    under_test.take_screenshot()
+    under_test.take_screenshot()
+
+    filepath = os.path.join(".", "screenshot_%s.html" % screen_hash(SCREEN))
+    m_save_screen.assert_not_called()
+    m_screen_get.assert_called_with(refresh=True)
+    with open(os.path.join(str(tmp_path), filepath), encoding="utf-8") as file:
+        assert file.read() == render_html_document(SCREEN)
+    assert logger.write.call_count == 2
+    logger.write.assert_called_with(
+        '<iframe src="%s" height="410" width="670"></iframe>' % filepath,
+        level="INFO",
+        html=True,
+    )
+
+
+def test_take_screenshot_archive_deduplicated(mocker: MockerFixture, under_test: x3270):
+    mocker.patch("Mainframe3270.py3270.Emulator.screen_get", return_value=SCREEN)
+    mocker.patch("robot.api.logger.info")
+    under_test.screenshot_mode = "archive"
+    under_test.deduplicate_screenshots = True
+
+    under_test.take_screenshot()
+    under_test.take_screenshot()
+
+    name = "screenshot_%s.html" % screen_hash(SCREEN)
+    assert [entry[0] for entry in under_test.screenshot_archive.entries] == [name]
+    logger.info.assert_called_with(
+        "Screenshot %s is already in the archive of the suite" % name
+    )
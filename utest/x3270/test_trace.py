@@ -0,0 +1,66 @@
+import os
+
+import pytest
+from pytest_mock import MockerFixture
+
+from Mainframe3270.py3270 import Screen
+from Mainframe3270.trace import read_trace
+from Mainframe3270.x3270 import x3270
+
+SCREEN = Screen(["WELCOME", "READY  "])
+
+
+def test_start_session_trace(tmp_path, mocker: MockerFixture, under_test: x3270):
+    mocker.patch("robot.api.logger.info")
+    under_test.output_folder = str(tmp_path)
+
+    path = under_test.start_session_trace("trace.jsonl")
+
+    assert path == os.path.join(str(tmp_path), "trace.jsonl")
+    assert under_test.mf.trace.path == path
+
+
+def test_start_session_trace_default_path(
+    tmp_path, mocker: MockerFixture, under_test: x3270
+):
+    mocker.patch("robot.api.logger.info")
+    mocker.patch("time.time", return_value=1.0)
+    under_test.output_folder = str(tmp_path)
+
+    path = under_test.start_session_trace()
+
+    assert path == os.path.join(str(tmp_path), ".", "session_trace_1000.jsonl")
+
+
+def test_stop_session_trace(tmp_path, mocker: MockerFixture, under_test: x3270):
+    mocker.patch("robot.api.logger.info")
+    mocker.patch("Mainframe3270.py3270.Emulator.screen_get", return_value=SCREEN)
+    under_test.output_folder = str(tmp_path)
+    under_test.start_session_trace("trace.jsonl")
+    under_test.mf.trace.record("Enter", Screen(["WELCOME", "       "]))
+
+    path = under_test.stop_session_trace()
+
+    assert under_test.mf.trace is None
+    screens = list(read_trace(path))
+    assert [key for _, key, _ in screens] == ["Enter", None]
+    assert screens[-1][2] == SCREEN.rows
+
+
+def test_stop_session_trace_not_started(under_test: x3270):
+    with pytest.raises(Exception, match="No session trace is recorded"):
+        under_test.stop_session_trace()
+
+
+def test_close_connection_stops_session_trace(
+    tmp_path, mocker: MockerFixture, under_test: x3270
+):
+    mocker.patch("robot.api.logger.info")
+    mocker.patch("Mainframe3270.py3270.Emulator.terminate")
+    under_test.output_folder = str(tmp_path)
+    under_test.start_session_trace("trace.jsonl")
+    trace = under_test.mf.trace
+
+    under_test.close_connection()
+
+    assert trace.file.closed
@@ -1,7 +1,7 @@
 import pytest
 from pytest_mock import MockerFixture
 
-from Mainframe3270.py3270 import Emulator
+from Mainframe3270.py3270 import Emulator, Screen
 from Mainframe3270.x3270 import x3270
 
 
@@ -32,7 +32,9 @@ def test_wait_field_detected(mocker: MockerFixture, under_test: x3270):
 
 
 def test_wait_until_string(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
 
     txt = under_test.wait_until_string("abc")
 
@@ -40,17 +42,88 @@ def test_wait_until_string(mocker: MockerFixture, under_test: x3270):
 
 
 def test_wait_until_string_string_not_found(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
+    mocker.patch("Mainframe3270.py3270.Emulator.wait_for_output", return_value=False)
 
     with pytest.raises(Exception, match='String "def" not found in 1 seconds'):
         under_test.wait_until_string("def", 1)
 
+    Emulator.wait_for_output.assert_called_once()
+
+
+def test_wait_until_string_after_screen_changed(
+    mocker: MockerFixture, under_test: x3270
+):
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get",
+        side_effect=[Screen(["abc"] * 24), Screen(["def"] * 24)],
+    )
+    mocker.patch("Mainframe3270.py3270.Emulator.wait_for_output", return_value=True)
+
+    txt = under_test.wait_until_string("def", 0.5)
+
+    assert txt == "def"
+    Emulator.screen_get.assert_any_call(refresh=True)
+    Emulator.wait_for_output.assert_called_once()
+
 
 def test_wait_until_string_not_found_until_timeout(
     mocker: MockerFixture, under_test: x3270
 ):
-    mocker.patch("Mainframe3270.py3270.Emulator.string_get", return_value="abc")
-    mocker.patch("time.ctime", return_value="Sat Feb 12 15:29:51 2022")
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.screen_get", return_value=Screen(["abc"] * 24)
+    )
+    mocker.patch("Mainframe3270.py3270.Emulator.wait_for_output", return_value=True)
+    mocker.patch("time.monotonic", side_effect=[100.0, 102.0, 105.5])
+
+    with pytest.raises(Exception, match='String "def" not found in 5 seconds'):
+        under_test.wait_until_string("def")
+
+    Emulator.wait_for_output.assert_called_once_with(3.0)
+
+
+def test_wait_until_screen_changes(mocker: MockerFixture, under_test: x3270):
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.wait_for_screen_change", return_value=True
+    )
+
+    assert not under_test.mf.track_screen_changes
+
+    under_test.wait_until_screen_changes(2)
+
+    Emulator.wait_for_screen_change.assert_called_once_with(2)
+    # the screen is read before the following AID keys
+    assert under_test.mf.track_screen_changes
+    assert under_test.track_screen_changes
+
+
+def test_wait_until_screen_changes_timed_out(mocker: MockerFixture, under_test: x3270):
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.wait_for_screen_change", return_value=False
+    )
+
+    with pytest.raises(Exception, match="The screen did not change in 5 seconds"):
+        under_test.wait_until_screen_changes()
+
+
+def test_wait_until_screen_stable(mocker: MockerFixture, under_test: x3270):
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.wait_for_stable_screen", return_value=True
+    )
+
+    under_test.wait_until_screen_stable(0.2, 3)
+
+    Emulator.wait_for_stable_screen.assert_called_once_with(0.2, 3)
+
+
+def test_wait_until_screen_stable_timed_out(mocker: MockerFixture, under_test: x3270):
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.wait_for_stable_screen", return_value=False
+    )
 
-    with pytest.raises(Exception, match='String "abc" not found in 5 seconds'):
-        under_test.wait_until_string("abc")
+    with pytest.raises(
+        Exception, match="The screen was not stable for 0.5 seconds within 5 seconds"
+    ):
+        under_test.wait_until_screen_stable()
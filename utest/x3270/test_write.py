@@ -1,17 +1,36 @@
+import time
+
+import pytest
 from pytest_mock import MockerFixture
 
-from Mainframe3270.py3270 import Emulator
+from Mainframe3270.py3270 import Emulator, Screen
 from Mainframe3270.x3270 import x3270
 
 
 def test_write(mocker: MockerFixture, under_test: x3270):
+    mocker.patch("Mainframe3270.py3270.Emulator.exec_command")
+    mocker.patch("time.sleep")
+
+    under_test.write("abc")
+
+    assert Emulator.exec_command.call_args_list == [
+        mocker.call(b'String("abc")'),
+        mocker.call(b"Enter"),
+    ]
+    time.sleep.assert_called_once_with(under_test.wait)
+
+
+def test_write_with_wait_time_after_write(mocker: MockerFixture, under_test: x3270):
     mocker.patch("Mainframe3270.py3270.Emulator.exec_command")
     mocker.patch("Mainframe3270.py3270.Emulator.send_enter")
+    mocker.patch("time.sleep")
+    under_test.wait_write = 1
 
     under_test.write("abc")
 
     Emulator.exec_command.assert_called_once_with(b'String("abc")')
     Emulator.send_enter.assert_called_once()
+    time.sleep.assert_any_call(1)
 
 
 def test_write_bare(mocker: MockerFixture, under_test: x3270):
@@ -25,24 +44,81 @@ def test_write_bare(mocker: MockerFixture, under_test: x3270):
 
 
 def test_write_in_position(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.exec_command")
-    mocker.patch("Mainframe3270.py3270.Emulator.move_to")
+    mocker.patch("Mainframe3270.py3270.Emulator.batch")
     mocker.patch("Mainframe3270.py3270.Emulator.send_enter")
+    mocker.patch("time.sleep")
 
     under_test.write_in_position("abc", 5, 5)
 
-    Emulator.move_to.assert_called_once_with(5, 5)
-    Emulator.exec_command.assert_called_once_with(b'String("abc")')
+    Emulator.batch.assert_called_once_with([b"MoveCursor(4, 4)", b'String("abc")'])
     Emulator.send_enter.assert_called_once()
 
 
 def test_write_bare_in_position(mocker: MockerFixture, under_test: x3270):
-    mocker.patch("Mainframe3270.py3270.Emulator.exec_command")
-    mocker.patch("Mainframe3270.py3270.Emulator.move_to")
+    mocker.patch("Mainframe3270.py3270.Emulator.batch")
     mocker.patch("Mainframe3270.py3270.Emulator.send_enter")
 
     under_test.write_bare_in_position("abc", 5, 5)
 
-    Emulator.move_to.assert_called_once_with(5, 5)
-    Emulator.exec_command.assert_called_once_with(b'String("abc")')
+    Emulator.batch.assert_called_once_with([b"MoveCursor(4, 4)", b'String("abc")'])
     Emulator.send_enter.assert_not_called()
+
+
+def test_write_field_by_label(under_test: x3270, mocker: MockerFixture):
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.read_buffer",
+        return_value=Screen.from_read_buffer(
+            [b"SF(c0=e0) 49 44 3a SF(c0=c0) 00 00 00 00"]
+        ),
+    )
+    mocker.patch("Mainframe3270.py3270.Emulator.fill_field")
+
+    under_test.write_field_by_label("ID:", "abc")
+
+    Emulator.fill_field.assert_called_once_with(1, 6, b"abc", 4)
+
+
+def test_write_field_by_label_not_found(under_test: x3270, mocker: MockerFixture):
+    mocker.patch(
+        "Mainframe3270.py3270.Emulator.read_buffer",
+        return_value=Screen.from_read_buffer([b"49 44 3a"]),
+    )
+
+    with pytest.raises(Exception, match='No input field found after the label "ID:"'):
+        under_test.write_field_by_label("ID:", "abc")
+
+
+def test_fill_fields(under_test: x3270, mocker: MockerFixture):
+    mocker.patch("Mainframe3270.py3270.Emulator.batch")
+
+    under_test.fill_fields([(5, 20, "abc"), ["6", "20", "def"]])
+
+    Emulator.batch.assert_called_once_with(
+        [
+            b"MoveCursor(4, 19)",
+            b"DeleteField",
+            b'String("abc")',
+            b"MoveCursor(5, 19)",
+            b"DeleteField",
+            b'String("def")',
+        ]
+    )
+
+
+def test_fill_fields_with_dict(under_test: x3270, mocker: MockerFixture):
+    mocker.patch("Mainframe3270.py3270.Emulator.fill_fields")
+
+    under_test.fill_fields({"5,20": "abc", (6, 20): "def"})
+
+    Emulator.fill_fields.assert_called_once_with([(5, 20, b"abc"), (6, 20, b"def")])
+
+
+def test_fill_fields_checks_all_limits_first(under_test: x3270, mocker: MockerFixture):
+    mocker.patch("Mainframe3270.py3270.Emulator.fill_fields")
+
+    with pytest.raises(
+        Exception, match="You have exceeded the y-axis limit of the mainframe screen"
+    ):
+        under_test.fill_fields([(5, 20, "abc"), (25, 1, "def")])
+
+    Emulator.fill_fields.assert_not_called()